@@ -4,6 +4,8 @@ from django.conf import settings
 
 # Setup Django's settings
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'djangoCliApp.settings')
+# Keep test runs out of the shared metrics file
+os.environ.setdefault('LLM_METRICS_FILE', '')
 django.setup()
 
 # Add any shared fixtures here if needed
\ No newline at end of file
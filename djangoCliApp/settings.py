@@ -12,7 +12,7 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 import os
 from pathlib import Path
-from config import DB_USERNAME, DB_PASSWORD, DB_HOST, DB_PORT, DB_NAME, SECRET_KEY
+from config import DB_USERNAME, DB_PASSWORD, DB_HOST, DB_PORT, DB_NAME, SECRET_KEY, OLLAMA_HOST
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -128,3 +128,107 @@ STATIC_URL = 'static/'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 TEST_RUNNER = 'llmApp.tests.test_runner.NoDbTestRunner'
+
+# LLM provider used by the generation commands unless --provider is given
+
+LLM_PROVIDER = os.getenv('LLM_PROVIDER', 'gemini')
+
+# Gemini API root; point it at a proxy or the benchmark's mock server
+GEMINI_BASE_URL = os.getenv('GEMINI_BASE_URL', 'https://generativelanguage.googleapis.com/v1beta/models')
+
+# Local Ollama server
+
+OLLAMA_HOST = os.getenv('OLLAMA_HOST', OLLAMA_HOST)
+OLLAMA_MODEL = os.getenv('OLLAMA_MODEL', 'llama3.2')
+OLLAMA_KEEP_ALIVE = os.getenv('OLLAMA_KEEP_ALIVE', '30m')
+OLLAMA_NUM_CTX = int(os.getenv('OLLAMA_NUM_CTX', 4096))
+OLLAMA_NUM_PREDICT = int(os.getenv('OLLAMA_NUM_PREDICT', 512))
+OLLAMA_STREAM = os.getenv('OLLAMA_STREAM', 'true').lower() == 'true'
+
+# LLM requests: timeouts in seconds, retries with jittered exponential backoff
+
+LLM_CONNECT_TIMEOUT = float(os.getenv('LLM_CONNECT_TIMEOUT', 5))
+LLM_READ_TIMEOUT = float(os.getenv('LLM_READ_TIMEOUT', 120))
+LLM_MAX_RETRIES = int(os.getenv('LLM_MAX_RETRIES', 5))
+LLM_BACKOFF_BASE = float(os.getenv('LLM_BACKOFF_BASE', 1))
+LLM_BACKOFF_MAX = float(os.getenv('LLM_BACKOFF_MAX', 60))
+# Stream single-hotel responses (Gemini streamGenerateContent, Ollama NDJSON)
+# so titles can stop at the first line and time to first token is recorded
+LLM_STREAM = os.getenv('LLM_STREAM', 'false').lower() == 'true'
+# Request titles and reviews as JSON under a responseSchema
+LLM_STRUCTURED_OUTPUT = os.getenv('LLM_STRUCTURED_OUTPUT', 'true').lower() == 'true'
+# Send identical prompts once per run and share the response; this many
+# finished responses are remembered for later duplicates
+LLM_DEDUPLICATE = os.getenv('LLM_DEDUPLICATE', 'true').lower() == 'true'
+LLM_DEDUP_MAX_RESULTS = int(os.getenv('LLM_DEDUP_MAX_RESULTS', 10000))
+
+# Stop sending after this many provider failures in a row (0 disables),
+# then let one probe through every LLM_BREAKER_RESET_SECONDS
+LLM_BREAKER_FAILURES = int(os.getenv('LLM_BREAKER_FAILURES', 5))
+LLM_BREAKER_RESET_SECONDS = float(os.getenv('LLM_BREAKER_RESET_SECONDS', 30))
+# Hedged requests: resend a non-streamed request that is slower than the
+# LLM_HEDGE_QUANTILE of the last LLM_HEDGE_WINDOW latencies; the first
+# answer wins. Off by default, since a hedge is a second paid call.
+LLM_HEDGE = os.getenv('LLM_HEDGE', 'false').lower() == 'true'
+LLM_HEDGE_QUANTILE = float(os.getenv('LLM_HEDGE_QUANTILE', 0.95))
+LLM_HEDGE_WINDOW = int(os.getenv('LLM_HEDGE_WINDOW', 200))
+LLM_HEDGE_MIN_SAMPLES = int(os.getenv('LLM_HEDGE_MIN_SAMPLES', 20))
+LLM_HEDGE_MIN_DELAY = float(os.getenv('LLM_HEDGE_MIN_DELAY', 0.5))
+
+# Shared LLM quota. Every command and container that mounts LLM_RATE_LIMIT_FILE
+# draws from the same requests/tokens per minute buckets; 0 disables a limit.
+
+LLM_REQUESTS_PER_MINUTE = int(os.getenv('LLM_REQUESTS_PER_MINUTE', 60))
+LLM_TOKENS_PER_MINUTE = int(os.getenv('LLM_TOKENS_PER_MINUTE', 1000000))
+LLM_RATE_LIMIT_BURST_SECONDS = float(os.getenv('LLM_RATE_LIMIT_BURST_SECONDS', 1))
+LLM_RATE_LIMIT_FILE = os.getenv('LLM_RATE_LIMIT_FILE', str(BASE_DIR / '.llm_rate_limit'))
+LLM_EXPECTED_OUTPUT_TOKENS = int(os.getenv('LLM_EXPECTED_OUTPUT_TOKENS', 512))
+
+# Token limits per task: the prompt budget its free text (titles,
+# descriptions) is trimmed to, and the maxOutputTokens of each response,
+# e.g. LLM_MAX_OUTPUT_TOKENS_SUMMARIES=200; 0 disables a limit. Prompts are
+# measured with a local estimate, or Gemini's countTokens with
+# LLM_TOKEN_COUNTER=api.
+
+LLM_MAX_INPUT_TOKENS = {
+    task: int(os.getenv(f'LLM_MAX_INPUT_TOKENS_{task.upper()}', default))
+    for task, default in (('titles', 256), ('descriptions', 256), ('summaries', 1024), ('reviews', 256))
+}
+LLM_MAX_OUTPUT_TOKENS = {
+    task: int(os.getenv(f'LLM_MAX_OUTPUT_TOKENS_{task.upper()}', default))
+    for task, default in (('titles', 64), ('descriptions', 1024), ('summaries', 256), ('reviews', 512))
+}
+LLM_TOKEN_COUNTER = os.getenv('LLM_TOKEN_COUNTER', 'estimate')
+
+# Hotels whose job failed this many times are no longer picked up
+LLM_MAX_ATTEMPTS = int(os.getenv('LLM_MAX_ATTEMPTS', 5))
+# How long a --worker owns the hotels it claimed before others may reclaim them
+LLM_LEASE_SECONDS = int(os.getenv('LLM_LEASE_SECONDS', 600))
+
+# Persistent prompt -> response cache (SQLite), with age and size based eviction
+
+LLM_CACHE_PATH = os.getenv('LLM_CACHE_PATH', str(BASE_DIR / '.llm_cache.sqlite3'))
+LLM_CACHE_MAX_AGE_DAYS = float(os.getenv('LLM_CACHE_MAX_AGE_DAYS', 30))
+LLM_CACHE_MAX_MB = int(os.getenv('LLM_CACHE_MAX_MB', 512))
+
+# Cache of the /api/hotels content responses. The generation commands drop
+# a hotel's entry when they write its content, so the web server and the
+# commands must share the backend: a directory both mount, or e.g.
+# django.core.cache.backends.redis.RedisCache with a redis:// location
+
+CONTENT_CACHE_TIMEOUT = int(os.getenv('CONTENT_CACHE_TIMEOUT', 3600))
+CONTENT_API_MAX_IDS = int(os.getenv('CONTENT_API_MAX_IDS', 100))
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'content': {
+        'BACKEND': os.getenv('CONTENT_CACHE_BACKEND', 'django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': os.getenv('CONTENT_CACHE_LOCATION', str(BASE_DIR / '.content_cache')),
+        'TIMEOUT': CONTENT_CACHE_TIMEOUT,
+    },
+}
+
+# Metrics shared between the commands and the /metrics endpoint; every
+# process adds its counts to this file (empty to keep metrics in-process)
+LLM_METRICS_FILE = os.getenv('LLM_METRICS_FILE', str(BASE_DIR / '.llm_metrics.json'))
@@ -17,6 +17,11 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path
 
+from llmApp import views
+
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('metrics', views.metrics, name='metrics'),
+    path('api/hotels/content', views.hotels_content, name='hotels-content'),
+    path('api/hotels/<str:hotel_id>/content', views.hotel_content, name='hotel-content'),
 ]
@@ -1,20 +1,113 @@
 from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connections
+from django.db.models.functions import Left
+from django.utils.functional import cached_property
+
 from .models import Hotel, PropertySummary, PropertyReview
+from .querysets import estimated_count
+
+# Changelists above this many rows (by the planner's estimate) show the
+# estimate instead of running COUNT(*)
+EXACT_COUNT_LIMIT = 10000
+# Characters of long text columns shown in a changelist
+PREVIEW_CHARS = 100
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that trusts the query planner's row estimate on big results,
+    so paging through millions of rows never waits for an exact count
+    """
+    @cached_property
+    def count(self):
+        if connections[self.object_list.db].vendor == 'postgresql':
+            try:
+                estimate = estimated_count(self.object_list)
+            except (DatabaseError, LookupError, TypeError, ValueError):
+                # No usable plan: fall back to the exact count
+                estimate = 0
+            if estimate > EXACT_COUNT_LIMIT:
+                return estimate
+        return super().count
+
+
+def preview(field):
+    """
+    Changelist column showing the first PREVIEW_CHARS characters of a text
+    field, cut in the database; get_queryset annotates ``<field>_preview``
+    with one character more, so a cut text can be told from one that fits
+    """
+    @admin.display(description=field)
+    def column(self, obj):
+        text = getattr(obj, f'{field}_preview')
+        if text and len(text) > PREVIEW_CHARS:
+            return text[:PREVIEW_CHARS] + '…'
+        return text
+    return column
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """
+    Changelist settings for tables with millions of rows: estimated counts,
+    no second COUNT(*) for the unfiltered total, long text cut short and
+    deferred so a page never loads whole descriptions or reviews
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    # Text fields shown as previews, loaded in full only on the change form
+    preview_fields = ()
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        if self.preview_fields:
+            queryset = queryset.annotate(**{
+                f'{field}_preview': Left(field, PREVIEW_CHARS + 1) for field in self.preview_fields
+            }).defer(*self.preview_fields)
+        return queryset
+
 
 @admin.register(Hotel)
-class HotelAdmin(admin.ModelAdmin):
-    list_display = ('property_title', 'description', 'city_name', "hotel_id",'price','rating','address','latitude','longitude','room_type','image','local_image_path')
-    search_fields = ('property_title', 'city_name', 'address')
+class HotelAdmin(LargeTableAdmin):
+    list_display = ('property_title', 'description_preview', 'city_name', "hotel_id",'price','rating','address','latitude','longitude','room_type','image','local_image_path')
+    # Exact hotel_id through its unique index, title prefixes through
+    # hotels_property_title_prefix
+    search_fields = ('hotel_id__exact', 'property_title__istartswith')
     list_filter = ('city_name', 'rating')
+    preview_fields = ('description',)
+    description_preview = preview('description')
+
+
+class HotelContentAdmin(LargeTableAdmin):
+    """
+    Summaries and reviews: the hotel is joined in the page query, and
+    picked by id on the change form instead of from a list of every hotel
+    """
+    list_select_related = ('property',)
+    raw_id_fields = ('property',)
+    # property__hotel_id is the property_id column itself
+    search_fields = ('property__hotel_id__exact', 'property__property_title__istartswith')
+
+    def get_queryset(self, request):
+        # Only the hotel's title is shown
+        return super().get_queryset(request).defer('property__description', 'property__address')
+
+    @admin.display(description='property', ordering='property__property_title')
+    def property_title(self, obj):
+        return obj.property.property_title
+
 
 @admin.register(PropertySummary)
-class PropertySummaryAdmin(admin.ModelAdmin):
-    list_display = ('property', 'summary', 'created_at', 'updated_at')
-    search_fields = ('property_title', 'summary')
+class PropertySummaryAdmin(HotelContentAdmin):
+    list_display = ('property_title', 'summary_preview', 'created_at', 'updated_at')
     list_filter = ('created_at', 'updated_at')
+    preview_fields = ('summary',)
+    summary_preview = preview('summary')
+
 
 @admin.register(PropertyReview)
-class PropertyReviewAdmin(admin.ModelAdmin):
-    list_display = ('property', 'rating', 'review','created_at')
-    search_fields = ('property_title', 'review')
-    list_filter = ('rating', 'created_at')
\ No newline at end of file
+class PropertyReviewAdmin(HotelContentAdmin):
+    list_display = ('property_title', 'rating', 'review_preview','created_at')
+    list_filter = ('rating', 'created_at')
+    preview_fields = ('review',)
+    review_preview = preview('review')
@@ -0,0 +1,87 @@
+# llmApp/content.py
+import hashlib
+import json
+from typing import Dict, Iterable, List
+
+from django.core.cache import caches
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Prefetch
+
+from llmApp.models import GenerationJob, Hotel, PropertyReview, PropertySummary
+
+CACHE_ALIAS = 'content'
+
+
+def cache_key(hotel_id: str) -> str:
+    return f"hotel-content:{hotel_id}"
+
+
+def content_cache():
+    return caches[CACHE_ALIAS]
+
+
+def load_content(hotel_ids: Iterable[str]) -> Dict[str, dict]:
+    """
+    {hotel_id: entry} for the hotels that exist: their generated content
+    read with one query per table however many hotels are asked for. An
+    entry is the JSON ``data``, its ``etag`` and its ``last_modified``
+    timestamp (None if nothing was generated yet).
+    """
+    hotels = Hotel.objects.filter(hotel_id__in=list(hotel_ids)).only(
+        'hotel_id', 'property_title', 'description'
+    ).prefetch_related(
+        Prefetch('summaries', queryset=PropertySummary.objects.order_by('-updated_at', '-id')),
+        Prefetch('reviews', queryset=PropertyReview.objects.order_by('-updated_at', '-id')),
+        Prefetch(
+            'generation_jobs',
+            queryset=GenerationJob.objects.filter(status=GenerationJob.SUCCEEDED).only('hotel_id', 'finished_at'),
+        ),
+    )
+    return {hotel.hotel_id: make_entry(hotel) for hotel in hotels}
+
+
+def make_entry(hotel) -> dict:
+    summaries = list(hotel.summaries.all())
+    reviews = list(hotel.reviews.all())
+    data = {
+        'hotel_id': hotel.hotel_id,
+        'title': hotel.property_title,
+        'description': hotel.description,
+        'summary': summaries[0].summary if summaries else None,
+        'reviews': [
+            {'rating': review.rating, 'review': review.review, 'updated_at': review.updated_at}
+            for review in reviews
+        ],
+    }
+    body = json.dumps(data, cls=DjangoJSONEncoder, sort_keys=True)
+    # Titles and descriptions carry no timestamp of their own; their jobs do
+    changes = [row.updated_at for row in summaries + reviews]
+    changes += [job.finished_at for job in hotel.generation_jobs.all() if job.finished_at]
+    return {
+        'data': json.loads(body),
+        'etag': hashlib.md5(body.encode()).hexdigest(),
+        'last_modified': max(changes).timestamp() if changes else None,
+    }
+
+
+def get_content(hotel_ids: List[str]) -> Dict[str, dict]:
+    """
+    Entries for ``hotel_ids`` from the content cache, loading and caching
+    the ones that are missing
+    """
+    cache = content_cache()
+    keys = {cache_key(hotel_id): hotel_id for hotel_id in hotel_ids}
+    entries = {keys[key]: entry for key, entry in cache.get_many(list(keys)).items()}
+    missing = [hotel_id for hotel_id in hotel_ids if hotel_id not in entries]
+    if missing:
+        loaded = load_content(missing)
+        cache.set_many({cache_key(hotel_id): entry for hotel_id, entry in loaded.items()})
+        entries.update(loaded)
+    return entries
+
+
+def invalidate_content(hotel_ids: Iterable[str]):
+    """
+    Drop the cached content of hotels whose content was just written
+    """
+    content_cache().delete_many([cache_key(hotel_id) for hotel_id in hotel_ids])
@@ -0,0 +1,235 @@
+# llmApp/jobs.py
+from datetime import timedelta
+from typing import Dict, Iterable, List, Set
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, Exists, F, OuterRef, Q, Subquery, TextField, Value, When
+from django.db.models.functions import MD5, Cast, Concat, Greatest
+from django.utils import timezone
+
+from llmApp.models import GenerationJob, Hotel
+
+
+def input_fingerprint(fields: Iterable[str], salt: str, prefix: str = ''):
+    """
+    Database expression hashing the ``fields`` of a hotel together with
+    ``salt`` (task, prompt version and model). Computed by the database both
+    when a job finishes and when looking for stale jobs, so the two always
+    agree. ``prefix`` reaches the hotel through a relation, e.g. 'hotel__'.
+    """
+    parts = [Value(salt)]
+    for field in fields:
+        parts += [Value('\x1f'), Cast(prefix + field, output_field=TextField())]
+    return MD5(Concat(*parts, output_field=TextField()) if len(parts) > 1 else parts[0])
+
+
+def finished_jobs(task: str):
+    """
+    Jobs that need no more work: succeeded, or failed too often to retry
+    """
+    return GenerationJob.objects.filter(task=task).filter(
+        Q(status=GenerationJob.SUCCEEDED)
+        | Q(status=GenerationJob.FAILED, attempts__gte=settings.LLM_MAX_ATTEMPTS)
+    )
+
+
+def fresh_jobs(task: str, fingerprint):
+    """
+    Finished jobs whose stored fingerprint still matches the hotel's current
+    inputs; ``fingerprint`` must reach the hotel through 'hotel__'
+    """
+    return finished_jobs(task).alias(current_hash=fingerprint).filter(input_hash=F('current_hash'))
+
+
+def finished_pairs(hotel_ids: Iterable[str], tasks: Iterable[str], fingerprints: Dict[str, object] = None) -> Set[tuple]:
+    """
+    (hotel_id, task) pairs among ``hotel_ids`` x ``tasks`` that are finished.
+    Tasks with an entry in ``fingerprints`` only count fresh jobs as finished.
+    """
+    fingerprints = fingerprints or {}
+    finished = set()
+    for task in tasks:
+        jobs = fresh_jobs(task, fingerprints[task]) if task in fingerprints else finished_jobs(task)
+        finished.update(jobs.filter(hotel_id__in=list(hotel_ids)).values_list('hotel_id', 'task'))
+    return finished
+
+
+def exclude_finished(queryset, task: str, fingerprint=None):
+    """
+    Restrict a Hotel queryset to hotels whose ``task`` job is not finished,
+    or with a ``fingerprint``, not finished for the hotel's current inputs
+    """
+    jobs = fresh_jobs(task, fingerprint) if fingerprint is not None else finished_jobs(task)
+    return queryset.filter(~Exists(jobs.filter(hotel_id=OuterRef('hotel_id'))))
+
+
+def tracked_pairs(hotel_ids: Iterable[str], tasks: Iterable[str]) -> Set[tuple]:
+    """
+    (hotel_id, task) pairs among ``hotel_ids`` x ``tasks`` with a job in
+    any state
+    """
+    jobs = GenerationJob.objects.filter(hotel_id__in=list(hotel_ids), task__in=list(tasks))
+    return set(jobs.values_list('hotel_id', 'task'))
+
+
+def exclude_untracked(queryset, task: str, existing):
+    """
+    Drop from a Hotel queryset the hotels matching ``existing`` (they
+    already have the content) that have no ``task`` job. Such content
+    predates the ledger and has no fingerprint to call it stale by, so
+    --incremental leaves it alone.
+    """
+    jobs = GenerationJob.objects.filter(task=task, hotel_id=OuterRef('hotel_id'))
+    return queryset.exclude(existing, ~Exists(jobs))
+
+
+def _ensure_jobs(task: str, hotel_ids):
+    GenerationJob.objects.bulk_create(
+        [GenerationJob(hotel_id=hotel_id, task=task) for hotel_id in hotel_ids],
+        ignore_conflicts=True,
+    )
+
+
+def start_jobs(task: str, hotel_ids: Iterable[str]):
+    """
+    Mark the jobs as in progress and count the attempt; a job that succeeded
+    before and is regenerated because its inputs changed starts counting anew
+    """
+    hotel_ids = list(hotel_ids)
+    if not hotel_ids:
+        return
+    now = timezone.now()
+    _ensure_jobs(task, hotel_ids)
+    GenerationJob.objects.filter(task=task, hotel_id__in=hotel_ids).update(
+        status=GenerationJob.IN_PROGRESS,
+        attempts=Case(When(status=GenerationJob.SUCCEEDED, then=Value(1)), default=F('attempts') + 1),
+        started_at=now,
+        updated_at=now,
+    )
+
+
+def claim_jobs(task: str, hotels, limit: int, owner: str, since=None, lease_seconds: int = None) -> List[str]:
+    """
+    Atomically lease up to ``limit`` of the ``hotels`` (a pending Hotel
+    queryset) to ``owner`` and return their hotel_ids.
+
+    Job rows are locked with FOR UPDATE SKIP LOCKED, so concurrent workers
+    each get a different set without waiting on one another. Hotels whose
+    lease is held by someone else are left alone; an expired lease (a worker
+    that died) is claimed again. Jobs that failed after ``since`` (usually
+    the worker's start) wait for a later run rather than being retried in a
+    loop. Returns [] once nothing is left to claim.
+    """
+    lease_seconds = settings.LLM_LEASE_SECONDS if lease_seconds is None else lease_seconds
+    while True:
+        now = timezone.now()
+        failed_recently = Q(status=GenerationJob.FAILED, finished_at__gte=since or now)
+        busy = GenerationJob.objects.filter(task=task, hotel_id=OuterRef('hotel_id')).filter(
+            Q(lease_expires_at__gt=now) | failed_recently
+        )
+        # Look a little further than ``limit`` so workers racing for the
+        # same hotels still find unlocked ones
+        candidates = list(
+            hotels.filter(~Exists(busy)).order_by('pk').values_list('hotel_id', flat=True)[:limit * 4]
+        )
+        if not candidates:
+            return []
+        _ensure_jobs(task, candidates)
+
+        with transaction.atomic():
+            claimed = list(
+                GenerationJob.objects.select_for_update(skip_locked=True)
+                .filter(task=task, hotel_id__in=candidates)
+                .filter(Q(lease_expires_at__isnull=True) | Q(lease_expires_at__lte=now))
+                # Finished by another worker since the candidates were read
+                .exclude(Q(finished_at__gte=now) | failed_recently)
+                .order_by('hotel_id')
+                .values_list('hotel_id', flat=True)[:limit]
+            )
+            GenerationJob.objects.filter(task=task, hotel_id__in=claimed).update(
+                status=GenerationJob.IN_PROGRESS,
+                attempts=Case(When(status=GenerationJob.SUCCEEDED, then=Value(1)), default=F('attempts') + 1),
+                lease_owner=owner,
+                lease_expires_at=now + timedelta(seconds=lease_seconds),
+                started_at=now,
+                updated_at=now,
+            )
+        if claimed:
+            return claimed
+        # Every candidate was taken by other workers meanwhile; look again
+
+
+def release_jobs(task: str, hotel_ids: Iterable[str]):
+    """
+    Hand back started jobs that were never sent, e.g. when a run stops early:
+    they become pending again, the attempt uncounted and the lease dropped
+    """
+    hotel_ids = list(hotel_ids)
+    if not hotel_ids:
+        return
+    GenerationJob.objects.filter(task=task, hotel_id__in=hotel_ids, status=GenerationJob.IN_PROGRESS).update(
+        status=GenerationJob.PENDING,
+        attempts=Greatest(F('attempts') - 1, Value(0)),
+        lease_owner='',
+        lease_expires_at=None,
+        updated_at=timezone.now(),
+    )
+
+
+def lock_unfinished(task: str, hotel_ids: Iterable[str]) -> Set[str]:
+    """
+    Lock the jobs of ``hotel_ids`` for the current transaction and return the
+    ids that haven't succeeded yet, so a result is written at most once even
+    when two runs race on the same hotel
+    """
+    hotel_ids = list(hotel_ids)
+    _ensure_jobs(task, hotel_ids)
+    succeeded = set(
+        GenerationJob.objects.select_for_update()
+        .filter(task=task, hotel_id__in=hotel_ids, status=GenerationJob.SUCCEEDED)
+        .values_list('hotel_id', flat=True)
+    )
+    return set(hotel_ids) - succeeded
+
+
+def finish_jobs(task: str, hotel_ids: Iterable[str], fingerprint=None):
+    """
+    Mark the jobs as succeeded and store the fingerprint of the inputs they
+    were generated from; ``fingerprint`` is relative to Hotel
+    """
+    hotel_ids = list(hotel_ids)
+    if not hotel_ids:
+        return
+    now = timezone.now()
+    _ensure_jobs(task, hotel_ids)
+    changes = {}
+    if fingerprint is not None:
+        changes['input_hash'] = Subquery(
+            Hotel.objects.filter(hotel_id=OuterRef('hotel_id')).annotate(fingerprint=fingerprint).values('fingerprint')[:1]
+        )
+    GenerationJob.objects.filter(task=task, hotel_id__in=hotel_ids).update(
+        status=GenerationJob.SUCCEEDED,
+        last_error='',
+        lease_owner='',
+        lease_expires_at=None,
+        finished_at=now,
+        updated_at=now,
+        **changes,
+    )
+
+
+def fail_jobs(task: str, errors: Dict[str, str]):
+    """
+    Record the failure of each hotel's job; ``errors`` maps hotel_id to the error text
+    """
+    now = timezone.now()
+    for hotel_id, error in errors.items():
+        GenerationJob.objects.filter(task=task, hotel_id=hotel_id).update(
+            status=GenerationJob.FAILED,
+            last_error=error,
+            lease_owner='',
+            lease_expires_at=None,
+            finished_at=now,
+            updated_at=now,
+        )
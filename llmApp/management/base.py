@@ -0,0 +1,519 @@
+# llmApp/management/base.py
+import asyncio
+import os
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from asgiref.sync import sync_to_async
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from llmApp.content import invalidate_content
+from llmApp.jobs import (
+    claim_jobs,
+    exclude_finished,
+    exclude_untracked,
+    fail_jobs,
+    finish_jobs,
+    input_fingerprint,
+    lock_unfinished,
+    release_jobs,
+    start_jobs,
+)
+from llmApp.querysets import aiter_batches, estimated_count, only_fields
+from llmApp.services import metrics
+from llmApp.services.providers import PROVIDERS, get_llm_service
+from llmApp.services.transport import track_call
+
+
+class GenerationCommand(BaseCommand):
+    """
+    Shared driver for the content generation commands.
+
+    Subclasses select the hotels to process, describe how one hotel is
+    generated and how a batch of results is written. This class keeps up to
+    ``--concurrency`` requests in flight on one event loop, reads hotels
+    through the async ORM and hands results to a writer task that saves
+    them ``--batch-size`` hotels per transaction while the next requests
+    run. Throttling is left to the service's shared rate limiter.
+
+    Every hotel's progress is recorded in the GenerationJob ledger under
+    ``task``, so finished hotels are skipped on the next run and a result
+    is never written twice. Each finished job also stores a fingerprint of
+    the hotel's ``input_fields``, ``prompt_version`` and the model, so
+    ``--incremental`` runs regenerate only content whose inputs changed;
+    content that has no job, written before the ledger, is kept.
+    With ``--worker``, batches are leased from the ledger instead, so any
+    number of copies can share the work. ``--max-tokens-per-run`` stops
+    sending once the provider reported that many tokens and hands the
+    unsent hotels back to the ledger.
+    """
+    # Name of this command's work in the job ledger and batch files, e.g. 'descriptions'
+    task = None
+    found_message = "Found {total} hotels to process"
+    # Hotel columns the prompt and the save need; None loads every column
+    fields = None
+    # Commands that implement generate_packed get a --pack option
+    supports_packing = False
+    # Commands that read their hotels in keyset batches get a --worker option
+    supports_workers = True
+    # Commands that count the hotels to process up front get --estimate-count
+    counts_hotels = True
+    # Hotel columns the prompt is built from, and the prompt's version; a
+    # change to either makes the hotel's content stale for --incremental
+    input_fields = ()
+    prompt_version = 1
+    # Model the content is generated with, set once the service is known
+    model = None
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=2,
+            help='Number of hotels to fetch and to write per transaction'
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=1,
+            help='Number of requests to keep in flight at the same time'
+        )
+        parser.add_argument(
+            '--provider',
+            choices=sorted(PROVIDERS),
+            help='LLM provider to use (default: settings.LLM_PROVIDER)'
+        )
+        parser.add_argument(
+            '--no-cache',
+            action='store_true',
+            help='Neither read nor write the persistent response cache'
+        )
+        parser.add_argument(
+            '--refresh-cache',
+            action='store_true',
+            help='Ignore cached responses but store the new ones'
+        )
+        parser.add_argument(
+            '--incremental',
+            action='store_true',
+            help='Regenerate existing content whose inputs, prompt or model changed'
+        )
+        parser.add_argument(
+            '--max-tokens-per-run',
+            type=int,
+            help='Stop sending requests once the provider reported this many tokens'
+        )
+        if self.counts_hotels:
+            parser.add_argument(
+                '--estimate-count',
+                action='store_true',
+                help="Report the planner's estimate of the hotels to process instead of counting them"
+            )
+        if self.supports_workers:
+            parser.add_argument(
+                '--worker',
+                action='store_true',
+                help='Lease batches from the job ledger so several workers can run side by side'
+            )
+        if self.supports_packing:
+            parser.add_argument(
+                '--pack',
+                type=int,
+                default=1,
+                help='Number of hotels to send in a single request'
+            )
+
+    def get_queryset(self, **options):
+        raise NotImplementedError
+
+    def existing_content(self):
+        """
+        Condition on Hotel matching hotels that already have this command's
+        content, or None if there is no telling (every hotel has a title)
+        """
+        return None
+
+    def skip_finished(self) -> bool:
+        """
+        Whether hotels whose job already succeeded are left alone
+        """
+        return self.task is not None and not self.options.get('force')
+
+    def fingerprint(self, prefix=''):
+        """
+        Database expression for the fingerprint of a hotel's current inputs
+        """
+        salt = f"{self.task}:{self.prompt_version}:{self.model or ''}"
+        return input_fingerprint(self.input_fields, salt, prefix)
+
+    def get_pending_queryset(self, **options):
+        """
+        ``get_queryset`` minus the hotels the job ledger marks as finished;
+        with --incremental, minus those finished for their current inputs and
+        those whose existing content has no job
+        """
+        queryset = self.get_queryset(**options)
+        if self.skip_finished():
+            incremental = options.get('incremental')
+            fingerprint = self.fingerprint('hotel__') if incremental else None
+            queryset = exclude_finished(queryset, self.task, fingerprint)
+            existing = self.existing_content()
+            if incremental and existing is not None:
+                queryset = exclude_untracked(queryset, self.task, existing)
+        return queryset
+
+    def build_prompt(self, service, hotel) -> str:
+        """
+        The single-hotel prompt, as sent by ``generate``
+        """
+        raise NotImplementedError
+
+    def parse_response(self, service, text):
+        """
+        Turn the raw response text for ``build_prompt`` into a result, or None
+        """
+        return text.strip() if text and text.strip() else None
+
+    async def generate(self, service, hotel):
+        """
+        Return the generated result for a hotel, or None if nothing was generated
+        """
+        raise NotImplementedError
+
+    async def generate_packed(self, service, hotels):
+        """
+        Return one result (or None) per hotel, in order, from a single request
+        """
+        raise NotImplementedError
+
+    def write_batch(self, items):
+        """
+        Write a list of (hotel, result) pairs; called inside a transaction
+        """
+        raise NotImplementedError
+
+    def success_message(self, hotel, result) -> str:
+        return f"Processed hotel {hotel.id}"
+
+    def handle(self, *args, **kwargs):
+        self.options = kwargs
+        batch_size = kwargs['batch_size']
+        concurrency = kwargs['concurrency']
+        pack = kwargs.get('pack', 1)
+        if batch_size < 1 or concurrency < 1 or pack < 1:
+            raise CommandError("--batch-size, --concurrency and --pack must be positive")
+        if kwargs.get('max_tokens_per_run') is not None and kwargs['max_tokens_per_run'] < 1:
+            raise CommandError("--max-tokens-per-run must be positive")
+        if kwargs.get('worker') and not self.skip_finished():
+            raise CommandError("--worker relies on the job ledger and cannot be combined with --force")
+
+        self.service = service = self.get_service(**kwargs)
+        self.model = service.model
+
+        hotels = self.get_pending_queryset(**kwargs)
+        if kwargs.get('estimate_count'):
+            total_hotels = f"about {estimated_count(hotels)}"
+        else:
+            total_hotels = hotels.count()
+
+        self.stdout.write(self.found_message.format(total=total_hotels))
+
+        metrics.REGISTRY.start_run()
+        try:
+            asyncio.run(self._run(service, hotels, batch_size, concurrency, pack))
+        finally:
+            service.close()
+
+        self.stdout.write(f"LLM calls ({service.model}): {service.counters}")
+        self.write_metrics_summary()
+
+    def write_metrics_summary(self):
+        """
+        Print this run's latency, token, status and queue figures and publish
+        them for the /metrics endpoint
+        """
+        for line in metrics.summary_lines():
+            self.stdout.write(line)
+        metrics.REGISTRY.publish()
+
+    def budget_exhausted(self, service) -> bool:
+        """
+        Whether the run used up --max-tokens-per-run; requests in flight when
+        that happens still finish, so the total may overshoot a little
+        """
+        limit = self.options.get('max_tokens_per_run')
+        if not limit or service.counters.tokens < limit:
+            return False
+        if not getattr(self, 'budget_reached', False):
+            self.budget_reached = True
+            self.stdout.write(self.style.WARNING(
+                f"Token budget of {limit} reached ({service.counters.tokens} used); "
+                "the remaining hotels are left for the next run"
+            ))
+        return True
+
+    async def wait_for_provider(self, service):
+        """
+        Hold new work while the provider's circuit breaker is open, so a
+        failing provider costs the requests in flight rather than every hotel
+        """
+        delay = service.circuit_breaker.retry_in()
+        if delay:
+            self.stdout.write(self.style.WARNING("Provider is failing; holding new requests until it recovers"))
+        while delay:
+            await asyncio.sleep(delay)
+            delay = service.circuit_breaker.retry_in()
+
+    def release_unsent(self, hotels):
+        """
+        Hand hotels that were started but never sent back to the job ledger
+        """
+        if self.task:
+            release_jobs(self.task, [hotel.hotel_id for hotel in hotels])
+
+    def get_service(self, **options):
+        return get_llm_service(
+            options.get('provider'),
+            pool_size=options['concurrency'],
+            use_cache=not options['no_cache'],
+            refresh_cache=options['refresh_cache'],
+        )
+
+    def size_executor(self, concurrency):
+        """
+        The blocking HTTP calls run on the default executor, so size it to
+        the number of requests we want in flight
+        """
+        asyncio.get_running_loop().set_default_executor(
+            ThreadPoolExecutor(max_workers=concurrency)
+        )
+
+    async def _run(self, service, hotels, batch_size, concurrency, pack=1):
+        self.size_executor(concurrency)
+        semaphore = asyncio.Semaphore(concurrency)
+        pending = set()
+        # Finished hotels go to a single writer task that saves them while the
+        # next requests are in flight; the bound holds requests back when the
+        # database can't keep up
+        self._results = asyncio.Queue(maxsize=batch_size * 2)
+        writer = asyncio.create_task(self._write_results(batch_size))
+
+        def release(task):
+            pending.discard(task)
+            semaphore.release()
+            metrics.QUEUE_DEPTH.set(len(pending), task=self.task, queue='in_flight')
+
+        def stop(writer):
+            # Nothing would drain the queue any more, so don't wait on it
+            if not writer.cancelled() and writer.exception() is not None:
+                for task in list(pending):
+                    task.cancel()
+
+        writer.add_done_callback(stop)
+
+        async def dispatch(chunk) -> bool:
+            # Wait for a free slot so the next batch is fetched while
+            # the previous one is still in flight.
+            await semaphore.acquire()
+            await self.wait_for_provider(service)
+            if self.budget_exhausted(service) or writer.done():
+                semaphore.release()
+                return False
+            task = asyncio.create_task(self._process(service, chunk))
+            pending.add(task)
+            task.add_done_callback(release)
+            metrics.QUEUE_DEPTH.set(len(pending), task=self.task, queue='in_flight')
+            return True
+
+        batches = self.batches(hotels, batch_size)
+        batch_number = 0
+        chunk = []
+        while not self.budget_exhausted(service) and not writer.done():
+            batch = await anext(batches, None)
+            if batch is None:
+                break
+            batch_number += 1
+            self.stdout.write(f"Processing batch {batch_number}")
+
+            for index, hotel in enumerate(batch):
+                chunk.append(hotel)
+                if len(chunk) == pack:
+                    if not await dispatch(chunk):
+                        await sync_to_async(self.release_unsent)(chunk + batch[index + 1:])
+                        chunk = []
+                        break
+                    chunk = []
+
+        if chunk and not await dispatch(chunk):
+            await sync_to_async(self.release_unsent)(chunk)
+        outcomes = await asyncio.gather(*pending, return_exceptions=True)
+        if not writer.done():
+            await self._results.put(None)
+        await writer
+        for outcome in outcomes:
+            if isinstance(outcome, Exception):
+                raise outcome
+
+    async def batches(self, hotels, batch_size):
+        """
+        Batches of hotels to generate: leased from the ledger with --worker,
+        otherwise read through the async ORM and started in the ledger
+        """
+        if self.options.get('worker'):
+            claimed = self.claimed_batches(hotels, batch_size)
+            while (batch := await sync_to_async(next)(claimed, None)) is not None:
+                yield batch
+            return
+
+        async for batch in aiter_batches(hotels, batch_size, self.fields):
+            if self.task:
+                await sync_to_async(self.start_batch)(batch)
+            yield batch
+
+    def start_batch(self, hotels):
+        """
+        Mark the hotels' jobs as started; reads hotel_id, which would need a
+        query if it were deferred, so it runs off the event loop
+        """
+        start_jobs(self.task, [hotel.hotel_id for hotel in hotels])
+
+    def claimed_batches(self, hotels, batch_size):
+        """
+        Batches of hotels leased to this worker, until none are left to claim
+        """
+        owner = f"{socket.gethostname()}:{os.getpid()}"
+        started = timezone.now()
+        while True:
+            hotel_ids = claim_jobs(self.task, hotels, batch_size, owner, since=started)
+            if not hotel_ids:
+                return
+            yield list(only_fields(hotels.filter(hotel_id__in=hotel_ids).order_by('pk'), self.fields))
+
+    async def _process(self, service, hotels):
+        try:
+            with track_call(self.task) as call:
+                if len(hotels) == 1:
+                    results = [await self.generate(service, hotels[0])]
+                else:
+                    results = await self.generate_packed(service, hotels)
+        except Exception as e:
+            for hotel in hotels:
+                self.stdout.write(
+                    self.style.ERROR(f"Error processing hotel {hotel.id}: {str(e)}")
+                )
+                await self._results.put((hotel, None, str(e)))
+            return
+
+        for hotel, result in zip(hotels, results):
+            if not result:
+                await self._results.put((hotel, None, "no usable response"))
+                continue
+            message = self.success_message(hotel, result)
+            if call.cached:
+                message += " (cached)"
+            elif call.coalesced:
+                message += " (shared)"
+            elif call.retries:
+                message += f" ({call.retries} retries)"
+            await self._results.put((hotel, result, message))
+
+    async def _write_results(self, batch_size):
+        """
+        Save the (hotel, result, message) items _process queues, batch_size
+        at a time, until the None that ends the run. A None result carries
+        the error of a hotel that failed.
+        """
+        items, failures = [], []
+        while True:
+            item = await self._results.get()
+            if item is not None:
+                hotel, result, message = item
+                if result is None:
+                    failures.append((hotel, message))
+                else:
+                    items.append(item)
+            metrics.QUEUE_DEPTH.set(
+                len(items) + self._results.qsize(), task=self.task, queue='write_buffer'
+            )
+            if item is None or len(items) >= batch_size or len(failures) >= batch_size:
+                await self._flush(items, failures)
+                items, failures = [], []
+            if item is None:
+                return
+
+    async def _flush(self, items, failures):
+        if failures:
+            await sync_to_async(self.record_failures)(failures)
+        if not items:
+            return
+        written, failed = await sync_to_async(self.save_items)(items)
+        # Keep /metrics current during long runs
+        await sync_to_async(metrics.REGISTRY.publish)(min_interval=15)
+        for hotel, result, message in written:
+            self.stdout.write(self.style.SUCCESS(message))
+        for (hotel, result, message), e in failed:
+            self.stdout.write(
+                self.style.ERROR(f"Error processing hotel {hotel.id}: {str(e)}")
+            )
+
+    def save_items(self, items):
+        """
+        Write (hotel, result, message) items in one transaction. If that
+        fails, retry them one at a time so a single bad row doesn't cost the
+        whole batch. Returns the written items and (item, error) failures.
+        """
+        started = time.monotonic()
+        try:
+            return self._save_items(items)
+        finally:
+            metrics.DB_FLUSH_SECONDS.observe(time.monotonic() - started, task=self.task)
+
+    def _save_items(self, items):
+        try:
+            with transaction.atomic():
+                return self._write_items(items), []
+        except Exception as e:
+            if len(items) == 1:
+                failed = [(items[0], e)]
+                self.record_failures([(items[0][0], str(e))])
+                return [], failed
+
+        written, failed = [], []
+        for item in items:
+            try:
+                with transaction.atomic():
+                    written.extend(self._write_items([item]))
+            except Exception as e:
+                failed.append((item, e))
+        self.record_failures([(hotel, str(e)) for (hotel, _, _), e in failed])
+        return written, failed
+
+    def _write_items(self, items):
+        """
+        Write items inside the caller's transaction, dropping hotels that
+        another run finished in the meantime, and close their jobs. The
+        fingerprint is taken after the write, so a rewritten title counts as
+        the title's own input.
+        """
+        if self.skip_finished():
+            unfinished = lock_unfinished(self.task, [hotel.hotel_id for hotel, _, _ in items])
+            items = [item for item in items if item[0].hotel_id in unfinished]
+        if items:
+            hotel_ids = [hotel.hotel_id for hotel, _, _ in items]
+            self.write_batch([(hotel, result) for hotel, result, _ in items])
+            if self.task:
+                finish_jobs(self.task, hotel_ids, self.fingerprint())
+            # The API serves the new content once it is committed
+            transaction.on_commit(partial(invalidate_content, hotel_ids))
+        return items
+
+    def record_failures(self, failures):
+        """
+        Store (hotel, error) pairs in the job ledger
+        """
+        if self.task and failures:
+            fail_jobs(self.task, {hotel.hotel_id: error for hotel, error in failures})
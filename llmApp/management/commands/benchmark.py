@@ -0,0 +1,225 @@
+# llmApp/management/commands/benchmark.py
+import json
+import threading
+import time
+from datetime import datetime, timezone
+from io import StringIO
+
+from django.core.management import call_command, load_command_class
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.test.utils import override_settings
+
+from llmApp.models import GenerationJob, Hotel
+from llmApp.services.mock_server import MockLLMServer
+from llmApp.services.providers import PROVIDERS
+from llmApp.services.rate_limiter import get_rate_limiter
+from llmApp.services.transport import percentile
+
+# Synthetic hotels are recognised, and cleaned up, by this hotel_id prefix
+BENCH_PREFIX = 'bench-'
+COMMANDS = ('rewrite_titles', 'generate_descriptions', 'generate_summaries', 'generate_reviews', 'run_pipeline')
+
+
+class QueryCounter:
+    """
+    Count SQL statements on every database connection, whichever thread opens it
+    """
+    def __init__(self):
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        with self._lock:
+            self.count += 1
+        return execute(sql, params, many, context)
+
+    def install(self, sender=None, connection=None, **kwargs):
+        if self not in connection.execute_wrappers:
+            connection.execute_wrappers.append(self)
+
+    def __enter__(self):
+        connection_created.connect(self.install)
+        for connection in connections.all(initialized_only=True):
+            self.install(connection=connection)
+        return self
+
+    def __exit__(self, *exc):
+        connection_created.disconnect(self.install)
+        for connection in connections.all(initialized_only=True):
+            if self in connection.execute_wrappers:
+                connection.execute_wrappers.remove(self)
+        return False
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure command throughput against a local mock LLM server. Seeds synthetic '
+        f'"{BENCH_PREFIX}*" hotels in the configured database and removes them afterwards'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hotels', type=int, default=200, help='Number of synthetic hotels to seed')
+        parser.add_argument(
+            '--commands',
+            nargs='+',
+            choices=COMMANDS,
+            default=list(COMMANDS),
+            help='Commands to measure (default: all four stages, then the pipeline)'
+        )
+        parser.add_argument('--provider', choices=sorted(PROVIDERS), default='gemini', help='API the mock server speaks')
+        parser.add_argument('--batch-size', type=int, default=50)
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument('--pack', type=int, default=1, help='Hotels per request for commands that pack')
+        parser.add_argument('--stream', action='store_true', help='Stream single-hotel responses')
+        parser.add_argument('--hedge', action='store_true', help='Hedge slow non-streamed requests')
+        parser.add_argument('--latency', type=float, default=0.2, help='Mean mock response time in seconds')
+        parser.add_argument('--jitter', type=float, default=0.05, help='Uniform +/- spread of the response time')
+        parser.add_argument('--rate-429', type=float, default=0.0, help='Share of requests answered with 429')
+        parser.add_argument('--response-chars', type=int, default=600, help='Length of generated prose')
+        parser.add_argument('--seed', type=int, help='Random seed for the mock server')
+        parser.add_argument(
+            '--rate-limit',
+            action='store_true',
+            help='Keep the configured shared rate limit (off by default)'
+        )
+        parser.add_argument('--output', help='Also write the JSON report to this file')
+        parser.add_argument('--keep', action='store_true', help='Leave the synthetic hotels in the database')
+
+    def handle(self, *args, **options):
+        if options['hotels'] < 1:
+            raise CommandError("--hotels must be positive")
+
+        server = MockLLMServer(
+            latency=options['latency'],
+            jitter=options['jitter'],
+            rate_429=options['rate_429'],
+            response_chars=options['response_chars'],
+            seed=options['seed'],
+        )
+        overrides = {
+            'GEMINI_BASE_URL': f"{server.url}/v1beta/models",
+            'OLLAMA_HOST': server.url,
+            'LLM_STREAM': options['stream'],
+            'LLM_HEDGE': options['hedge'],
+            'LLM_METRICS_FILE': '',
+        }
+        if not options['rate_limit']:
+            overrides.update(LLM_REQUESTS_PER_MINUTE=0, LLM_TOKENS_PER_MINUTE=0)
+
+        results = []
+        with server, override_settings(**overrides), QueryCounter() as queries:
+            get_rate_limiter.cache_clear()
+            try:
+                self.clean()
+                self.seed(options['hotels'])
+                for name in options['commands']:
+                    if name == 'run_pipeline' and results:
+                        # The pipeline starts from fresh hotels, like the first stage did
+                        self.clean()
+                        self.seed(options['hotels'])
+                    results.append(self.measure(name, options, queries))
+                    self.stderr.write(self.format_result(results[-1]))
+            finally:
+                if not options['keep']:
+                    self.clean()
+                get_rate_limiter.cache_clear()
+
+        report = {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'config': {
+                key: options[key] for key in (
+                    'hotels', 'provider', 'batch_size', 'concurrency', 'pack', 'stream', 'hedge',
+                    'latency', 'jitter', 'rate_429', 'response_chars', 'rate_limit',
+                )
+            },
+            'mock_server': {'requests': server.requests, 'throttled': server.throttled},
+            'results': results,
+        }
+        text = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                f.write(text + '\n')
+        self.stdout.write(text)
+
+    def seed(self, count):
+        Hotel.objects.bulk_create(
+            [
+                Hotel(
+                    hotel_id=f"{BENCH_PREFIX}{i}",
+                    property_title=f"Benchmark Hotel {i}",
+                    city_name=('Lisbon', 'Osaka', 'Denver', 'Nairobi')[i % 4],
+                    price=50 + i % 300,
+                    rating=3 + (i % 21) / 10,
+                    address=f"{i} Benchmark Street",
+                    latitude=0.0,
+                    longitude=0.0,
+                    room_type=('Double', 'Suite', 'Twin')[i % 3],
+                    image='https://example.com/hotel.jpg',
+                    local_image_path='',
+                )
+                for i in range(count)
+            ],
+            batch_size=1000,
+        )
+
+    def clean(self):
+        # Summaries, reviews and ledger entries go with the hotels
+        Hotel.objects.filter(hotel_id__startswith=BENCH_PREFIX).delete()
+
+    def measure(self, name, options, queries) -> dict:
+        command = load_command_class('llmApp', name)
+        get_queryset = command.get_queryset
+        command.get_queryset = lambda **kwargs: get_queryset(**kwargs).filter(hotel_id__startswith=BENCH_PREFIX)
+
+        command_options = {
+            'batch_size': options['batch_size'],
+            'concurrency': options['concurrency'],
+            'provider': options['provider'],
+            'no_cache': True,
+        }
+        if command.supports_packing:
+            command_options['pack'] = options['pack']
+
+        queries_before = queries.count
+        started = time.perf_counter()
+        call_command(command, stdout=StringIO(), stderr=StringIO(), **command_options)
+        seconds = time.perf_counter() - started
+        db_queries = queries.count - queries_before
+
+        counters = command.service.counters
+        if name == 'run_pipeline':
+            written = sum(command.completed.values())
+        else:
+            written = GenerationJob.objects.filter(
+                task=command.task, hotel_id__startswith=BENCH_PREFIX, status=GenerationJob.SUCCEEDED
+            ).count()
+        result = {
+            'command': name,
+            'written': written,
+            'seconds': round(seconds, 3),
+            'written_per_second': round(written / seconds, 2) if seconds else None,
+            'llm_calls': counters.calls,
+            'retries': counters.retries,
+            'coalesced': counters.coalesced,
+            'hedged': counters.hedges,
+            'failures': counters.failures,
+            'latency_p50': percentile(counters.latencies, 0.5),
+            'latency_p99': percentile(counters.latencies, 0.99),
+            'first_token_p50': percentile(counters.first_tokens, 0.5),
+            'db_queries': db_queries,
+            'db_queries_per_result': round(db_queries / written, 2) if written else None,
+        }
+        for key in ('latency_p50', 'latency_p99', 'first_token_p50'):
+            if result[key] is not None:
+                result[key] = round(result[key], 4)
+        return result
+
+    def format_result(self, result) -> str:
+        return (
+            f"{result['command']}: {result['written']} written in {result['seconds']}s "
+            f"({result['written_per_second']}/s), {result['llm_calls']} calls, "
+            f"p50 {result['latency_p50']}s, p99 {result['latency_p99']}s, "
+            f"{result['db_queries']} queries"
+        )
@@ -0,0 +1,51 @@
+# llmApp/management/commands/export_batch.py
+from django.core.management.base import BaseCommand
+
+from llmApp.querysets import iter_batches
+from llmApp.services.batch import TASK_COMMANDS, load_task_command, request_key, request_line
+from llmApp.services.gemini_service import GeminiService
+
+class Command(BaseCommand):
+    help = 'Write one batch-prediction request per pending hotel to a JSONL file'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--task',
+            required=True,
+            choices=sorted(TASK_COMMANDS),
+            help='Which content to generate'
+        )
+        parser.add_argument(
+            '--output',
+            help='File to write (default: <task>_batch_requests.jsonl)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Number of hotels to read per query'
+        )
+        parser.add_argument(
+            '--incremental',
+            action='store_true',
+            help='Also export hotels whose content is stale because its inputs changed'
+        )
+
+    def handle(self, *args, **kwargs):
+        task = kwargs['task']
+        output = kwargs['output'] or f"{task}_batch_requests.jsonl"
+        command = load_task_command(task, incremental=kwargs['incremental'])
+        service = GeminiService(use_cache=False)
+        command.model = service.model
+
+        hotels = command.get_pending_queryset(**command.options)
+        written = 0
+        with open(output, 'w', encoding='utf-8') as f:
+            for batch in iter_batches(hotels, kwargs['batch_size'], command.fields):
+                for hotel in batch:
+                    prompt = command.build_prompt(service, hotel)
+                    payload = service.build_payload(prompt, service.generation_config(task))
+                    f.write(request_line(request_key(task, hotel.hotel_id), payload))
+                    written += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} {task} requests to {output}"))
@@ -0,0 +1,36 @@
+# llmApp/management/commands/export_content.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from llmApp.transfer import CONTENT, FORMATS, export_content, rate
+
+class Command(BaseCommand):
+    help = 'Stream generated content to a file with COPY, for import_content on another database'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'content',
+            choices=sorted(CONTENT),
+            help='Which content to export'
+        )
+        parser.add_argument(
+            '--format',
+            choices=FORMATS,
+            default='csv',
+            help='COPY format: csv with a header row, or Postgres binary (default: csv)'
+        )
+        parser.add_argument(
+            '--output',
+            help='File to write (default: <content>.csv or <content>.copy)'
+        )
+
+    def handle(self, *args, **kwargs):
+        content, fmt = kwargs['content'], kwargs['format']
+        output = kwargs['output'] or f"{content}.{'csv' if fmt == 'csv' else 'copy'}"
+
+        started = time.perf_counter()
+        with open(output, 'wb') as f:
+            rows = export_content(content, f, fmt)
+
+        self.stdout.write(self.style.SUCCESS(f"Exported {content} to {output}: {rate(rows, started)}"))
@@ -1,56 +1,45 @@
 # llmApp/management/commands/generate_descriptions.py
-from django.core.management.base import BaseCommand
-from django.db import transaction
+from django.db.models import Q
+
+from llmApp.management.base import GenerationCommand
 from llmApp.models import Hotel
-from llmApp.services.gemini_service import GeminiService
-import time
-
-class Command(BaseCommand):
-    help = 'Generate descriptions for hotels using Gemini API'
-
-    def add_arguments(self, parser):
-        parser.add_argument(
-            '--batch-size',
-            type=int,
-            default=2,
-            help='Number of hotels to process in each batch'
-        )
-
-    def handle(self, *args, **kwargs):
-        batch_size = kwargs['batch_size']
-        gemini_service = GeminiService()  
-        
+
+class Command(GenerationCommand):
+    help = 'Generate descriptions for hotels using the selected LLM provider'
+    task = 'descriptions'
+    found_message = "Found {total} hotels without descriptions"
+    fields = ('hotel_id', 'property_title', 'city_name', 'room_type', 'price', 'rating')
+    input_fields = ('property_title', 'city_name', 'room_type', 'price', 'rating')
+
+    def get_queryset(self, **options):
+        if options.get('incremental'):
+            # Every hotel; those with up to date descriptions are dropped by the ledger
+            return Hotel.objects.all()
         # Get hotels without descriptions
-        hotels = Hotel.objects.filter(description__isnull=True)
-        total_hotels = hotels.count()
-        
-        self.stdout.write(f"Found {total_hotels} hotels without descriptions")
-
-        for i in range(0, total_hotels, batch_size):
-            batch = hotels[i:i + batch_size]
-            self.stdout.write(f"Processing batch {i//batch_size + 1}")
-
-            for hotel in batch:
-                try:
-                    with transaction.atomic():
-                        property_data = {
-                            'property_title': hotel.property_title,
-                            'city_name': hotel.city_name,
-                            'room_type': hotel.room_type,
-                            'price': str(hotel.price),
-                            'rating': str(hotel.rating)
-                        }
-                        
-                        description = gemini_service.generate_property_description(property_data)
-                        
-                        if description:
-                            hotel.description = description
-                            hotel.save()
-                            self.stdout.write(
-                                self.style.SUCCESS(f"Generated description for: {hotel.property_title}")
-                            )
-                        time.sleep(1)
-                except Exception as e:
-                    self.stdout.write(
-                        self.style.ERROR(f"Error processing hotel {hotel.id}: {str(e)}")
-                    )
\ No newline at end of file
+        return Hotel.objects.filter(description__isnull=True)
+
+    def existing_content(self):
+        return Q(description__isnull=False)
+
+    def get_property_data(self, hotel):
+        return {
+            'property_title': hotel.property_title,
+            'city_name': hotel.city_name,
+            'room_type': hotel.room_type,
+            'price': str(hotel.price),
+            'rating': str(hotel.rating)
+        }
+
+    def build_prompt(self, service, hotel):
+        return service.description_prompt(self.get_property_data(hotel))
+
+    async def generate(self, service, hotel):
+        return await service.agenerate_property_description(self.get_property_data(hotel))
+
+    def write_batch(self, items):
+        for hotel, description in items:
+            hotel.description = description
+        Hotel.objects.bulk_update([hotel for hotel, _ in items], ['description'])
+
+    def success_message(self, hotel, description):
+        return f"Generated description for: {hotel.property_title}"
@@ -1,77 +1,72 @@
 # llmApp/management/commands/generate_reviews.py
+from django.db.models import Exists, OuterRef
 
-from django.core.management.base import BaseCommand
-from django.db import transaction
+from llmApp.management.base import GenerationCommand
 from llmApp.models import Hotel, PropertyReview
-from llmApp.services.gemini_service import GeminiService
-import time
 
-class Command(BaseCommand):
-    help = 'Generate reviews for hotels using Gemini API'
+class Command(GenerationCommand):
+    help = 'Generate reviews for hotels using the selected LLM provider'
+    task = 'reviews'
+    fields = ('hotel_id', 'property_title', 'city_name', 'price', 'rating')
+    input_fields = ('property_title', 'city_name', 'price', 'rating')
 
     def add_arguments(self, parser):
-        parser.add_argument(
-            '--batch-size',
-            type=int,
-            default=2,
-            help='Number of hotels to process in each batch'
-        )
+        super().add_arguments(parser)
         parser.add_argument(
             '--force',
             action='store_true',
             help='Force regenerate reviews even for hotels that already have them'
         )
 
-    def handle(self, *args, **kwargs):
-        batch_size = kwargs['batch_size']
-        force = kwargs['force']
-        gemini_service = GeminiService() 
-        
+    def get_queryset(self, **options):
         # Get hotels without reviews or all hotels if force is True
-        if force:
-            hotels = Hotel.objects.all()
-        else:
-            hotels = Hotel.objects.exclude(reviews__isnull=False)
-            
-        total_hotels = hotels.count()
-        
-        self.stdout.write(f"Found {total_hotels} hotels to process")
+        if options['force'] or options.get('incremental'):
+            return Hotel.objects.all()
+        reviews = PropertyReview.objects.filter(property_id=OuterRef('hotel_id'))
+        return Hotel.objects.filter(~Exists(reviews))
+
+    def existing_content(self):
+        return Exists(PropertyReview.objects.filter(property_id=OuterRef('hotel_id')))
+
+    def get_property_data(self, hotel):
+        return {
+            'property_title': hotel.property_title,
+            'city_name': hotel.city_name,
+            'price': f"{hotel.price:.2f}" if hotel.price is not None else "N/A",
+            'rating': f"{hotel.rating:.1f}" if hotel.rating is not None else "3.0"  # Default rating
+        }
+
+    def build_prompt(self, service, hotel):
+        return service.review_prompt(self.get_property_data(hotel))
 
-        for i in range(0, total_hotels, batch_size):
-            batch = hotels[i:i + batch_size]
-            self.stdout.write(f"Processing batch {i//batch_size + 1}")
+    def parse_response(self, service, text):
+        rating, review = service.parse_review(text)
+        if rating is not None and review:
+            return rating, review
+        return None
 
-            for hotel in batch:
-                try:
-                    with transaction.atomic():
-                        property_data = {
-                            'property_title': hotel.property_title,
-                            'city_name': hotel.city_name,
-                            'price': f"{hotel.price:.2f}" if hotel.price is not None else "N/A",
-                            'rating': f"{hotel.rating:.1f}" if hotel.rating is not None else "3.0"  # Default rating
-                        }
-                        
-                        rating, review = gemini_service.generate_property_review(property_data)
-                        
-                        if rating is not None and review:
-                            if force:
-                                # Delete existing reviews if force is True
-                                hotel.reviews.all().delete()
-                                
-                            PropertyReview.objects.create(
-                                property=hotel,
-                                rating=rating,
-                                review=review
-                            )
-                            self.stdout.write(
-                                self.style.SUCCESS(
-                                    f"Generated review for: {hotel.property_title}\n"
-                                    f"Rating: {rating}\n"
-                                    f"Review: {review[:100]}..."
-                                )
-                            )
-                        time.sleep(1)
-                except Exception as e:
-                    self.stdout.write(
-                        self.style.ERROR(f"Error processing hotel {hotel.id}: {str(e)}")
-                    )
\ No newline at end of file
+    async def generate(self, service, hotel):
+        rating, review = await service.agenerate_property_review(self.get_property_data(hotel))
+        if rating is not None and review:
+            return rating, review
+        return None
+
+    def write_batch(self, items):
+        if self.options['force'] or self.options.get('incremental'):
+            # Delete existing reviews if force is True or they are stale
+            PropertyReview.objects.filter(
+                property_id__in=[hotel.hotel_id for hotel, _ in items]
+            ).delete()
+
+        PropertyReview.objects.bulk_create([
+            PropertyReview(property=hotel, rating=rating, review=review)
+            for hotel, (rating, review) in items
+        ])
+
+    def success_message(self, hotel, result):
+        rating, review = result
+        return (
+            f"Generated review for: {hotel.property_title}\n"
+            f"Rating: {rating}\n"
+            f"Review: {review[:100]}..."
+        )
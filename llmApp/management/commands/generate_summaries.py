@@ -1,59 +1,59 @@
 # llmApp/management/commands/generate_summaries.py
+from django.db.models import Exists, OuterRef
 
-from django.core.management.base import BaseCommand
-from django.db import transaction
+from llmApp.management.base import GenerationCommand
 from llmApp.models import Hotel, PropertySummary
-from llmApp.services.gemini_service import GeminiService
-import time
-
-class Command(BaseCommand):
-    help = 'Generate summaries for hotels using Gemini API'
-
-    def add_arguments(self, parser):
-        parser.add_argument(
-            '--batch-size',
-            type=int,
-            default=2,
-            help='Number of hotels to process in each batch'
-        )
-
-    def handle(self, *args, **kwargs):
-        batch_size = kwargs['batch_size']
-        gemini_service = GeminiService()  # 2 minute timeout
-        
-        # Modified query to handle hotels with descriptions
-        hotels = Hotel.objects.filter(description__isnull=False).exclude(summaries__isnull=False)
-        total_hotels = hotels.count()
-        
-        self.stdout.write(f"Found {total_hotels} hotels without summaries")
-
-        for i in range(0, total_hotels, batch_size):
-            batch = hotels[i:i + batch_size]
-            self.stdout.write(f"Processing batch {i//batch_size + 1}")
-
-            for hotel in batch:
-                try:
-                    with transaction.atomic():
-                        property_data = {
-                            'property_title': hotel.property_title,
-                            'city_name': hotel.city_name,
-                            'price': f"{hotel.price:.2f}" if hotel.price is not None else "N/A",
-                            'rating': f"{hotel.rating:.1f}" if hotel.rating is not None else "N/A",
-                            'description': hotel.description or "Not available"
-                        }
-                        
-                        summary = gemini_service.generate_property_summary(property_data)
-                        
-                        if summary:
-                            PropertySummary.objects.create(
-                                property=hotel,
-                                summary=summary
-                            )
-                            self.stdout.write(
-                                self.style.SUCCESS(f"Generated summary for: {hotel.property_title}")
-                            )
-                        time.sleep(1)
-                except Exception as e:
-                    self.stdout.write(
-                        self.style.ERROR(f"Error processing hotel {hotel.id}: {str(e)}")
-                    )
\ No newline at end of file
+
+class Command(GenerationCommand):
+    help = 'Generate summaries for hotels using the selected LLM provider'
+    task = 'summaries'
+    found_message = "Found {total} hotels without summaries"
+    fields = ('hotel_id', 'property_title', 'city_name', 'price', 'rating', 'description')
+    supports_packing = True
+    input_fields = ('property_title', 'city_name', 'price', 'rating', 'description')
+
+    def get_queryset(self, **options):
+        if options.get('incremental'):
+            return Hotel.objects.filter(description__isnull=False)
+        # Hotels with a description and no summary, as a NOT EXISTS anti-join
+        summaries = PropertySummary.objects.filter(property_id=OuterRef('hotel_id'))
+        return Hotel.objects.filter(description__isnull=False).filter(~Exists(summaries))
+
+    def existing_content(self):
+        return Exists(PropertySummary.objects.filter(property_id=OuterRef('hotel_id')))
+
+    def get_property_data(self, hotel):
+        return {
+            'property_title': hotel.property_title,
+            'city_name': hotel.city_name,
+            'price': f"{hotel.price:.2f}" if hotel.price is not None else "N/A",
+            'rating': f"{hotel.rating:.1f}" if hotel.rating is not None else "N/A",
+            'description': hotel.description or "Not available"
+        }
+
+    def build_prompt(self, service, hotel):
+        return service.summary_prompt(self.get_property_data(hotel))
+
+    async def generate(self, service, hotel):
+        return await service.agenerate_property_summary(self.get_property_data(hotel))
+
+    async def generate_packed(self, service, hotels):
+        summaries = await service.agenerate_property_summaries({
+            str(hotel.hotel_id): self.get_property_data(hotel) for hotel in hotels
+        })
+        return [summaries.get(str(hotel.hotel_id)) for hotel in hotels]
+
+    def write_batch(self, items):
+        if self.options.get('incremental'):
+            # Replace the stale summaries
+            PropertySummary.objects.filter(
+                property_id__in=[hotel.hotel_id for hotel, _ in items]
+            ).delete()
+
+        PropertySummary.objects.bulk_create([
+            PropertySummary(property=hotel, summary=summary)
+            for hotel, summary in items
+        ])
+
+    def success_message(self, hotel, summary):
+        return f"Generated summary for: {hotel.property_title}"
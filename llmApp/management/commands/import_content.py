@@ -0,0 +1,40 @@
+# llmApp/management/commands/import_content.py
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from llmApp.transfer import CONTENT, FORMATS, import_content, rate
+
+class Command(BaseCommand):
+    help = 'Load a file written by export_content and merge it into the content tables on hotel_id'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'content',
+            choices=sorted(CONTENT),
+            help='Which content the file holds'
+        )
+        parser.add_argument(
+            'input',
+            help='File written by export_content'
+        )
+        parser.add_argument(
+            '--format',
+            choices=FORMATS,
+            default='csv',
+            help='COPY format the file was exported in (default: csv)'
+        )
+
+    def handle(self, *args, **kwargs):
+        content = kwargs['content']
+        started = time.perf_counter()
+        try:
+            with open(kwargs['input'], 'rb') as f:
+                staged, merged = import_content(content, f, kwargs['format'])
+        except OSError as e:
+            raise CommandError(f"Cannot read {kwargs['input']}: {e}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {content}: staged {rate(staged, started)}, "
+            f"merged {merged} into hotels that exist here"
+        ))
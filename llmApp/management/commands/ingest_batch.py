@@ -0,0 +1,117 @@
+# llmApp/management/commands/ingest_batch.py
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from llmApp.jobs import fail_jobs, start_jobs
+from llmApp.models import Hotel
+from llmApp.querysets import only_fields
+from llmApp.services.batch import (
+    TASK_COMMANDS,
+    load_task_command,
+    read_jsonl,
+    response_error,
+    response_text,
+    split_key,
+)
+from llmApp.services.gemini_service import GeminiService
+
+class Command(BaseCommand):
+    help = 'Apply a batch-prediction results file to hotels, summaries and reviews'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'results',
+            help='Results JSONL file, one {"key", "response"} record per line'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Number of results to write per transaction'
+        )
+        parser.add_argument(
+            '--incremental',
+            action='store_true',
+            help='The requests were exported with --incremental: replace existing content'
+        )
+
+    def handle(self, *args, **kwargs):
+        batch_size = kwargs['batch_size']
+        if batch_size < 1:
+            raise CommandError("--batch-size must be positive")
+
+        service = GeminiService(use_cache=False)
+        commands = {}
+        pending = {task: {} for task in TASK_COMMANDS}
+        # {hotel_id: error} of records that carried no usable result
+        failures = {task: {} for task in TASK_COMMANDS}
+        self.counts = {'applied': 0, 'failed': 0, 'skipped': 0}
+
+        for record in read_jsonl(kwargs['results']):
+            task, hotel_id = split_key(record.get('key', ''))
+            if task not in TASK_COMMANDS or not hotel_id:
+                self.counts['skipped'] += 1
+                continue
+            if task not in commands:
+                commands[task] = load_task_command(task, incremental=kwargs['incremental'])
+                commands[task].model = service.model
+
+            result = commands[task].parse_response(service, response_text(record))
+            if result is None:
+                failures[task][hotel_id] = response_error(record)
+                if len(failures[task]) >= batch_size:
+                    self.fail(task, failures[task])
+                    failures[task] = {}
+                continue
+
+            pending[task][hotel_id] = result
+            if len(pending[task]) >= batch_size:
+                self.apply(commands[task], pending[task])
+                pending[task] = {}
+
+        for task, results in pending.items():
+            if results:
+                self.apply(commands[task], results)
+        for task, errors in failures.items():
+            if errors:
+                self.fail(task, errors)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Applied {self.counts['applied']} results, "
+            f"{self.counts['failed']} failed, {self.counts['skipped']} skipped"
+        ))
+
+    def apply(self, command, results):
+        """
+        Write one batch of {hotel_id: result} through the task command's writer
+        """
+        hotels = only_fields(Hotel.objects, command.fields).in_bulk(list(results), field_name='hotel_id')
+        # No hotel row means no job to record the failure on either
+        for hotel_id in set(results) - set(hotels):
+            self.counts['failed'] += 1
+            self.stdout.write(self.style.ERROR(f"Error processing hotel {hotel_id}: no such hotel"))
+
+        items = [
+            (hotel, results[hotel_id], None)
+            for hotel_id, hotel in hotels.items()
+        ]
+        written, failed = command.save_items(items)
+        self.counts['applied'] += len(written)
+        self.counts['failed'] += len(failed)
+        for (hotel, _, _), e in failed:
+            self.stdout.write(self.style.ERROR(f"Error processing hotel {hotel.id}: {str(e)}"))
+
+    def fail(self, task, errors):
+        """
+        Record one batch of {hotel_id: error} as failed attempts in the job
+        ledger, so later runs can tell them from hotels nobody tried
+        """
+        self.counts['failed'] += len(errors)
+        for hotel_id, error in errors.items():
+            self.stdout.write(self.style.ERROR(f"Error processing hotel {hotel_id}: {error}"))
+        known = set(Hotel.objects.filter(hotel_id__in=list(errors)).values_list('hotel_id', flat=True))
+        errors = {hotel_id: error for hotel_id, error in errors.items() if hotel_id in known}
+        if errors:
+            with transaction.atomic():
+                start_jobs(task, errors)
+                fail_jobs(task, errors)
@@ -1,46 +1,35 @@
 # llmApp/management/commands/rewrite_titles.py
-from django.core.management.base import BaseCommand
-from django.db import transaction
+from llmApp.management.base import GenerationCommand
 from llmApp.models import Hotel
-from llmApp.services.gemini_service import GeminiService
-import time
-
-class Command(BaseCommand):
-    help = 'Rewrite property titles using Gemini API'
-
-    def add_arguments(self, parser):
-        parser.add_argument(
-            '--batch-size',
-            type=int,
-            default=2,
-            help='Number of hotels to process in each batch'
-        )
-
-    def handle(self, *args, **kwargs):
-        batch_size = kwargs['batch_size']
-        gemini_service = GeminiService()
-        
-        hotels = Hotel.objects.all()
-        total_hotels = hotels.count()
-        
-        self.stdout.write(f"Found {total_hotels} hotels for title rewriting")
-
-        for i in range(0, total_hotels, batch_size):
-            batch = hotels[i:i + batch_size]
-            self.stdout.write(f"Processing batch {i//batch_size + 1}")
-
-            for hotel in batch:
-                try:
-                    with transaction.atomic():
-                        new_title = gemini_service.rewrite_property_title(hotel)
-                        if new_title:
-                            hotel.property_title = new_title
-                            hotel.save()
-                            self.stdout.write(
-                                self.style.SUCCESS(f"Rewrote title for hotel {hotel.id}: {new_title}")
-                            )
-                        time.sleep(1)  # Rate limiting
-                except Exception as e:
-                    self.stdout.write(
-                        self.style.ERROR(f"Error processing hotel {hotel.id}: {str(e)}")
-                    )
\ No newline at end of file
+
+class Command(GenerationCommand):
+    help = 'Rewrite property titles using the selected LLM provider'
+    task = 'titles'
+    found_message = "Found {total} hotels for title rewriting"
+    fields = ('hotel_id', 'property_title', 'city_name', 'room_type', 'rating')
+    supports_packing = True
+    input_fields = ('property_title', 'city_name', 'room_type', 'rating')
+
+    def get_queryset(self, **options):
+        return Hotel.objects.all()
+
+    def build_prompt(self, service, hotel):
+        return service.title_prompt(hotel)
+
+    def parse_response(self, service, text):
+        return service.parse_title(text)
+
+    async def generate(self, service, hotel):
+        return await service.arewrite_property_title(hotel)
+
+    async def generate_packed(self, service, hotels):
+        titles = await service.arewrite_property_titles(hotels)
+        return [titles.get(str(hotel.hotel_id)) for hotel in hotels]
+
+    def write_batch(self, items):
+        for hotel, new_title in items:
+            hotel.property_title = new_title
+        Hotel.objects.bulk_update([hotel for hotel, _ in items], ['property_title'])
+
+    def success_message(self, hotel, new_title):
+        return f"Rewrote title for hotel {hotel.id}: {new_title}"
@@ -0,0 +1,30 @@
+# llmApp/management/commands/run_batch_locally.py
+from django.core.management.base import BaseCommand
+
+from llmApp.services.batch import read_jsonl, result_line
+from llmApp.services.gemini_service import GeminiService
+
+class Command(BaseCommand):
+    help = 'Local stand-in for the batch API: turn a requests JSONL file into a results file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('requests', help='Requests JSONL file written by export_batch')
+        parser.add_argument('results', help='Results JSONL file to write')
+
+    def handle(self, *args, **kwargs):
+        service = GeminiService()
+        done = errors = 0
+
+        with open(kwargs['results'], 'w', encoding='utf-8') as f:
+            for record in read_jsonl(kwargs['requests']):
+                request = record['request']
+                prompt = request['contents'][0]['parts'][0]['text']
+                text = service._make_request(prompt, request.get('generationConfig'))
+                if text is None:
+                    f.write(result_line(record['key'], error="generation failed"))
+                    errors += 1
+                else:
+                    f.write(result_line(record['key'], text))
+                    done += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Wrote {done} results ({errors} errors) to {kwargs['results']}"))
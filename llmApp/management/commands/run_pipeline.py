@@ -0,0 +1,225 @@
+# llmApp/management/commands/run_pipeline.py
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.core.management.base import CommandError
+
+from llmApp.jobs import finished_pairs, release_jobs, start_jobs, tracked_pairs
+from llmApp.management.base import GenerationCommand
+from llmApp.models import Hotel, PropertyReview, PropertySummary
+from llmApp.querysets import iter_batches
+from llmApp.services import metrics
+from llmApp.services.batch import TASK_COMMANDS, load_task_command
+from llmApp.services.transport import track_call
+
+# Stage -> stages that must be committed before it may start
+STAGE_DEPENDENCIES = {
+    'titles': (),
+    'descriptions': ('titles',),
+    'summaries': ('descriptions',),
+    'reviews': ('titles',),
+}
+
+
+def ancestors(name):
+    """
+    Every stage ``name`` depends on, directly or through another stage
+    """
+    found = set()
+    for dependency in STAGE_DEPENDENCIES[name]:
+        found |= {dependency} | ancestors(dependency)
+    return found
+
+
+class Command(GenerationCommand):
+    help = 'Rewrite titles and generate descriptions, summaries and reviews in one pass'
+    supports_workers = False
+    # Stages are picked per hotel as it is read, so there is no count up front
+    counts_hotels = False
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            '--stages',
+            nargs='+',
+            choices=list(STAGE_DEPENDENCIES),
+            default=list(STAGE_DEPENDENCIES),
+            help='Stages to run (default: all)'
+        )
+
+    def handle(self, *args, **kwargs):
+        self.options = kwargs
+        batch_size = kwargs['batch_size']
+        concurrency = kwargs['concurrency']
+        if batch_size < 1 or concurrency < 1:
+            raise CommandError("--batch-size and --concurrency must be positive")
+
+        self.stages = {
+            name: load_task_command(name, incremental=kwargs['incremental'])
+            for name in TASK_COMMANDS if name in kwargs['stages']
+        }
+
+        self.service = service = self.get_service(**kwargs)
+        for command in self.stages.values():
+            command.model = service.model
+        metrics.REGISTRY.start_run()
+        try:
+            asyncio.run(self._run_pipeline(service, batch_size, concurrency))
+        finally:
+            service.close()
+
+        self.stdout.write(f"Completed stages: {self.completed}")
+        self.stdout.write(f"LLM calls ({service.model}): {service.counters}")
+        self.write_metrics_summary()
+
+    def get_queryset(self, **options):
+        return Hotel.objects.all()
+
+    def pending_stages(self, hotel, with_summary, with_review, finished, tracked=frozenset()):
+        """
+        Stages this hotel still needs, using the same rules as the single-stage
+        commands plus the job ledger. With --incremental existing content
+        with a job in ``tracked`` is redone too, unless the ledger has it
+        finished for the current inputs; content without a job is kept.
+        """
+        incremental = self.options.get('incremental')
+
+        def redo(name):
+            return incremental and (hotel.hotel_id, name) in tracked
+
+        needed = {
+            'titles': True,
+            'descriptions': hotel.description is None or redo('descriptions'),
+            'summaries': hotel.hotel_id not in with_summary or redo('summaries'),
+            'reviews': hotel.hotel_id not in with_review or redo('reviews'),
+        }
+        stages = [
+            name for name in self.stages
+            if needed[name] and (hotel.hotel_id, name) not in finished
+        ]
+        if hotel.description is None and 'descriptions' not in stages:
+            # Summaries are built from the description, as in generate_summaries
+            stages = [name for name in stages if name != 'summaries']
+        return stages
+
+    def load_batch(self, batches):
+        """
+        Next batch of hotels as (hotel, pending stages) pairs, with the jobs
+        for those stages marked as started; None when the table is exhausted
+        """
+        batch = next(batches, None)
+        if batch is None:
+            return None
+        hotel_ids = [hotel.hotel_id for hotel in batch]
+        with_summary = set(
+            PropertySummary.objects.filter(property_id__in=hotel_ids).values_list('property_id', flat=True)
+        )
+        with_review = set(
+            PropertyReview.objects.filter(property_id__in=hotel_ids).values_list('property_id', flat=True)
+        )
+        fingerprints, tracked = {}, set()
+        if self.options.get('incremental'):
+            fingerprints = {name: command.fingerprint('hotel__') for name, command in self.stages.items()}
+            tracked = tracked_pairs(hotel_ids, self.stages)
+        finished = finished_pairs(hotel_ids, self.stages, fingerprints)
+
+        work = [
+            (hotel, self.pending_stages(hotel, with_summary, with_review, finished, tracked))
+            for hotel in batch
+        ]
+        for name in self.stages:
+            start_jobs(name, [hotel.hotel_id for hotel, stages in work if name in stages])
+        return work
+
+    async def _run_pipeline(self, service, batch_size, concurrency):
+        self.size_executor(concurrency)
+        self.completed = {name: 0 for name in self.stages}
+        # One budget of in-flight requests shared by every stage
+        self.request_slots = asyncio.Semaphore(concurrency)
+        # Bound the hotels in progress so memory stays flat on big tables
+        hotel_slots = asyncio.Semaphore(concurrency * 2)
+        pending = set()
+
+        def release(task):
+            pending.discard(task)
+            hotel_slots.release()
+            metrics.QUEUE_DEPTH.set(len(pending), task='pipeline', queue='hotels_in_progress')
+
+        fields = sorted({field for command in self.stages.values() for field in command.fields} | {'description'})
+        batches = iter_batches(self.get_queryset(**self.options), batch_size, fields)
+        while not self.budget_exhausted(service):
+            work = await sync_to_async(self.load_batch)(batches)
+            if work is None:
+                break
+            for index, (hotel, stages) in enumerate(work):
+                if not stages:
+                    continue
+                await hotel_slots.acquire()
+                await self.wait_for_provider(service)
+                if self.budget_exhausted(service):
+                    hotel_slots.release()
+                    await sync_to_async(self.release_unsent_work)(work[index:])
+                    break
+                task = asyncio.create_task(self.run_hotel(service, hotel, stages))
+                pending.add(task)
+                task.add_done_callback(release)
+                metrics.QUEUE_DEPTH.set(len(pending), task='pipeline', queue='hotels_in_progress')
+
+        if pending:
+            await asyncio.gather(*pending)
+
+    def release_unsent_work(self, work):
+        """
+        Hand the stages of (hotel, stages) pairs that were never started back to the job ledger
+        """
+        for name in self.stages:
+            release_jobs(name, [hotel.hotel_id for hotel, stages in work if name in stages])
+
+    async def run_hotel(self, service, hotel, stages):
+        """
+        Run the hotel's stages as a dependency graph: each stage starts once
+        every scheduled stage it depends on, directly or not, is committed,
+        independent ones in parallel. A stage skipped because one of those
+        failed is handed back to the job ledger.
+        """
+        done = {name: asyncio.get_running_loop().create_future() for name in stages}
+
+        async def run_stage(name):
+            ok = True
+            for dependency in sorted(ancestors(name)):
+                if dependency in done:
+                    ok = await done[dependency] and ok
+            if name == 'summaries' and hotel.description is None:
+                ok = False
+            if ok:
+                ok = await self.run_stage(service, name, hotel)
+            else:
+                await sync_to_async(release_jobs)(name, [hotel.hotel_id])
+            done[name].set_result(ok)
+
+        await asyncio.gather(*(run_stage(name) for name in stages))
+
+    async def run_stage(self, service, name, hotel) -> bool:
+        command = self.stages[name]
+        try:
+            async with self.request_slots:
+                with track_call(name):
+                    result = await command.generate(service, hotel)
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f"Error processing hotel {hotel.id} ({name}): {str(e)}"))
+            await sync_to_async(command.record_failures)([(hotel, str(e))])
+            return False
+        if not result:
+            await sync_to_async(command.record_failures)([(hotel, "no usable response")])
+            return False
+
+        item = (hotel, result, command.success_message(hotel, result))
+        written, failed = await sync_to_async(command.save_items)([item])
+        await sync_to_async(metrics.REGISTRY.publish)(min_interval=15)
+        for _, e in failed:
+            self.stdout.write(self.style.ERROR(f"Error processing hotel {hotel.id} ({name}): {str(e)}"))
+        if not written:
+            return False
+        self.completed[name] += 1
+        self.stdout.write(self.style.SUCCESS(item[2]))
+        return True
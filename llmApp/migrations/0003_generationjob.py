@@ -0,0 +1,79 @@
+# llmApp/migrations/0003_generationjob.py
+from django.db import migrations, models
+import django.db.models.deletion
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('llmApp', '0002_update_property_references'),
+    ]
+
+    operations = [
+        # The hotels table and the property_id foreign keys already exist
+        # (see 0001/0002); only teach the migration state about them.
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name='Hotel',
+                    fields=[
+                        ('id', models.AutoField(primary_key=True, serialize=False)),
+                        ('city_name', models.CharField(max_length=100)),
+                        ('property_title', models.CharField(max_length=255)),
+                        ('hotel_id', models.CharField(max_length=50, unique=True)),
+                        ('price', models.FloatField()),
+                        ('rating', models.FloatField()),
+                        ('address', models.TextField()),
+                        ('latitude', models.FloatField()),
+                        ('longitude', models.FloatField()),
+                        ('room_type', models.CharField(max_length=100)),
+                        ('image', models.URLField()),
+                        ('local_image_path', models.CharField(max_length=255)),
+                        ('description', models.TextField(blank=True, null=True)),
+                    ],
+                    options={
+                        'db_table': 'hotels',
+                        'managed': False,
+                    },
+                ),
+                migrations.RemoveField(
+                    model_name='propertysummary',
+                    name='property_id',
+                ),
+                migrations.RemoveField(
+                    model_name='propertyreview',
+                    name='property_id',
+                ),
+                migrations.AddField(
+                    model_name='propertysummary',
+                    name='property',
+                    field=models.ForeignKey(db_column='property_id', on_delete=django.db.models.deletion.CASCADE, related_name='summaries', to='llmApp.hotel', to_field='hotel_id'),
+                    preserve_default=False,
+                ),
+                migrations.AddField(
+                    model_name='propertyreview',
+                    name='property',
+                    field=models.ForeignKey(db_column='property_id', on_delete=django.db.models.deletion.CASCADE, related_name='reviews', to='llmApp.hotel', to_field='hotel_id'),
+                    preserve_default=False,
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name='GenerationJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task', models.CharField(max_length=20)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('in_progress', 'In progress'), ('succeeded', 'Succeeded'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('last_error', models.TextField(blank=True, default='')),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('hotel', models.ForeignKey(db_column='hotel_id', on_delete=django.db.models.deletion.CASCADE, related_name='generation_jobs', to='llmApp.hotel', to_field='hotel_id')),
+            ],
+            options={
+                'db_table': 'generation_jobs',
+                'indexes': [models.Index(fields=['task', 'status'], name='generation_jobs_task_status')],
+                'constraints': [models.UniqueConstraint(fields=('hotel', 'task'), name='generation_jobs_hotel_task_unique')],
+            },
+        ),
+    ]
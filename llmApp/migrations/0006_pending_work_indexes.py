@@ -0,0 +1,47 @@
+# llmApp/migrations/0006_pending_work_indexes.py
+from django.db import migrations
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY can't run inside a transaction; it doesn't
+    # block writes to big tables while the index builds
+    atomic = False
+
+    dependencies = [
+        ('llmApp', '0005_generationjob_lease'),
+    ]
+
+    operations = [
+        # generate_descriptions pages through hotels WHERE description IS NULL
+        # in id order; the partial index holds only the hotels still to do
+        migrations.RunSQL(
+            sql='''
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS hotels_pending_description
+            ON hotels (id) WHERE description IS NULL;
+            ''',
+            reverse_sql='DROP INDEX CONCURRENTLY IF EXISTS hotels_pending_description;'
+        ),
+
+        # The NOT EXISTS probes of generate_summaries and generate_reviews are
+        # answered from these indexes alone, as is the latest row per hotel
+        # that export_content reads
+        migrations.RunSQL(
+            sql='''
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS property_summaries_property_latest
+            ON property_summaries (property_id, updated_at DESC, id DESC);
+            ''',
+            reverse_sql='DROP INDEX CONCURRENTLY IF EXISTS property_summaries_property_latest;'
+        ),
+        migrations.RunSQL(
+            sql='''
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS property_reviews_property_latest
+            ON property_reviews (property_id, updated_at DESC, id DESC);
+            ''',
+            reverse_sql='DROP INDEX CONCURRENTLY IF EXISTS property_reviews_property_latest;'
+        ),
+
+        # Fresh statistics, so --estimate-count and the new plans start out right
+        migrations.RunSQL(
+            sql='ANALYZE hotels; ANALYZE property_summaries; ANALYZE property_reviews;',
+            reverse_sql=migrations.RunSQL.noop
+        ),
+    ]
@@ -0,0 +1,23 @@
+# llmApp/migrations/0007_hotel_title_prefix_index.py
+from django.db import migrations
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY can't run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('llmApp', '0006_pending_work_indexes'),
+    ]
+
+    operations = [
+        # The admin's title search is an istartswith, which Django writes as
+        # UPPER(property_title::text) LIKE UPPER('sea%'); text_pattern_ops
+        # lets that prefix match use the index whatever the collation
+        migrations.RunSQL(
+            sql='''
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS hotels_property_title_prefix
+            ON hotels (UPPER(property_title::text) text_pattern_ops);
+            ''',
+            reverse_sql='DROP INDEX CONCURRENTLY IF EXISTS hotels_property_title_prefix;'
+        ),
+    ]
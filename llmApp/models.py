@@ -49,4 +49,51 @@ class PropertyReview(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
-        db_table = 'property_reviews'
\ No newline at end of file
+        db_table = 'property_reviews'
+
+class GenerationJob(models.Model):
+    """
+    Ledger entry for one (hotel, task) pair: whether the content was
+    generated, how many attempts it took and why the last one failed.
+    """
+    PENDING = 'pending'
+    IN_PROGRESS = 'in_progress'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (IN_PROGRESS, 'In progress'),
+        (SUCCEEDED, 'Succeeded'),
+        (FAILED, 'Failed'),
+    ]
+
+    hotel = models.ForeignKey(
+        'Hotel',
+        to_field='hotel_id',
+        db_column='hotel_id',
+        on_delete=models.CASCADE,
+        related_name='generation_jobs'
+    )
+    task = models.CharField(max_length=20)  # 'titles', 'descriptions', 'summaries' or 'reviews'
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True, default='')
+    # MD5 of the prompt inputs, prompt version and model the content was generated from
+    input_hash = models.CharField(max_length=32, blank=True, default='')
+    # Worker that claimed the job and until when; an expired lease may be reclaimed
+    lease_owner = models.CharField(max_length=100, blank=True, default='')
+    lease_expires_at = models.DateTimeField(null=True, blank=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'generation_jobs'
+        constraints = [
+            models.UniqueConstraint(fields=['hotel', 'task'], name='generation_jobs_hotel_task_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['task', 'status'], name='generation_jobs_task_status'),
+            models.Index(fields=['task', 'hotel', 'input_hash'], name='generation_jobs_fingerprint'),
+        ]
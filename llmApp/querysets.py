@@ -0,0 +1,73 @@
+# llmApp/querysets.py
+import json
+from typing import AsyncIterator, Iterator, List, Optional, Sequence
+
+# Every write and ledger call identifies hotels by hotel_id, so it is always
+# loaded; a deferred hotel_id costs a query per row when it is read
+KEY_FIELD = 'hotel_id'
+
+
+def only_fields(queryset, fields: Optional[Sequence[str]]):
+    """
+    ``queryset`` loading only ``fields`` plus the primary key and hotel_id;
+    every column when ``fields`` is None
+    """
+    if not fields:
+        return queryset
+    return queryset.only(*dict.fromkeys((KEY_FIELD, *fields)))
+
+
+def iter_batches(queryset, batch_size: int, fields: Optional[Sequence[str]] = None) -> Iterator[List]:
+    """
+    Yield the rows of ``queryset`` in primary key order, ``batch_size`` at a time.
+
+    Each batch is fetched with ``pk > last seen pk`` instead of LIMIT/OFFSET,
+    so every query costs the same however deep into the table we are, and
+    rows that stop matching the filter while we work (e.g. a hotel that just
+    got its description) can't shift later rows out of the window. Only
+    ``fields`` (plus the primary key and hotel_id) are loaded when given.
+    """
+    queryset = only_fields(queryset.order_by('pk'), fields)
+
+    last_pk = None
+    while True:
+        page = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        batch = list(page[:batch_size])
+        if not batch:
+            return
+        yield batch
+        if len(batch) < batch_size:
+            return
+        last_pk = batch[-1].pk
+
+
+def estimated_count(queryset) -> int:
+    """
+    The planner's row estimate for ``queryset``, from EXPLAIN without
+    running the query: milliseconds where count() scans every matching row.
+    Only as good as the table statistics ANALYZE last gathered.
+    """
+    plan = json.loads(queryset.explain(format='json'))
+    # Django hands Postgres' one-element list back as its only object
+    if isinstance(plan, list):
+        plan = plan[0]
+    return int(plan['Plan']['Plan Rows'])
+
+
+async def aiter_batches(queryset, batch_size: int, fields: Optional[Sequence[str]] = None) -> AsyncIterator[List]:
+    """
+    ``iter_batches`` on the async ORM, so reading the next batch doesn't
+    hold up the event loop that has requests in flight
+    """
+    queryset = only_fields(queryset.order_by('pk'), fields)
+
+    last_pk = None
+    while True:
+        page = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        batch = [row async for row in page[:batch_size].aiterator()]
+        if not batch:
+            return
+        yield batch
+        if len(batch) < batch_size:
+            return
+        last_pk = batch[-1].pk
@@ -0,0 +1,677 @@
+# llmApp/services/base.py
+import asyncio
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import requests
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple
+import json
+
+from django.conf import settings
+
+from llmApp.services.cache import ResponseCache, get_response_cache
+from llmApp.services import parsing
+from llmApp.services.metrics import observe_cache_hit, observe_call, observe_coalesced, observe_parse
+from llmApp.services.prompts import (
+    DESCRIPTION_PROMPT,
+    PACKED_PROMPT,
+    PACKED_SUMMARIES_INSTRUCTIONS,
+    PACKED_TITLES_INSTRUCTIONS,
+    REVIEW_JSON_PROMPT,
+    REVIEW_PROMPT,
+    SUMMARY_PROMPT,
+    TITLE_JSON_PROMPT,
+    TITLE_PROMPT,
+    PromptTemplate,
+    compact,
+    truncate_text,
+)
+from llmApp.services.rate_limiter import RateLimiter, estimate_tokens, get_rate_limiter
+from llmApp.services.singleflight import SingleFlight
+from llmApp.services.transport import (
+    FAILURE_STATUSES,
+    RETRY_STATUSES,
+    CallStats,
+    CircuitBreaker,
+    CircuitOpenError,
+    RequestCounters,
+    RetryPolicy,
+    TokenUsage,
+    build_session,
+    current_call_stats,
+    parse_retry_after,
+    percentile,
+)
+
+# Output tokens a packed response spends per hotel on the JSON around each value
+PACKED_TOKENS_PER_HOTEL = 16
+
+
+def packed_schema(field: str) -> dict:
+    """
+    responseSchema for a JSON array with one {"hotel_id", field} object per hotel
+    """
+    return {
+        "type": "ARRAY",
+        "items": {
+            "type": "OBJECT",
+            "properties": {
+                "hotel_id": {"type": "STRING"},
+                field: {"type": "STRING"},
+            },
+            "required": ["hotel_id", field],
+        },
+    }
+
+
+# responseSchema of the single-hotel tasks that answer with structured output
+RESPONSE_SCHEMAS = {
+    'titles': {
+        "type": "OBJECT",
+        "properties": {"title": {"type": "STRING"}},
+        "required": ["title"],
+    },
+    'reviews': {
+        "type": "OBJECT",
+        "properties": {
+            "rating": {"type": "NUMBER"},
+            "review": {"type": "STRING"},
+        },
+        "required": ["rating", "review"],
+    },
+}
+
+
+def parse_packed_response(text: Optional[str], field: str) -> Dict[str, str]:
+    """
+    Map hotel_id -> value for every well-formed entry of a packed response.
+    Missing, empty or malformed entries are simply left out.
+    """
+    if not text:
+        return {}
+    entries = parsing.load_json(text)
+    if not isinstance(entries, list):
+        return {}
+
+    results = {}
+    for entry in entries:
+        if not isinstance(entry, dict):
+            continue
+        hotel_id, value = entry.get('hotel_id'), entry.get(field)
+        if hotel_id is not None and isinstance(value, str) and value.strip():
+            results[str(hotel_id)] = value.strip()
+    return results
+
+
+def title_parses(text: str) -> bool:
+    return parsing.parse_title(text)[0] is not None
+
+
+def review_parses(text: str) -> bool:
+    rating, review, _ = parsing.parse_review(text)
+    return rating is not None and bool(review)
+
+
+def first_line(text: str) -> Optional[str]:
+    """
+    The first line of ``text`` once it is complete, e.g. a streamed title
+    """
+    lines = text.strip().split('\n', 1)
+    return lines[0].strip() if len(lines) == 2 else None
+
+
+class LLMService:
+    """
+    Provider independent half of the LLM client: pooled transport, retries,
+    rate limiting, caching, the prompts and the four generation methods.
+
+    Identical requests made through one service are sent once: callers that
+    ask while the first is in flight, or after it succeeded, share its
+    response. This works without the persistent cache, e.g. for duplicate
+    listings within a run.
+
+    A provider subclass sets ``model`` and implements ``endpoint``,
+    ``build_payload`` and ``read_response`` for its HTTP API.
+
+    Every prompt is rendered from a compiled template and trimmed to its
+    task's input budget, and every request carries the task's
+    maxOutputTokens, so outlier hotels cost no more than typical ones.
+    With structured output on, titles and reviews are requested as JSON
+    under a responseSchema; the parsers still accept plain text, and every
+    parse outcome is counted per task and model.
+
+    A circuit breaker stops sending once the provider keeps failing, and
+    with hedging on, a request still unanswered after the recent p95
+    latency is sent a second time; the first answer wins.
+    """
+    model = None
+    # Extra keyword arguments for session.post, e.g. stream=True
+    post_kwargs = {}
+
+    def __init__(self, pool_size: int = 10, session=None, retry_policy: Optional[RetryPolicy] = None,
+                 rate_limiter: Optional[RateLimiter] = None, cache: Optional[ResponseCache] = None,
+                 use_cache: bool = True, refresh_cache: bool = False, streaming: Optional[bool] = None,
+                 deduplicate: Optional[bool] = None, structured: Optional[bool] = None,
+                 circuit_breaker: Optional[CircuitBreaker] = None, hedge: Optional[bool] = None):
+        # Duplicate a slow non-streamed request after the recent p95 latency
+        self.hedge = settings.LLM_HEDGE if hedge is None else hedge
+        self.pool_size = pool_size
+        self._hedge_executor = None
+        # Hedges need connections of their own
+        self.session = session or build_session(pool_size * 2 if self.hedge else pool_size)
+        self.timeout = (settings.LLM_CONNECT_TIMEOUT, settings.LLM_READ_TIMEOUT)
+        self.retry_policy = retry_policy or RetryPolicy(
+            max_retries=settings.LLM_MAX_RETRIES,
+            backoff_base=settings.LLM_BACKOFF_BASE,
+            backoff_max=settings.LLM_BACKOFF_MAX,
+        )
+        self.rate_limiter = rate_limiter or self.default_rate_limiter()
+        self.circuit_breaker = circuit_breaker or CircuitBreaker(
+            failure_threshold=settings.LLM_BREAKER_FAILURES,
+            reset_timeout=settings.LLM_BREAKER_RESET_SECONDS,
+        )
+        # With refresh_cache the stored responses are ignored but still overwritten
+        self.cache = (cache or get_response_cache()) if use_cache else None
+        self.refresh_cache = refresh_cache
+        # Generate single-hotel content through stream_request
+        self.streaming = settings.LLM_STREAM if streaming is None else streaming
+        deduplicate = settings.LLM_DEDUPLICATE if deduplicate is None else deduplicate
+        self.inflight = SingleFlight(settings.LLM_DEDUP_MAX_RESULTS) if deduplicate else None
+        # Ask for JSON titles and reviews under RESPONSE_SCHEMAS
+        self.structured = settings.LLM_STRUCTURED_OUTPUT if structured is None else structured
+        self.counters = RequestCounters()
+
+    def close(self):
+        """
+        Stop the hedge threads once no more requests will be made; a losing
+        request still running is left to finish on its own
+        """
+        if self._hedge_executor is not None:
+            self._hedge_executor.shutdown(wait=False)
+            self._hedge_executor = None
+
+    def default_rate_limiter(self) -> RateLimiter:
+        return get_rate_limiter()
+
+    def endpoint(self) -> str:
+        raise NotImplementedError
+
+    def build_payload(self, prompt: str, generation_config: Optional[dict] = None) -> dict:
+        """
+        Request body for ``prompt``; generation_config uses Gemini's keys
+        (responseMimeType, responseSchema, ...) and is translated as needed
+        """
+        raise NotImplementedError
+
+    def read_response(self, response: requests.Response) -> Tuple[Optional[str], Optional[TokenUsage]]:
+        """
+        Generated text and the reported token usage, from a successful response
+        """
+        raise NotImplementedError
+
+    def stream_endpoint(self) -> str:
+        raise NotImplementedError
+
+    def count_tokens(self, text: str) -> int:
+        """
+        Tokens in ``text``; a local estimate unless the provider can count them
+        """
+        return estimate_tokens(text)
+
+    def render_prompt(self, task: str, template: PromptTemplate, values: dict) -> str:
+        """
+        ``template`` filled in with ``values``, trimmed to the task's input budget
+        """
+        return template.render(values, settings.LLM_MAX_INPUT_TOKENS.get(task), self.count_tokens)
+
+    def generation_config(self, task: str, hotels: int = 1, **config) -> dict:
+        """
+        generationConfig for a request of ``task`` covering ``hotels`` hotels
+        """
+        if self.structured and task in RESPONSE_SCHEMAS:
+            config.setdefault('responseMimeType', "application/json")
+            config.setdefault('responseSchema', RESPONSE_SCHEMAS[task])
+        limit = settings.LLM_MAX_OUTPUT_TOKENS.get(task)
+        if limit:
+            overhead = PACKED_TOKENS_PER_HOTEL * hotels if hotels > 1 else 0
+            config['maxOutputTokens'] = limit * hotels + overhead
+        return config
+
+    def reserve_tokens(self, prompt: str, generation_config: Optional[dict] = None) -> int:
+        """
+        Tokens to take from the shared quota before sending ``prompt``
+        """
+        output = settings.LLM_EXPECTED_OUTPUT_TOKENS
+        if generation_config and generation_config.get('maxOutputTokens'):
+            output = min(output, generation_config['maxOutputTokens'])
+        return estimate_tokens(prompt) + output
+
+    def build_stream_payload(self, prompt: str, generation_config: Optional[dict] = None) -> dict:
+        return self.build_payload(prompt, generation_config)
+
+    def iter_chunks(self, response: requests.Response) -> Iterator[Tuple[str, Optional[TokenUsage]]]:
+        """
+        (text, token usage or None) for each chunk of a streamed response
+        """
+        raise NotImplementedError
+
+    def _post(self, url: str, payload: dict, stats: CallStats, tokens: int = 0,
+              stream: bool = False) -> requests.Response:
+        """
+        POST through the shared session, retrying on throttling, transient
+        server errors, timeouts and dropped connections. Every attempt first
+        asks the circuit breaker and takes a request from the shared rate
+        limit. The ``tokens`` are reserved once for the whole call, since the
+        caller settles a single reservation against the reported usage.
+        """
+        policy = self.retry_policy
+        breaker = self.circuit_breaker
+        post_kwargs = dict(self.post_kwargs, stream=True) if stream else self.post_kwargs
+        attempt = 0
+        while True:
+            breaker.before_request()
+            self.rate_limiter.acquire(tokens if attempt == 0 else 0)
+            stats.attempts += 1
+            retry_after = None
+            try:
+                response = self.session.post(url, json=payload, timeout=self.timeout, **post_kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                breaker.record_failure()
+                if attempt >= policy.max_retries:
+                    raise
+            except Exception:
+                breaker.record_failure()
+                raise
+            else:
+                if response.status_code in FAILURE_STATUSES:
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+                stats.status_codes.append(response.status_code)
+                if response.status_code not in RETRY_STATUSES or attempt >= policy.max_retries:
+                    return response
+                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                response.close()
+
+            time.sleep(policy.delay(attempt, retry_after))
+            attempt += 1
+            stats.retries += 1
+
+    def _read_cache(self, cache_key: Optional[str], stats: CallStats,
+                    validate: Optional[Callable[[str], bool]] = None) -> Optional[str]:
+        """
+        The cached response for ``cache_key``, unless there is none, the
+        cache is being refreshed or ``validate`` rejects it
+        """
+        if not cache_key or self.refresh_cache:
+            return None
+        cached = self.cache.get(cache_key)
+        if cached is None or (validate and not validate(cached)):
+            return None
+        stats.cached = True
+        self.counters.record_cache_hit()
+        observe_cache_hit(self.model, stats)
+        return cached
+
+    def _make_request(self, prompt: str, generation_config: Optional[dict] = None,
+                      validate: Optional[Callable[[str], bool]] = None) -> Optional[str]:
+        """
+        Make a request to the provider's API. Only responses ``validate``
+        accepts are cached, so an unusable answer is asked for again next time.
+        """
+        stats = current_call_stats()
+        payload = self.build_payload(prompt, generation_config)
+
+        key = ResponseCache.make_key(self.model, payload)
+        cache_key = key if self.cache else None
+        cached = self._read_cache(cache_key, stats, validate)
+        if cached is not None:
+            return cached
+
+        reserved_tokens = self.reserve_tokens(prompt, generation_config)
+        return self._share(key, stats, lambda: self._send(payload, stats, cache_key, reserved_tokens, validate))
+
+    def _send(self, payload: dict, stats: CallStats, cache_key: Optional[str], reserved_tokens: int,
+              validate: Optional[Callable[[str], bool]] = None) -> Optional[str]:
+        ok = False
+        started = time.monotonic()
+        try:
+            text, stats.usage = self._hedged(payload, stats, reserved_tokens)
+            ok = True
+
+            # Charge the tokens actually used against the shared quota
+            if stats.usage is not None:
+                self.rate_limiter.settle(stats.usage.total - reserved_tokens)
+            
+            if text is not None and cache_key and (validate is None or validate(text)):
+                self.cache.set(cache_key, self.model, text)
+            return text
+            
+        except CircuitOpenError as e:
+            print(f"Request not sent: {str(e)}")
+            return None
+        except requests.exceptions.RequestException as e:
+            print(f"Error making request: {str(e)}")
+            return None
+        except Exception as e:
+            print(f"Unexpected error: {str(e)}")
+            return None
+        finally:
+            stats.latency = time.monotonic() - started
+            self._record_call(stats, ok)
+
+    def _fetch(self, payload: dict, stats: CallStats, reserved_tokens: int) -> Tuple[Optional[str], Optional[TokenUsage]]:
+        response = self._post(self.endpoint(), payload, stats, reserved_tokens)
+        response.raise_for_status()
+        return self.read_response(response)
+
+    def hedge_delay(self) -> Optional[float]:
+        """
+        Seconds to wait for an answer before sending a duplicate request: the
+        p95 of recent latencies, None while hedging is off or too few calls
+        have finished to know it
+        """
+        if not self.hedge:
+            return None
+        recent = self.counters.latencies[-settings.LLM_HEDGE_WINDOW:]
+        if len(recent) < settings.LLM_HEDGE_MIN_SAMPLES:
+            return None
+        return max(percentile(recent, settings.LLM_HEDGE_QUANTILE), settings.LLM_HEDGE_MIN_DELAY)
+
+    def _hedged(self, payload: dict, stats: CallStats, reserved_tokens: int) -> Tuple[Optional[str], Optional[TokenUsage]]:
+        """
+        ``_fetch``, sent a second time if the first attempt is slower than
+        ``hedge_delay``; whichever answers first successfully wins and the
+        other is left to finish on its own
+        """
+        delay = self.hedge_delay()
+        if delay is None:
+            return self._fetch(payload, stats, reserved_tokens)
+
+        if self._hedge_executor is None:
+            self._hedge_executor = ThreadPoolExecutor(max_workers=self.pool_size * 2)
+        primary = self._hedge_executor.submit(self._fetch, payload, stats, reserved_tokens)
+        done, _ = wait([primary], timeout=delay)
+        if done:
+            return primary.result()
+
+        hedge_stats = CallStats(task=stats.task)
+        stats.hedged = True
+        self.counters.record_hedge()
+        hedge = self._hedge_executor.submit(self._fetch, payload, hedge_stats, reserved_tokens)
+        pending, error = {primary, hedge}, None
+        try:
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    try:
+                        return future.result()
+                    except Exception as e:
+                        error = error or e
+            raise error
+        finally:
+            stats.attempts += hedge_stats.attempts
+            stats.retries += hedge_stats.retries
+            stats.status_codes.extend(hedge_stats.status_codes)
+
+    def _share(self, key: str, stats: CallStats, send: Callable[[], Optional[str]]) -> Optional[str]:
+        """
+        ``send()`` unless an identical request is in flight or already
+        answered, in which case its response is reused
+        """
+        if self.inflight is None:
+            return send()
+        result, shared = self.inflight.do(key, send)
+        if shared:
+            stats.coalesced = True
+            self.counters.record_coalesced()
+            observe_coalesced(self.model, stats)
+        return result
+
+    def stream_request(self, prompt: str, generation_config: Optional[dict] = None,
+                       validate: Optional[Callable[[str], bool]] = None) -> Iterator[str]:
+        """
+        Yield the response text chunk by chunk as the model produces it.
+
+        Closing the generator early (e.g. breaking out of the loop once the
+        needed text has arrived) drops the connection and the rest of the
+        generation with it. Only complete responses that ``validate``
+        accepts are cached. Request errors end the stream, as they make
+        ``_make_request`` return None.
+        """
+        stats = current_call_stats()
+        cache_key = ResponseCache.make_key(self.model, self.build_payload(prompt, generation_config)) if self.cache else None
+        cached = self._read_cache(cache_key, stats, validate)
+        if cached is not None:
+            yield cached
+            return
+
+        ok = False
+        started = time.monotonic()
+        response = None
+        try:
+            reserved_tokens = self.reserve_tokens(prompt, generation_config)
+            payload = self.build_stream_payload(prompt, generation_config)
+            response = self._post(self.stream_endpoint(), payload, stats, reserved_tokens, stream=True)
+            response.raise_for_status()
+
+            parts = []
+            for text, usage in self.iter_chunks(response):
+                if usage is not None:
+                    stats.usage = usage
+                if not text:
+                    continue
+                if stats.first_token is None:
+                    stats.first_token = time.monotonic() - started
+                parts.append(text)
+                yield text
+            ok = True
+
+            if stats.usage is not None:
+                self.rate_limiter.settle(stats.usage.total - reserved_tokens)
+            text = ''.join(parts)
+            if text and cache_key and (validate is None or validate(text)):
+                self.cache.set(cache_key, self.model, text)
+
+        except GeneratorExit:
+            # The caller stopped reading: that is a successful call
+            ok = True
+            raise
+        except requests.exceptions.RequestException as e:
+            print(f"Error making request: {str(e)}")
+        except Exception as e:
+            print(f"Unexpected error: {str(e)}")
+        finally:
+            if response is not None:
+                response.close()
+            stats.latency = time.monotonic() - started
+            self._record_call(stats, ok)
+
+    def stream_until(self, prompt: str, complete: Optional[Callable[[str], Optional[str]]] = None,
+                     generation_config: Optional[dict] = None,
+                     validate: Optional[Callable[[str], bool]] = None) -> Optional[str]:
+        """
+        Stream ``prompt``, stopping as soon as ``complete(text so far)``
+        returns a result; otherwise return the whole text
+        """
+        def send():
+            text = ''
+            for chunk in self.stream_request(prompt, generation_config, validate):
+                text += chunk
+                result = complete(text) if complete else None
+                if result:
+                    return result
+            return text or None
+
+        # The result depends on where ``complete`` stopped the stream
+        payload = self.build_payload(prompt, generation_config)
+        key = f"{ResponseCache.make_key(self.model, payload)}:{getattr(complete, '__name__', '')}"
+        return self._share(key, current_call_stats(), send)
+
+    def _generate(self, task: str, prompt: str,
+                  complete: Optional[Callable[[str], Optional[str]]] = None,
+                  validate: Optional[Callable[[str], bool]] = None) -> Optional[str]:
+        """
+        Single-hotel request for ``task``, streamed when streaming is on;
+        ``validate`` tells a response worth caching from one that won't parse
+        """
+        generation_config = self.generation_config(task)
+        if self.streaming:
+            return self.stream_until(prompt, complete, generation_config, validate)
+        return self._make_request(prompt, generation_config, validate)
+
+    def _record_call(self, stats: CallStats, ok: bool):
+        self.counters.record(stats, ok)
+        observe_call(self.model, stats, ok)
+
+    def _make_packed_request(self, task: str, instructions: str, records: list, field: str) -> Dict[str, str]:
+        """
+        Ask for several hotels in one request, as a JSON array keyed by hotel_id
+        """
+        prompt = PACKED_PROMPT.render({
+            'instructions': instructions,
+            'field': field,
+            'records': json.dumps(records, indent=2),
+        })
+        text = self._make_request(prompt, generation_config=self.generation_config(
+            task,
+            hotels=len(records),
+            responseMimeType="application/json",
+            responseSchema=packed_schema(field),
+        ), validate=lambda text: bool(parse_packed_response(text, field)))
+        return parse_packed_response(text, field)
+
+    def fit_text(self, task: str, text: str) -> str:
+        """
+        Free text of one hotel in a packed request, compacted and cut to the
+        task's input budget
+        """
+        if not isinstance(text, str):
+            return text
+        limit = settings.LLM_MAX_INPUT_TOKENS.get(task)
+        text = compact(text)
+        # estimate_tokens counts about four characters per token
+        return truncate_text(text, limit * 4) if limit else text
+
+    def _fill_missing(self, results: Dict[str, str], items: Dict[str, object], single) -> Dict[str, Optional[str]]:
+        """
+        Fall back to one request per hotel for entries the packed response lacked
+        """
+        for hotel_id, item in items.items():
+            if not results.get(hotel_id):
+                self.counters.record_fallback()
+                results[hotel_id] = single(item)
+        return results
+
+    # Prompt builders and parsers, shared by the live calls and the offline
+    # batch export/ingest
+
+    def title_prompt(self, hotel) -> str:
+        return self.render_prompt('titles', TITLE_JSON_PROMPT if self.structured else TITLE_PROMPT, {
+            'property_title': hotel.property_title,
+            'city_name': hotel.city_name,
+            'room_type': hotel.room_type,
+            'rating': hotel.rating,
+        })
+
+    def description_prompt(self, property_data) -> str:
+        return self.render_prompt('descriptions', DESCRIPTION_PROMPT, property_data)
+
+    def summary_prompt(self, property_data) -> str:
+        return self.render_prompt(
+            'summaries', SUMMARY_PROMPT, dict(property_data, description=property_data.get('description', 'Not available'))
+        )
+
+    def review_prompt(self, property_data) -> str:
+        return self.render_prompt('reviews', REVIEW_JSON_PROMPT if self.structured else REVIEW_PROMPT, property_data)
+
+    def parse_review(self, response: Optional[str]) -> Tuple[Optional[float], Optional[str]]:
+        if not response:
+            return None, None
+        rating, review, outcome = parsing.parse_review(response)
+        self._record_parse('reviews', outcome)
+        return rating, review
+
+    def parse_title(self, response: Optional[str]) -> Optional[str]:
+        if not response:
+            return None
+        title, outcome = parsing.parse_title(response)
+        self._record_parse('titles', outcome)
+        return title
+
+    def _record_parse(self, task: str, outcome: str):
+        self.counters.record_parse(outcome)
+        observe_parse(self.model, task, outcome)
+
+    def rewrite_property_title(self, hotel) -> Optional[str]:
+        # A JSON title is only usable once complete, so stop early on plain text only
+        complete = None if self.structured else first_line
+        return self.parse_title(self._generate('titles', self.title_prompt(hotel), complete, title_parses))
+
+    def rewrite_property_titles(self, hotels: Iterable) -> Dict[str, Optional[str]]:
+        """
+        Packed variant of rewrite_property_title, keyed by hotel_id
+        """
+        hotels = {str(hotel.hotel_id): hotel for hotel in hotels}
+        records = [
+            {
+                "hotel_id": hotel_id,
+                "current_title": self.fit_text('titles', hotel.property_title),
+                "location": hotel.city_name,
+                "room_type": hotel.room_type,
+                "rating": f"{hotel.rating}/5",
+            }
+            for hotel_id, hotel in hotels.items()
+        ]
+        results = self._make_packed_request('titles', PACKED_TITLES_INSTRUCTIONS, records, "title")
+        # Held to the single-request rules; a title that doesn't parse counts as missing
+        results = {hotel_id: self.parse_title(title) for hotel_id, title in results.items()}
+        return self._fill_missing(results, hotels, self.rewrite_property_title)
+
+    def generate_property_description(self, property_data) -> Optional[str]:
+        return self._generate('descriptions', self.description_prompt(property_data))
+
+    def generate_property_summary(self, property_data) -> Optional[str]:
+        return self._generate('summaries', self.summary_prompt(property_data))
+
+    def generate_property_summaries(self, properties: Dict[str, dict]) -> Dict[str, Optional[str]]:
+        """
+        Packed variant of generate_property_summary for {hotel_id: property_data}
+        """
+        records = [
+            {
+                "hotel_id": str(hotel_id),
+                "name": data['property_title'],
+                "location": data['city_name'],
+                "price": f"${data['price']}",
+                "rating": f"{data['rating']}/5",
+                "description": self.fit_text('summaries', data.get('description', 'Not available')),
+            }
+            for hotel_id, data in properties.items()
+        ]
+        results = self._make_packed_request('summaries', PACKED_SUMMARIES_INSTRUCTIONS, records, "summary")
+        properties = {str(hotel_id): data for hotel_id, data in properties.items()}
+        return self._fill_missing(results, properties, self.generate_property_summary)
+
+    def generate_property_review(self, property_data) -> Tuple[Optional[float], Optional[str]]:
+        return self.parse_review(self._generate('reviews', self.review_prompt(property_data), validate=review_parses))
+
+    # Async counterparts. Each call runs the blocking request on the event
+    # loop's default executor, so callers can keep several requests in flight.
+
+    async def arewrite_property_title(self, hotel) -> Optional[str]:
+        return await asyncio.to_thread(self.rewrite_property_title, hotel)
+
+    async def agenerate_property_description(self, property_data) -> Optional[str]:
+        return await asyncio.to_thread(self.generate_property_description, property_data)
+
+    async def agenerate_property_summary(self, property_data) -> Optional[str]:
+        return await asyncio.to_thread(self.generate_property_summary, property_data)
+
+    async def arewrite_property_titles(self, hotels) -> Dict[str, Optional[str]]:
+        return await asyncio.to_thread(self.rewrite_property_titles, hotels)
+
+    async def agenerate_property_summaries(self, properties) -> Dict[str, Optional[str]]:
+        return await asyncio.to_thread(self.generate_property_summaries, properties)
+
+    async def agenerate_property_review(self, property_data) -> Tuple[Optional[float], Optional[str]]:
+        return await asyncio.to_thread(self.generate_property_review, property_data)
@@ -0,0 +1,86 @@
+# llmApp/services/batch.py
+import json
+from typing import Iterator, Optional, Tuple
+
+from django.core.management import load_command_class
+
+# --task value -> generation command that owns the prompt, parser and writer
+TASK_COMMANDS = {
+    'titles': 'rewrite_titles',
+    'descriptions': 'generate_descriptions',
+    'summaries': 'generate_summaries',
+    'reviews': 'generate_reviews',
+}
+
+
+def load_task_command(task: str, **options):
+    """
+    Instantiate the generation command for ``task`` with its default options,
+    overridden by ``options``
+    """
+    name = TASK_COMMANDS[task]
+    command = load_command_class('llmApp', name)
+    command.options = vars(command.create_parser('manage.py', name).parse_args([]))
+    command.options.update(options)
+    return command
+
+
+def request_key(task: str, hotel_id) -> str:
+    """
+    Stable custom id of a batch request, e.g. 'descriptions:H1001'
+    """
+    return f"{task}:{hotel_id}"
+
+
+def split_key(key: str) -> Tuple[str, str]:
+    task, _, hotel_id = key.partition(':')
+    return task, hotel_id
+
+
+def request_line(key: str, payload: dict) -> str:
+    """
+    One line of a Gemini batch input file
+    """
+    return json.dumps({"key": key, "request": payload}) + "\n"
+
+
+def result_line(key: str, text: Optional[str] = None, error: Optional[str] = None) -> str:
+    """
+    One line of a Gemini batch results file
+    """
+    if error is not None:
+        return json.dumps({"key": key, "error": {"message": error}}) + "\n"
+    response = {"candidates": [{"content": {"parts": [{"text": text}]}}]}
+    return json.dumps({"key": key, "response": response}) + "\n"
+
+
+def response_text(record: dict) -> Optional[str]:
+    """
+    Generated text of a results record, or None for errors and empty responses
+    """
+    try:
+        return record['response']['candidates'][0]['content']['parts'][0]['text']
+    except (KeyError, IndexError, TypeError):
+        return None
+
+
+def response_error(record: dict) -> str:
+    """
+    Why a results record has no usable result: its error message, or a
+    generic reason when the response was empty or unparseable
+    """
+    error = record.get('error')
+    if isinstance(error, dict):
+        error = error.get('message') or json.dumps(error)
+    return str(error) if error else "no usable response"
+
+
+def read_jsonl(path: str) -> Iterator[dict]:
+    """
+    Stream the records of a JSONL file, skipping blank lines
+    """
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
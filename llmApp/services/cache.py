@@ -0,0 +1,114 @@
+# llmApp/services/cache.py
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+from typing import Optional
+
+from django.conf import settings
+
+
+class ResponseCache:
+    """
+    Content-addressed store of LLM responses in a local SQLite file.
+
+    Entries are keyed on the model and the exact request body (prompt plus
+    generation config), so an unchanged prompt never pays for a second call.
+    Entries older than ``max_age`` seconds are dropped, and once the stored
+    responses exceed ``max_bytes`` the least recently used ones go first.
+    """
+    EVICT_EVERY = 500
+
+    def __init__(self, path: str, max_age: float = 30 * 86400, max_bytes: int = 512 * 1024 * 1024):
+        self.path = path
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            '''
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                response TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            '''
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses(accessed_at)')
+        self._conn.commit()
+        self.evict()
+
+    @staticmethod
+    def make_key(model: str, payload: dict) -> str:
+        body = json.dumps(payload, sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(f"{model}\n{body}".encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT response FROM responses WHERE key = ? AND created_at >= ?',
+                (key, now - self.max_age),
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute('UPDATE responses SET accessed_at = ? WHERE key = ?', (now, key))
+            self._conn.commit()
+        return row[0]
+
+    def set(self, key: str, model: str, response: str):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO responses (key, model, response, size, created_at, accessed_at) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (key, model, response, len(response.encode()), now, now),
+            )
+            self._conn.commit()
+            self._writes += 1
+            due = self._writes % self.EVICT_EVERY == 0
+        if due:
+            self.evict()
+
+    def evict(self) -> int:
+        """
+        Drop expired entries, then the least recently used ones until the
+        cache fits in ``max_bytes``. Returns the number of entries removed.
+        """
+        with self._lock:
+            removed = self._conn.execute(
+                'DELETE FROM responses WHERE created_at < ?', (time.time() - self.max_age,)
+            ).rowcount
+            total = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+            if total > self.max_bytes:
+                excess = total - self.max_bytes
+                freed = 0
+                keys = []
+                for key, size in self._conn.execute('SELECT key, size FROM responses ORDER BY accessed_at'):
+                    keys.append(key)
+                    freed += size
+                    if freed >= excess:
+                        break
+                self._conn.executemany('DELETE FROM responses WHERE key = ?', [(key,) for key in keys])
+                removed += len(keys)
+            self._conn.commit()
+        return removed
+
+
+@lru_cache(maxsize=None)
+def get_response_cache() -> ResponseCache:
+    """
+    The process-wide response cache configured in settings
+    """
+    return ResponseCache(
+        settings.LLM_CACHE_PATH,
+        max_age=settings.LLM_CACHE_MAX_AGE_DAYS * 86400,
+        max_bytes=settings.LLM_CACHE_MAX_MB * 1024 * 1024,
+    )
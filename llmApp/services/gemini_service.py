@@ -1,126 +1,80 @@
 # llmApp/services/gemini_service.py
+import json
 import os
 import requests
-from typing import Optional, Tuple
-import json
-
-class GeminiService:
-    def __init__(self):
-        self.api_key = os.getenv('GEMINI_API_KEY')
-        self.base_url = "https://generativelanguage.googleapis.com/v1beta/models"
-        self.model = "gemini-2.0-flash-exp"
-        
-    def _make_request(self, prompt: str) -> Optional[str]:
-        """
-        Make a request to the Gemini API
-        """
-        try:
-            url = f"{self.base_url}/{self.model}:generateContent?key={self.api_key}"
-            
-            payload = {
-                "contents": [{
-                    "parts": [{"text": prompt}]
-                }]
-            }
-            
-            headers = {
-                'Content-Type': 'application/json'
-            }
-            
-            response = requests.post(url, headers=headers, json=payload)
-            response.raise_for_status()
-            
-            result = response.json()
-            
-            # Extract the generated text from the response
-            if 'candidates' in result and len(result['candidates']) > 0:
-                return result['candidates'][0]['content']['parts'][0]['text']
-            return None
-            
-        except requests.exceptions.RequestException as e:
-            print(f"Error making request: {str(e)}")
-            return None
-        except Exception as e:
-            print(f"Unexpected error: {str(e)}")
-            return None
+from typing import Iterator, Optional, Tuple
 
-    def rewrite_property_title(self, hotel) -> Optional[str]:
-        prompt = f"""Rewrite this hotel property title to be more engaging and descriptive:
-        Current Title: {hotel.property_title}
-        Location: {hotel.city_name}
-        Room Type: {hotel.room_type}
-        Rating: {hotel.rating}/5
-        
-        Rules:
-        1. Keep it concise but descriptive
-        2. Include the location if relevant
-        3. Highlight any unique features
-        4. Maintain professionalism
-        5. Return only the new title, no additional text
-        """
-        return self._make_request(prompt)
-    
-    def generate_property_description(self, property_data) -> Optional[str]:
-        prompt = f"""Generate an engaging hotel description:
-        Hotel: {property_data['property_title']}
-        Location: {property_data['city_name']}
-        Room Type: {property_data['room_type']}
-        Rating: {property_data['rating']}/5
-        Price: ${property_data['price']} per night
+from django.conf import settings
 
-        Write 2-3 paragraphs highlighting location, amenities, and value proposition.
-        """
-        return self._make_request(prompt)
+from llmApp.services.base import LLMService
+from llmApp.services.transport import TokenUsage
 
-    def generate_property_summary(self, property_data) -> Optional[str]:
-        prompt = f"""Create a brief summary for this hotel:
-        Name: {property_data['property_title']}
-        Location: {property_data['city_name']}
-        Price: ${property_data['price']}
-        Rating: {property_data['rating']}/5
-        Description: {property_data.get('description', 'Not available')}
+class GeminiService(LLMService):
+    model = "gemini-2.0-flash-exp"
 
-        Create a concise 2-3 sentence summary highlighting key features.
-        """
-        return self._make_request(prompt)
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.base_url = settings.GEMINI_BASE_URL.rstrip('/')
+        self.api_key = os.getenv('GEMINI_API_KEY')
 
-    def generate_property_review(self, property_data) -> Tuple[Optional[float], Optional[str]]:
-        prompt = f"""Generate a hotel review:
-        Name: {property_data['property_title']}
-        Location: {property_data['city_name']}
-        Price: ${property_data['price']}
-        Current Rating: {property_data['rating']}/5
+    def endpoint(self) -> str:
+        return f"{self.base_url}/{self.model}:generateContent?key={self.api_key}"
 
-        Format your response EXACTLY like this:
-        RATING: [single number 1-5]
-        REVIEW: [detailed review text]
+    def stream_endpoint(self) -> str:
+        return f"{self.base_url}/{self.model}:streamGenerateContent?alt=sse&key={self.api_key}"
 
-        Note: The rating should be just a single number between 1 and 5.
+    def count_tokens(self, text: str) -> int:
         """
-        
-        response = self._make_request(prompt)
-        if not response:
-            return None, None
-
+        Exact count from the countTokens endpoint with LLM_TOKEN_COUNTER=api,
+        falling back to the local estimate if that call fails
+        """
+        if settings.LLM_TOKEN_COUNTER != 'api':
+            return super().count_tokens(text)
         try:
-            # Split the response into rating and review
-            parts = response.split('\n', 1)
-            if len(parts) != 2:
-                return None, None
-                
-            # Extract rating
-            rating_part = parts[0].replace('RATING:', '').strip()
-            try:
-                rating = float(rating_part)
-                rating = min(max(rating, 1), 5)  # Ensure rating is between 1 and 5
-            except ValueError:
-                return None, None
+            response = self.session.post(
+                f"{self.base_url}/{self.model}:countTokens?key={self.api_key}",
+                json={"contents": [{"parts": [{"text": text}]}]},
+                timeout=self.timeout,
+            )
+            response.raise_for_status()
+            return int(response.json()['totalTokens'])
+        except (requests.exceptions.RequestException, KeyError, TypeError, ValueError):
+            return super().count_tokens(text)
+
+    def build_payload(self, prompt: str, generation_config: Optional[dict] = None) -> dict:
+        payload = {
+            "contents": [{
+                "parts": [{"text": prompt}]
+            }]
+        }
+        if generation_config:
+            payload["generationConfig"] = generation_config
+        return payload
+
+    def read_usage(self, result: dict) -> Optional[TokenUsage]:
+        metadata = result.get('usageMetadata')
+        if not isinstance(metadata, dict) or 'totalTokenCount' not in metadata:
+            return None
+        return TokenUsage(
+            prompt=metadata.get('promptTokenCount', 0),
+            output=metadata.get('candidatesTokenCount', 0),
+            total=metadata['totalTokenCount'],
+        )
+
+    def read_response(self, response: requests.Response) -> Tuple[Optional[str], Optional[TokenUsage]]:
+        result = response.json()
+        usage = self.read_usage(result)
 
-            # Extract review
-            review = parts[1].replace('REVIEW:', '').strip()
-            
-            return rating, review
+        # Extract the generated text from the response
+        if 'candidates' in result and len(result['candidates']) > 0:
+            return result['candidates'][0]['content']['parts'][0]['text'], usage
+        return None, usage
 
-        except Exception as e:
-            print(f"Error parsing response: {str(e)}")
-            return None, None
\ No newline at end of file
+    def iter_chunks(self, response: requests.Response) -> Iterator[Tuple[str, Optional[TokenUsage]]]:
+        # Server-sent events: one "data: {...}" line per partial GenerateContentResponse
+        for line in response.iter_lines():
+            if not line.startswith(b'data:'):
+                continue
+            event = json.loads(line[len(b'data:'):])
+            parts = event.get('candidates', [{}])[0].get('content', {}).get('parts', [])
+            yield ''.join(part.get('text', '') for part in parts), self.read_usage(event)
@@ -0,0 +1,380 @@
+# llmApp/services/metrics.py
+import bisect
+import json
+import threading
+import time
+from typing import Dict, List, Optional
+
+from django.conf import settings
+
+from llmApp.services.state_file import LockedJSONFile
+
+# Latency buckets in seconds, from a cached response to a slow generation
+DEFAULT_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+
+class Metric:
+    """
+    A named family of values, one per combination of label values.
+
+    Values accumulate in this process; ``publish`` adds what changed since
+    the last publish to the shared metrics file the /metrics view reads.
+    """
+    kind = None
+
+    def __init__(self, registry, name: str, help: str, labels=()):
+        self.registry = registry
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.values = {}
+        self.published = {}
+
+    def key(self, labels: dict) -> str:
+        return json.dumps([str(labels[label]) for label in self.labels])
+
+    def delta(self, key):
+        raise NotImplementedError
+
+    def reset(self):
+        self.values = {}
+        self.published = {}
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self.key(labels)
+        with self.registry.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def delta(self, key):
+        return self.values[key] - self.published.get(key, 0)
+
+    @staticmethod
+    def merge(stored, delta):
+        return (stored or 0) + delta
+
+
+class Gauge(Metric):
+    kind = 'gauge'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.peaks = {}
+
+    def set(self, value, **labels):
+        key = self.key(labels)
+        with self.registry.lock:
+            self.values[key] = value
+            self.peaks[key] = max(self.peaks.get(key, value), value)
+
+    def delta(self, key):
+        return self.values[key]
+
+    @staticmethod
+    def merge(stored, delta):
+        return delta
+
+    def reset(self):
+        super().reset()
+        self.peaks = {}
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, *args, buckets=DEFAULT_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, **labels):
+        key = self.key(labels)
+        with self.registry.lock:
+            entry = self.values.setdefault(key, {'counts': [0] * (len(self.buckets) + 1), 'sum': 0.0})
+            entry['counts'][bisect.bisect_left(self.buckets, value)] += 1
+            entry['sum'] += value
+
+    def delta(self, key):
+        entry = self.values[key]
+        published = self.published.get(key, {'counts': [0] * len(entry['counts']), 'sum': 0.0})
+        return {
+            'counts': [now - before for now, before in zip(entry['counts'], published['counts'])],
+            'sum': entry['sum'] - published['sum'],
+        }
+
+    @staticmethod
+    def merge(stored, delta):
+        if not stored:
+            return delta
+        return {
+            'counts': [a + b for a, b in zip(stored['counts'], delta['counts'])],
+            'sum': stored['sum'] + delta['sum'],
+        }
+
+    def quantile(self, q: float, key: str) -> float:
+        """
+        Upper bound of the bucket holding the ``q`` quantile of one series
+        """
+        counts = self.values[key]['counts']
+        rank = q * sum(counts)
+        seen = 0
+        for bound, count in zip(self.buckets + (float('inf'),), counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float('inf')
+
+
+class Registry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.metrics: Dict[str, Metric] = {}
+        self.last_publish = 0.0
+
+    def counter(self, name, help, labels=()) -> Counter:
+        return self._add(Counter(self, name, help, labels))
+
+    def gauge(self, name, help, labels=()) -> Gauge:
+        return self._add(Gauge(self, name, help, labels))
+
+    def histogram(self, name, help, labels=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._add(Histogram(self, name, help, labels, buckets=buckets))
+
+    def _add(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+
+    def snapshot(self) -> dict:
+        """
+        This process's values in the same shape as the shared file
+        """
+        with self.lock:
+            return {
+                metric.name: {
+                    'kind': metric.kind,
+                    'help': metric.help,
+                    'labels': metric.labels,
+                    'buckets': getattr(metric, 'buckets', None),
+                    'values': json.loads(json.dumps(metric.values)),
+                }
+                for metric in self.metrics.values()
+            }
+
+    def publish(self, path: Optional[str] = None, min_interval: float = 0):
+        """
+        Add everything recorded since the last publish to the shared file.
+        With ``min_interval``, skip if the last publish was more recent.
+        """
+        path = path or settings.LLM_METRICS_FILE
+        if not path or time.monotonic() - self.last_publish < min_interval:
+            return
+        with self.lock, LockedJSONFile(path) as state:
+            for metric in self.metrics.values():
+                stored = state.setdefault(metric.name, {
+                    'kind': metric.kind,
+                    'help': metric.help,
+                    'labels': metric.labels,
+                    'buckets': getattr(metric, 'buckets', None),
+                    'values': {},
+                })
+                for key in metric.values:
+                    stored['values'][key] = metric.merge(stored['values'].get(key), metric.delta(key))
+                metric.published = json.loads(json.dumps(metric.values))
+        self.last_publish = time.monotonic()
+
+    def start_run(self):
+        """
+        Publish what the previous run left and start counting afresh, so the
+        end-of-run summary covers only this run
+        """
+        self.publish()
+        with self.lock:
+            for metric in self.metrics.values():
+                metric.reset()
+
+
+REGISTRY = Registry()
+
+LLM_REQUEST_SECONDS = REGISTRY.histogram(
+    'llm_request_duration_seconds', 'Time from sending an LLM request to its complete response',
+    ('task', 'model'),
+)
+LLM_FIRST_TOKEN_SECONDS = REGISTRY.histogram(
+    'llm_time_to_first_token_seconds', 'Time until the first chunk of a streamed response',
+    ('task', 'model'),
+)
+LLM_REQUESTS = REGISTRY.counter(
+    'llm_requests_total', 'LLM calls by outcome (ok, failed, cached or coalesced)', ('task', 'model', 'outcome'),
+)
+LLM_RESPONSES = REGISTRY.counter(
+    'llm_responses_total', 'HTTP responses by status code, retried attempts included',
+    ('task', 'model', 'status'),
+)
+LLM_RETRIES = REGISTRY.counter('llm_retries_total', 'Retried LLM request attempts', ('task', 'model'))
+LLM_HEDGES = REGISTRY.counter(
+    'llm_hedged_requests_total', 'Calls that sent a duplicate request because the first was slow', ('task', 'model'),
+)
+LLM_TOKENS = REGISTRY.counter(
+    'llm_tokens_total', 'Tokens reported by the provider, by kind (prompt or output)', ('task', 'model', 'kind'),
+)
+LLM_PARSES = REGISTRY.counter(
+    'llm_parse_results_total', 'Parsed responses by outcome (json, text fallback or failed)',
+    ('task', 'model', 'outcome'),
+)
+DB_FLUSH_SECONDS = REGISTRY.histogram(
+    'db_flush_duration_seconds', 'Time to write one batch of results', ('task',),
+)
+QUEUE_DEPTH = REGISTRY.gauge(
+    'generation_queue_depth', 'Hotels in flight or waiting to be written', ('task', 'queue'),
+)
+
+
+def observe_call(model: str, stats, ok: bool):
+    """
+    Record one finished LLM call from its CallStats
+    """
+    labels = {'task': stats.task or 'none', 'model': model}
+    LLM_REQUESTS.inc(outcome='ok' if ok else 'failed', **labels)
+    for status in stats.status_codes:
+        LLM_RESPONSES.inc(status=status, **labels)
+    if stats.retries:
+        LLM_RETRIES.inc(stats.retries, **labels)
+    if stats.hedged:
+        LLM_HEDGES.inc(**labels)
+    if stats.latency is not None:
+        LLM_REQUEST_SECONDS.observe(stats.latency, **labels)
+    if stats.first_token is not None:
+        LLM_FIRST_TOKEN_SECONDS.observe(stats.first_token, **labels)
+    if stats.usage is not None:
+        LLM_TOKENS.inc(stats.usage.prompt, kind='prompt', **labels)
+        LLM_TOKENS.inc(stats.usage.output, kind='output', **labels)
+
+
+def observe_cache_hit(model: str, stats):
+    LLM_REQUESTS.inc(task=stats.task or 'none', model=model, outcome='cached')
+
+
+def observe_coalesced(model: str, stats):
+    LLM_REQUESTS.inc(task=stats.task or 'none', model=model, outcome='coalesced')
+
+
+def observe_parse(model: str, task: str, outcome: str):
+    LLM_PARSES.inc(task=task, model=model, outcome=outcome)
+
+
+def read_published(path: Optional[str] = None) -> dict:
+    """
+    Totals published by every process, or this process's own values when no
+    metrics file is configured
+    """
+    path = path or settings.LLM_METRICS_FILE
+    if not path:
+        return REGISTRY.snapshot()
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _format_labels(names, values, extra=()) -> str:
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n') for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+def render(state: dict) -> str:
+    """
+    Prometheus text exposition format for a snapshot or the shared file
+    """
+    lines = []
+    for name, metric in sorted(state.items()):
+        lines.append(f"# HELP {name} {metric['help']}")
+        lines.append(f"# TYPE {name} {metric['kind']}")
+        for key, value in sorted(metric['values'].items()):
+            label_values = json.loads(key)
+            if metric['kind'] != 'histogram':
+                lines.append(f"{name}{_format_labels(metric['labels'], label_values)} {value}")
+                continue
+            cumulative = 0
+            bounds = [str(bound) for bound in metric['buckets']] + ['+Inf']
+            for bound, count in zip(bounds, value['counts']):
+                cumulative += count
+                labels = _format_labels(metric['labels'], label_values, [('le', bound)])
+                lines.append(f"{name}_bucket{labels} {cumulative}")
+            labels = _format_labels(metric['labels'], label_values)
+            lines.append(f"{name}_sum{labels} {value['sum']}")
+            lines.append(f"{name}_count{labels} {cumulative}")
+    return '\n'.join(lines) + '\n'
+
+
+def summary_lines() -> List[str]:
+    """
+    Human readable digest of this process's metrics since ``start_run``
+    """
+    lines = []
+    for key, entry in sorted(LLM_REQUEST_SECONDS.values.items()):
+        task, model = json.loads(key)
+        count = sum(entry['counts'])
+        line = (
+            f"{task} on {model}: {count} calls, "
+            f"p50 <= {LLM_REQUEST_SECONDS.quantile(0.5, key)}s, p95 <= {LLM_REQUEST_SECONDS.quantile(0.95, key)}s"
+        )
+        first_token = LLM_FIRST_TOKEN_SECONDS.values.get(key)
+        if first_token:
+            line += f", avg first token {first_token['sum'] / sum(first_token['counts']):.2f}s"
+        prompt = LLM_TOKENS.values.get(json.dumps([task, model, 'prompt']), 0)
+        output = LLM_TOKENS.values.get(json.dumps([task, model, 'output']), 0)
+        if prompt or output:
+            line += f", {prompt} prompt + {output} output tokens"
+        lines.append(line)
+
+    hedges = sum(LLM_HEDGES.values.values())
+    if hedges:
+        lines.append(f"Hedged requests: {hedges}")
+
+    statuses = {}
+    for key, count in LLM_RESPONSES.values.items():
+        status = json.loads(key)[2]
+        statuses[status] = statuses.get(status, 0) + count
+    if statuses:
+        lines.append("HTTP responses: " + ", ".join(f"{status} x{count}" for status, count in sorted(statuses.items())))
+
+    saved = {}
+    for key, count in LLM_REQUESTS.values.items():
+        task, _, outcome = json.loads(key)
+        if outcome == 'coalesced':
+            saved[task] = saved.get(task, 0) + count
+    if saved:
+        lines.append(
+            "Calls saved by identical prompts: " + ", ".join(f"{task} {count}" for task, count in sorted(saved.items()))
+        )
+
+    parses = {}
+    for key, count in LLM_PARSES.values.items():
+        task, model, outcome = json.loads(key)
+        parses.setdefault((task, model), {})[outcome] = count
+    for (task, model), outcomes in sorted(parses.items()):
+        total = sum(outcomes.values())
+        lines.append(
+            f"Parsed {task} on {model}: {outcomes.get('json', 0)} json, {outcomes.get('text', 0)} text, "
+            f"{outcomes.get('failed', 0)} failed ({100 * outcomes.get('failed', 0) / total:.1f}% failed)"
+        )
+
+    for key, entry in sorted(DB_FLUSH_SECONDS.values.items()):
+        count = sum(entry['counts'])
+        lines.append(
+            f"DB writes ({json.loads(key)[0]}): {count} batches, avg {entry['sum'] / count:.3f}s, "
+            f"p95 <= {DB_FLUSH_SECONDS.quantile(0.95, key)}s"
+        )
+
+    peaks = [
+        "{} {} {}".format(*json.loads(key), peak) for key, peak in sorted(QUEUE_DEPTH.peaks.items())
+    ]
+    if peaks:
+        lines.append("Peak queue depth: " + ", ".join(peaks))
+    return lines
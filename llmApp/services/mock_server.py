@@ -0,0 +1,185 @@
+# llmApp/services/mock_server.py
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import urlparse
+
+FILLER = (
+    "Guests enjoy a calm stay close to the old town, with bright rooms, friendly staff "
+    "and an easy walk to cafes, museums and the waterfront. "
+)
+
+
+class MockLLMServer:
+    """
+    Local stand-in for the Gemini and Ollama HTTP APIs, for benchmarks.
+
+    Serves generateContent, streamGenerateContent (SSE) and Ollama's
+    /api/generate with a configurable latency, jitter, share of 429
+    responses and response size. The answers follow the shape each prompt
+    asks for: a JSON object or array matching the response schema, a
+    single-line title, a RATING/REVIEW pair, or ``response_chars`` of prose.
+    """
+    def __init__(self, latency: float = 0.2, jitter: float = 0.05, rate_429: float = 0.0,
+                 response_chars: int = 600, host: str = '127.0.0.1', port: int = 0, seed: Optional[int] = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_429 = rate_429
+        self.response_chars = response_chars
+        self.random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.throttled = 0
+        self.httpd = ThreadingHTTPServer((host, port), self._handler())
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+    def delay(self) -> float:
+        with self._lock:
+            return max(0.0, self.latency + self.random.uniform(-self.jitter, self.jitter))
+
+    def throttle(self) -> bool:
+        with self._lock:
+            self.requests += 1
+            if self.random.random() < self.rate_429:
+                self.throttled += 1
+                return True
+            return False
+
+    def answer(self, prompt: str, schema) -> str:
+        """
+        Plausible response text for ``prompt``
+        """
+        if schema and schema.get('type', '').upper() == 'OBJECT':
+            properties = schema.get('properties', {})
+            return json.dumps({
+                key: 4 if spec.get('type', '').upper() == 'NUMBER' else self.prose(key)
+                for key, spec in properties.items()
+            })
+        if schema:
+            field = next(key for key in schema.get('items', {}).get('properties', {}) if key != 'hotel_id')
+            hotel_ids = re.findall(r'"hotel_id": "([^"]+)"', prompt)
+            return json.dumps([{'hotel_id': hotel_id, field: self.prose(field)} for hotel_id in hotel_ids])
+        if 'RATING:' in prompt:
+            return f"RATING: 4\nREVIEW: {self.prose('review')}"
+        if prompt.startswith('Rewrite this hotel property title'):
+            return self.prose('title')
+        return self.prose('text')
+
+    def prose(self, kind: str) -> str:
+        if kind == 'title':
+            return "Bright Harbour View Suite"
+        return (FILLER * (self.response_chars // len(FILLER) + 1))[:self.response_chars].strip()
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+                path = urlparse(self.path).path
+                if server.throttle():
+                    return self.send_json(429, {'error': {'code': 429, 'message': 'Resource exhausted'}})
+
+                if path.endswith(':generateContent') or path.endswith(':streamGenerateContent'):
+                    prompt = body['contents'][0]['parts'][0]['text']
+                    schema = body.get('generationConfig', {}).get('responseSchema')
+                    text = server.answer(prompt, schema)
+                    if path.endswith(':streamGenerateContent'):
+                        return self.stream(text, prompt, self.gemini_event, 'text/event-stream')
+                    time.sleep(server.delay())
+                    return self.send_json(200, self.gemini_event(text, prompt, done=True))
+
+                if path == '/api/generate':
+                    schema = body.get('format') if isinstance(body.get('format'), dict) else None
+                    text = server.answer(body['prompt'], schema)
+                    if body.get('stream'):
+                        return self.stream(text, body['prompt'], self.ollama_event, 'application/x-ndjson')
+                    time.sleep(server.delay())
+                    return self.send_json(200, self.ollama_event(text, body['prompt'], done=True))
+
+                self.send_json(404, {'error': f'unknown path {path}'})
+
+            def gemini_event(self, text, prompt, done):
+                event = {'candidates': [{'content': {'parts': [{'text': text}], 'role': 'model'}}]}
+                if done:
+                    event['usageMetadata'] = {
+                        'promptTokenCount': len(prompt) // 4,
+                        'candidatesTokenCount': len(text) // 4,
+                        'totalTokenCount': len(prompt) // 4 + len(text) // 4,
+                    }
+                return event
+
+            def ollama_event(self, text, prompt, done):
+                event = {'model': 'mock', 'response': text, 'done': done}
+                if done:
+                    event.update(prompt_eval_count=len(prompt) // 4, eval_count=len(text) // 4)
+                return event
+
+            def stream(self, text, prompt, make_event, content_type):
+                """
+                Send ``text`` in about ten chunks spread over the latency,
+                the first one after a fifth of it
+                """
+                delay = server.delay()
+                size = max(1, len(text) // 10)
+                pieces = [text[i:i + size] for i in range(0, len(text), size)] or ['']
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Transfer-Encoding', 'chunked')
+                self.end_headers()
+                time.sleep(delay * 0.2)
+                try:
+                    for index, piece in enumerate(pieces):
+                        last = index == len(pieces) - 1
+                        event = json.dumps(make_event(piece, prompt, last))
+                        line = f"data: {event}\r\n\r\n" if content_type == 'text/event-stream' else f"{event}\n"
+                        data = line.encode()
+                        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+                        self.wfile.flush()
+                        if not last:
+                            time.sleep(delay * 0.8 / len(pieces))
+                    self.wfile.write(b"0\r\n\r\n")
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client hung up early, e.g. once a title was complete
+                    self.close_connection = True
+
+            def send_json(self, status, payload):
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
@@ -0,0 +1,105 @@
+# llmApp/services/ollama_service.py
+import json
+import requests
+from typing import Iterator, Optional, Tuple
+
+from django.conf import settings
+
+from llmApp.services.base import LLMService
+from llmApp.services.rate_limiter import RateLimiter
+from llmApp.services.transport import TokenUsage
+
+
+def to_json_schema(schema):
+    """
+    Translate a Gemini responseSchema (upper-case OpenAPI types) into the
+    plain JSON schema Ollama accepts in ``format``
+    """
+    if isinstance(schema, dict):
+        return {
+            key: value.lower() if key == 'type' and isinstance(value, str) else to_json_schema(value)
+            for key, value in schema.items()
+        }
+    if isinstance(schema, list):
+        return [to_json_schema(item) for item in schema]
+    return schema
+
+
+class OllamaService(LLMService):
+    """
+    Client for a self-hosted Ollama server (/api/generate).
+
+    The model is kept loaded between calls with ``keep_alive`` and, with
+    streaming on, the answer is read chunk by chunk as it is generated. Local
+    hardware has no provider quota, so the shared rate limiter is not used.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.base_url = settings.OLLAMA_HOST.rstrip('/')
+        self.model = settings.OLLAMA_MODEL
+        self.stream = settings.OLLAMA_STREAM
+        self.post_kwargs = {'stream': self.stream}
+
+    def default_rate_limiter(self) -> RateLimiter:
+        return RateLimiter()
+
+    def endpoint(self) -> str:
+        return f"{self.base_url}/api/generate"
+
+    def stream_endpoint(self) -> str:
+        return self.endpoint()
+
+    def build_payload(self, prompt: str, generation_config: Optional[dict] = None) -> dict:
+        payload = {
+            "model": self.model,
+            "prompt": prompt,
+            "stream": self.stream,
+            "keep_alive": settings.OLLAMA_KEEP_ALIVE,
+            "options": {
+                "num_ctx": settings.OLLAMA_NUM_CTX,
+                "num_predict": settings.OLLAMA_NUM_PREDICT,
+            },
+        }
+        generation_config = generation_config or {}
+        if generation_config.get('maxOutputTokens'):
+            payload["options"]["num_predict"] = min(settings.OLLAMA_NUM_PREDICT, generation_config['maxOutputTokens'])
+        if 'responseSchema' in generation_config:
+            payload["format"] = to_json_schema(generation_config['responseSchema'])
+        elif generation_config.get('responseMimeType') == 'application/json':
+            payload["format"] = "json"
+        return payload
+
+    def build_stream_payload(self, prompt: str, generation_config: Optional[dict] = None) -> dict:
+        return dict(self.build_payload(prompt, generation_config), stream=True)
+
+    def read_response(self, response: requests.Response) -> Tuple[Optional[str], Optional[TokenUsage]]:
+        if not self.stream:
+            return self._read_chunks([self._read_chunk(response.json())])
+        try:
+            return self._read_chunks(self.iter_chunks(response))
+        finally:
+            response.close()
+
+    def iter_chunks(self, response: requests.Response) -> Iterator[Tuple[str, Optional[TokenUsage]]]:
+        for line in response.iter_lines():
+            if line:
+                yield self._read_chunk(json.loads(line))
+
+    def _read_chunk(self, chunk) -> Tuple[str, Optional[TokenUsage]]:
+        if 'error' in chunk:
+            raise requests.exceptions.RequestException(chunk['error'])
+        usage = None
+        if chunk.get('done'):
+            prompt, output = chunk.get('prompt_eval_count', 0), chunk.get('eval_count', 0)
+            usage = TokenUsage(prompt=prompt, output=output, total=prompt + output)
+        return chunk.get('response', ''), usage
+
+    def _read_chunks(self, chunks) -> Tuple[Optional[str], Optional[TokenUsage]]:
+        parts = []
+        usage = None
+        for text, chunk_usage in chunks:
+            parts.append(text)
+            if chunk_usage is not None:
+                usage = chunk_usage
+        text = ''.join(parts)
+        return (text or None), usage
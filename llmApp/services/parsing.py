@@ -0,0 +1,117 @@
+# llmApp/services/parsing.py
+import json
+import re
+from typing import Optional, Tuple
+
+# How a response was understood, the outcome label of the parse metrics
+PARSED_JSON = 'json'
+PARSED_TEXT = 'text'
+PARSE_FAILED = 'failed'
+
+FENCE_PATTERN = re.compile(r'```(?:json)?\s*(.*?)```', re.S | re.I)
+# "RATING: 4", "**Rating:** 4.5/5", "Rating - 3"
+RATING_PATTERN = re.compile(r'rating\W{0,6}?(\d+(?:\.\d+)?)', re.I)
+# "REVIEW: ...", "**Review:** ..."
+REVIEW_PATTERN = re.compile(r'review\s*\**\s*[:\-]\s*\**\s*(.+)', re.I | re.S)
+TITLE_PREFIX_PATTERN = re.compile(r'^(?:new\s+)?title\s*\**\s*:\s*\**\s*', re.I)
+# max_length of Hotel.property_title, which a parsed title is written to
+TITLE_MAX_LENGTH = 255
+
+
+def load_json(text: Optional[str]):
+    """
+    The JSON value in ``text``, tolerating markdown code fences and chatter
+    around it; None if there is none
+    """
+    if not text:
+        return None
+    text = text.strip()
+    fenced = FENCE_PATTERN.search(text)
+    if fenced:
+        text = fenced.group(1).strip()
+    try:
+        return json.loads(text)
+    except ValueError:
+        pass
+    # The outermost object or array inside surrounding prose
+    for opening, closing in (('{', '}'), ('[', ']')):
+        start, end = text.find(opening), text.rfind(closing)
+        if start != -1 and end > start:
+            try:
+                return json.loads(text[start:end + 1])
+            except ValueError:
+                continue
+    return None
+
+
+def clean_text(value) -> Optional[str]:
+    if not isinstance(value, str):
+        return None
+    value = value.strip().strip('*').strip()
+    return value or None
+
+
+def clamp_rating(value) -> Optional[float]:
+    try:
+        rating = float(value)
+    except (TypeError, ValueError):
+        return None
+    return min(max(rating, 1), 5)
+
+
+def parse_review(text: Optional[str]) -> Tuple[Optional[float], Optional[str], str]:
+    """
+    (rating, review, outcome) from a JSON {"rating", "review"} object or,
+    failing that, from RATING:/REVIEW: text with any preamble, markdown or
+    blank lines around it
+    """
+    data = load_json(text)
+    if isinstance(data, dict):
+        rating, review = clamp_rating(data.get('rating')), clean_text(data.get('review'))
+        if rating is not None and review:
+            return rating, review, PARSED_JSON
+
+    if text:
+        rating_match = RATING_PATTERN.search(text)
+        if rating_match:
+            rating = clamp_rating(rating_match.group(1))
+            review_match = REVIEW_PATTERN.search(text, rating_match.end())
+            if review_match:
+                review = clean_text(review_match.group(1))
+            else:
+                # No REVIEW marker: whatever follows the rating line
+                review = clean_text(text[rating_match.end():].partition('\n')[2])
+            if rating is not None and review:
+                return rating, review, PARSED_TEXT
+    return None, None, PARSE_FAILED
+
+
+def fit_title(title: Optional[str], max_length: int) -> Optional[str]:
+    """
+    The first non-empty line of ``title``, cut to ``max_length`` characters
+    """
+    if not title:
+        return None
+    line = next((line.strip() for line in title.splitlines() if line.strip()), '')
+    return line[:max_length].rstrip() or None
+
+
+def parse_title(text: Optional[str], max_length: int = TITLE_MAX_LENGTH) -> Tuple[Optional[str], str]:
+    """
+    (title, outcome) from a JSON {"title"} object or plain text, without a
+    "Title:" label or wrapping quotes; a single line that fits the
+    property_title column
+    """
+    data = load_json(text)
+    if isinstance(data, dict):
+        title = fit_title(clean_text(data.get('title')), max_length)
+        if title:
+            return title, PARSED_JSON
+        return None, PARSE_FAILED
+
+    title = fit_title(clean_text(text), max_length)
+    if title:
+        title = fit_title(TITLE_PREFIX_PATTERN.sub('', title).strip().strip('"\'').strip(), max_length)
+    if title:
+        return title, PARSED_TEXT
+    return None, PARSE_FAILED
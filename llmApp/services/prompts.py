@@ -0,0 +1,180 @@
+# llmApp/services/prompts.py
+import textwrap
+from string import Formatter
+from typing import Callable, Iterable, Optional
+
+from llmApp.services.rate_limiter import estimate_tokens
+
+
+def compact(text: str) -> str:
+    """
+    Collapse runs of whitespace, e.g. the blank lines of scraped descriptions
+    """
+    return ' '.join(text.split())
+
+
+def truncate_text(text: str, max_chars: int) -> str:
+    """
+    ``text`` cut to at most ``max_chars`` characters at a word boundary,
+    marked with an ellipsis when anything was dropped
+    """
+    if len(text) <= max_chars:
+        return text
+    if max_chars <= 1:
+        return ''
+    cut = text[:max_chars - 1]
+    head, space, _ = cut.rpartition(' ')
+    # Only back off to a word boundary when it keeps most of the text
+    if space and len(head) > max_chars // 2:
+        cut = head
+    return cut.rstrip() + '…'
+
+
+class PromptTemplate:
+    """
+    A prompt parsed once into literal text and named placeholders.
+
+    The template is dedented, so indentation in the source costs no tokens.
+    ``truncate`` names the free-text fields that are compacted and, when
+    the prompt exceeds its token budget, trimmed to fit.
+    """
+    def __init__(self, text: str, truncate: Iterable[str] = ()):
+        self.text = textwrap.dedent(text).strip('\n')
+        self.parts = [(literal, field) for literal, field, _, _ in Formatter().parse(self.text)]
+        self.fields = [field for _, field in self.parts if field]
+        self.truncate = tuple(truncate)
+
+    def _join(self, values: dict) -> str:
+        return ''.join(literal + (values[field] if field else '') for literal, field in self.parts)
+
+    def render(self, values: dict, max_tokens: Optional[int] = None,
+               count_tokens: Callable[[str], int] = estimate_tokens) -> str:
+        """
+        The prompt for ``values``, no longer than ``max_tokens`` as far as
+        trimming the free-text fields allows. ``count_tokens`` is only asked
+        when the local estimate comes near the budget.
+        """
+        values = {field: str(values[field]) for field in self.fields}
+        for field in self.truncate:
+            values[field] = compact(values[field])
+        prompt = self._join(values)
+        if not max_tokens or not self.truncate or estimate_tokens(prompt) <= max_tokens * 3 // 4:
+            return prompt
+
+        tokens = count_tokens(prompt)
+        if tokens <= max_tokens:
+            return prompt
+        # Drop the share of characters the excess tokens stand for, longest field first
+        excess = len(prompt) * (tokens - max_tokens) // tokens + 1
+        for field in sorted(self.truncate, key=lambda field: len(values[field]), reverse=True):
+            keep = max(0, len(values[field]) - excess)
+            excess -= len(values[field]) - keep
+            values[field] = truncate_text(values[field], keep)
+            if excess <= 0:
+                break
+        return self._join(values)
+
+
+TITLE_PROMPT = PromptTemplate("""
+    Rewrite this hotel property title to be more engaging and descriptive:
+    Current Title: {property_title}
+    Location: {city_name}
+    Room Type: {room_type}
+    Rating: {rating}/5
+
+    Rules:
+    1. Keep it concise but descriptive
+    2. Include the location if relevant
+    3. Highlight any unique features
+    4. Maintain professionalism
+    5. Return only the new title, no additional text
+    """, truncate=('property_title',))
+
+TITLE_JSON_PROMPT = PromptTemplate("""
+    Rewrite this hotel property title to be more engaging and descriptive:
+    Current Title: {property_title}
+    Location: {city_name}
+    Room Type: {room_type}
+    Rating: {rating}/5
+
+    Rules:
+    1. Keep it concise but descriptive
+    2. Include the location if relevant
+    3. Highlight any unique features
+    4. Maintain professionalism
+    5. Return a JSON object whose "title" holds only the new title
+    """, truncate=('property_title',))
+
+DESCRIPTION_PROMPT = PromptTemplate("""
+    Generate an engaging hotel description:
+    Hotel: {property_title}
+    Location: {city_name}
+    Room Type: {room_type}
+    Rating: {rating}/5
+    Price: ${price} per night
+
+    Write 2-3 paragraphs highlighting location, amenities, and value proposition.
+    """, truncate=('property_title',))
+
+SUMMARY_PROMPT = PromptTemplate("""
+    Create a brief summary for this hotel:
+    Name: {property_title}
+    Location: {city_name}
+    Price: ${price}
+    Rating: {rating}/5
+    Description: {description}
+
+    Create a concise 2-3 sentence summary highlighting key features.
+    """, truncate=('description', 'property_title'))
+
+REVIEW_PROMPT = PromptTemplate("""
+    Generate a hotel review:
+    Name: {property_title}
+    Location: {city_name}
+    Price: ${price}
+    Current Rating: {rating}/5
+
+    Format your response EXACTLY like this:
+    RATING: [single number 1-5]
+    REVIEW: [detailed review text]
+
+    Note: The rating should be just a single number between 1 and 5.
+    """, truncate=('property_title',))
+
+REVIEW_JSON_PROMPT = PromptTemplate("""
+    Generate a hotel review:
+    Name: {property_title}
+    Location: {city_name}
+    Price: ${price}
+    Current Rating: {rating}/5
+
+    Return a JSON object with the "rating", a single number between 1 and 5,
+    and the detailed "review" text.
+    """, truncate=('property_title',))
+
+PACKED_PROMPT = PromptTemplate("""
+    {instructions}
+
+    Return a JSON array with one object per hotel below, each containing the
+    hotel's "hotel_id" exactly as given and its "{field}".
+
+    Hotels:
+    {records}
+    """)
+
+PACKED_TITLES_INSTRUCTIONS = textwrap.dedent("""
+    Rewrite each of these hotel property titles to be more engaging and descriptive.
+
+    Rules:
+    1. Keep it concise but descriptive
+    2. Include the location if relevant
+    3. Highlight any unique features
+    4. Maintain professionalism
+    5. The title field holds only the new title, no additional text
+    """).strip()
+
+PACKED_SUMMARIES_INSTRUCTIONS = textwrap.dedent("""
+    Create a brief summary for each of these hotels.
+
+    Each summary should be a concise 2-3 sentence summary highlighting key features.
+    """).strip()
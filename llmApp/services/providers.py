@@ -0,0 +1,18 @@
+# llmApp/services/providers.py
+from django.conf import settings
+
+from llmApp.services.base import LLMService
+from llmApp.services.gemini_service import GeminiService
+from llmApp.services.ollama_service import OllamaService
+
+PROVIDERS = {
+    'gemini': GeminiService,
+    'ollama': OllamaService,
+}
+
+
+def get_llm_service(provider: str = None, **kwargs) -> LLMService:
+    """
+    Client for ``provider`` (default: settings.LLM_PROVIDER)
+    """
+    return PROVIDERS[provider or settings.LLM_PROVIDER](**kwargs)
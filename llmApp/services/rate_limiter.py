@@ -0,0 +1,110 @@
+# llmApp/services/rate_limiter.py
+import threading
+import time
+from functools import lru_cache
+from typing import Optional
+
+from django.conf import settings
+
+from llmApp.services.state_file import LockedJSONFile
+
+
+class RateLimiter:
+    """
+    Requests-per-minute and tokens-per-minute token buckets.
+
+    The bucket levels live in a small JSON file guarded by ``flock``, so every
+    command, thread and container that mounts the same file draws from one
+    shared quota. Callers reserve capacity up front and sleep until their
+    reservation is covered, which keeps them queued in arrival order instead
+    of polling. A limit of 0 disables that bucket.
+    """
+    def __init__(self, requests_per_minute: int = 0, tokens_per_minute: int = 0,
+                 state_path: Optional[str] = None, burst_seconds: float = 1.0):
+        self.limits = {
+            'requests': requests_per_minute,
+            'tokens': tokens_per_minute,
+        }
+        self.state_path = state_path
+        self.burst_seconds = burst_seconds
+        self._lock = threading.Lock()
+        self._state = {}
+
+    @property
+    def enabled(self) -> bool:
+        return any(self.limits.values())
+
+    def acquire(self, tokens: int = 0) -> float:
+        """
+        Block until one request and ``tokens`` tokens fit in the quota.
+
+        Returns the number of seconds spent waiting.
+        """
+        if not self.enabled:
+            return 0.0
+        wait = self._reserve({'requests': 1, 'tokens': tokens})
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def settle(self, tokens: int):
+        """
+        Charge (or refund, if negative) the difference between the tokens
+        reserved for a call and what the API reports it actually used
+        """
+        if self.enabled and tokens:
+            self._reserve({'requests': 0, 'tokens': tokens})
+
+    def _reserve(self, costs: dict) -> float:
+        with self._lock, self._locked_state() as state:
+            now = time.time()
+            wait = 0.0
+            for name, limit in self.limits.items():
+                if not limit:
+                    continue
+                rate = limit / 60.0
+                capacity = max(rate * self.burst_seconds, 1.0)
+                bucket = state.setdefault(name, {'level': capacity, 'updated': now})
+                elapsed = max(now - bucket['updated'], 0.0)
+                level = min(capacity, bucket['level'] + elapsed * rate) - costs[name]
+                bucket['level'] = level
+                bucket['updated'] = now
+                if level < 0:
+                    wait = max(wait, -level / rate)
+            return wait
+
+    def _locked_state(self):
+        if self.state_path is None:
+            return _MemoryState(self._state)
+        return LockedJSONFile(self.state_path)
+
+
+class _MemoryState:
+    def __init__(self, state):
+        self.state = state
+
+    def __enter__(self):
+        return self.state
+
+    def __exit__(self, *exc):
+        return False
+
+
+@lru_cache(maxsize=None)
+def get_rate_limiter() -> RateLimiter:
+    """
+    The process-wide limiter configured in settings
+    """
+    return RateLimiter(
+        requests_per_minute=settings.LLM_REQUESTS_PER_MINUTE,
+        tokens_per_minute=settings.LLM_TOKENS_PER_MINUTE,
+        state_path=settings.LLM_RATE_LIMIT_FILE,
+        burst_seconds=settings.LLM_RATE_LIMIT_BURST_SECONDS,
+    )
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Rough token count (about four characters per token) used for reservations
+    """
+    return len(text) // 4 + 1
@@ -0,0 +1,62 @@
+# llmApp/services/singleflight.py
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Tuple
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Run at most one call per key at a time and hand its result to every
+    caller that asks for the same key meanwhile.
+
+    Up to ``max_results`` successful results are kept afterwards, so a
+    duplicate that arrives once the first call has finished is served as
+    well. None results are shared with the callers already waiting but not
+    kept. Results live only as long as this object, i.e. one service.
+    """
+    def __init__(self, max_results: int = 0):
+        self.max_results = max_results
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._results = OrderedDict()
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        ``fn()`` or the result of an identical call, and whether it was shared
+        """
+        with self._lock:
+            if key in self._results:
+                self._results.move_to_end(key)
+                return self._results[key], True
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+                if call.result is not None and self.max_results:
+                    self._results[key] = call.result
+                    while len(self._results) > self.max_results:
+                        self._results.popitem(last=False)
+            call.done.set()
+        return call.result, False
@@ -0,0 +1,43 @@
+# llmApp/services/state_file.py
+import fcntl
+import json
+import os
+
+
+class LockedJSONFile:
+    """
+    Read-modify-write of a small shared JSON file under an exclusive
+    ``flock``, so processes and containers that mount the same file can
+    update it safely. Use as a context manager; the yielded dict is written
+    back on a clean exit.
+    """
+    def __init__(self, path):
+        self.path = path
+
+    def __enter__(self):
+        self.fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        fcntl.flock(self.fd, fcntl.LOCK_EX)
+        chunks = []
+        while True:
+            chunk = os.read(self.fd, 1 << 16)
+            if not chunk:
+                break
+            chunks.append(chunk)
+        raw = b''.join(chunks)
+        try:
+            self.state = json.loads(raw) if raw else {}
+        except ValueError:
+            self.state = {}
+        return self.state
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                data = json.dumps(self.state).encode()
+                os.lseek(self.fd, 0, os.SEEK_SET)
+                os.ftruncate(self.fd, 0)
+                os.write(self.fd, data)
+        finally:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+            os.close(self.fd)
+        return False
@@ -0,0 +1,289 @@
+# llmApp/services/transport.py
+import contextvars
+import random
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Status codes worth another attempt: rate limiting and transient server errors
+RETRY_STATUSES = {408, 429, 500, 502, 503, 504}
+# Status codes that count against the provider's health; a 429 means it is
+# up but busy, which the rate limiter deals with
+FAILURE_STATUSES = {408, 500, 502, 503, 504}
+
+
+@dataclass
+class RetryPolicy:
+    max_retries: int = 5
+    backoff_base: float = 1.0
+    backoff_max: float = 60.0
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """
+        Seconds to wait before retry number ``attempt`` (starting at 0).
+
+        A server supplied Retry-After always wins; otherwise use exponential
+        backoff with full jitter so parallel workers don't retry in lockstep.
+        """
+        if retry_after is not None:
+            return retry_after + random.uniform(0, self.backoff_base)
+        ceiling = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return random.uniform(0, ceiling)
+
+
+class CircuitOpenError(Exception):
+    """
+    The provider failed too often recently; the request was not sent
+    """
+
+
+class CircuitBreaker:
+    """
+    Closed, open and half-open states over a provider's consecutive failures.
+
+    After ``failure_threshold`` failures in a row the circuit opens and
+    requests fail fast with CircuitOpenError instead of queueing on a
+    degraded provider. Once ``reset_timeout`` seconds have passed, a single
+    probe is let through (half-open): its success closes the circuit, its
+    failure opens it for another ``reset_timeout``. A threshold of 0
+    disables the breaker.
+    """
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probing = False
+        self.times_opened = 0
+
+    def retry_in(self) -> float:
+        """
+        Seconds to hold new work: until an open circuit lets a probe
+        through, or a moment while a probe is out; 0 if requests may go
+        """
+        with self._lock:
+            if self.state == self.HALF_OPEN and self.probing:
+                return 1.0
+            if self.state != self.OPEN:
+                return 0.0
+            return max(0.0, self.opened_at + self.reset_timeout - time.monotonic())
+
+    def before_request(self):
+        """
+        Raise CircuitOpenError unless a request may be sent now
+        """
+        if not self.failure_threshold:
+            return
+        with self._lock:
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self.probing = False
+            if self.state == self.OPEN or (self.state == self.HALF_OPEN and self.probing):
+                raise CircuitOpenError("circuit open: the provider is failing, not sending")
+            if self.state == self.HALF_OPEN:
+                self.probing = True
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self.probing = False
+
+    def record_failure(self):
+        if not self.failure_threshold:
+            return
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self.times_opened += 1
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+                self.probing = False
+
+
+@dataclass
+class TokenUsage:
+    """
+    Token counts the provider reported for one response
+    """
+    prompt: int = 0
+    output: int = 0
+    total: int = 0
+
+
+@dataclass
+class CallStats:
+    """
+    Counters for a single generation call, including all of its retries.
+    """
+    # The job ledger task the call is made for, used to label metrics
+    task: Optional[str] = None
+    attempts: int = 0
+    retries: int = 0
+    cached: bool = False
+    # Answered by an identical request made through the same service
+    coalesced: bool = False
+    # A duplicate request was sent because the first one was slow
+    hedged: bool = False
+    status_codes: list = field(default_factory=list)
+    # Seconds until the first streamed chunk and until the response was complete
+    first_token: Optional[float] = None
+    latency: Optional[float] = None
+    usage: Optional[TokenUsage] = None
+
+
+class RequestCounters:
+    """
+    Thread-safe running totals across every call made by a service.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.retries = 0
+        self.failures = 0
+        self.cache_hits = 0
+        self.coalesced = 0
+        self.hedges = 0
+        self.fallbacks = 0
+        # Parse outcome ('json', 'text' or 'failed') -> count
+        self.parses = {}
+        # Tokens the provider reported, prompt and output
+        self.tokens = 0
+        # Per-call samples in seconds
+        self.first_tokens = []
+        self.latencies = []
+
+    def record_cache_hit(self):
+        with self._lock:
+            self.cache_hits += 1
+
+    def record_coalesced(self):
+        """
+        A call reused the response of an identical request instead of sending its own
+        """
+        with self._lock:
+            self.coalesced += 1
+
+    def record_hedge(self):
+        with self._lock:
+            self.hedges += 1
+
+    def record_parse(self, outcome: str):
+        with self._lock:
+            self.parses[outcome] = self.parses.get(outcome, 0) + 1
+
+    def record_fallback(self):
+        """
+        A hotel missing from a packed response had to be requested on its own
+        """
+        with self._lock:
+            self.fallbacks += 1
+
+    def record(self, stats: CallStats, ok: bool):
+        with self._lock:
+            self.calls += 1
+            self.retries += stats.retries
+            if not ok:
+                self.failures += 1
+            if stats.usage is not None:
+                self.tokens += stats.usage.total
+            if stats.first_token is not None:
+                self.first_tokens.append(stats.first_token)
+            if stats.latency is not None:
+                self.latencies.append(stats.latency)
+
+    def __str__(self):
+        summary = (
+            f"{self.calls} requests, {self.retries} retries, {self.failures} failed, "
+            f"{self.cache_hits} served from cache, {self.coalesced} shared with identical prompts, "
+            f"{self.fallbacks} packed fallbacks"
+        )
+        if self.hedges:
+            summary += f", {self.hedges} hedged"
+        if self.parses.get('failed'):
+            summary += f", {self.parses['failed']} unparseable"
+        if self.tokens:
+            summary += f", {self.tokens} tokens"
+        if self.latencies:
+            summary += f", avg latency {sum(self.latencies) / len(self.latencies):.2f}s"
+        if self.first_tokens:
+            summary += f", avg first token {sum(self.first_tokens) / len(self.first_tokens):.2f}s"
+        return summary
+
+
+def percentile(samples, q: float) -> Optional[float]:
+    """
+    The ``q`` quantile (0-1) of ``samples`` by the nearest-rank method
+    """
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, max(0, int(round(q * len(ordered))) - 1))]
+
+
+_current_call = contextvars.ContextVar('current_call', default=None)
+
+
+@contextmanager
+def track_call(task: Optional[str] = None):
+    """
+    Collect the CallStats of the requests made inside the block.
+
+    The stats object travels with the context, so it also follows calls
+    handed to ``asyncio.to_thread``.
+    """
+    stats = CallStats(task=task)
+    token = _current_call.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_call.reset(token)
+
+
+def current_call_stats() -> CallStats:
+    return _current_call.get() or CallStats()
+
+
+def parse_retry_after(value) -> Optional[float]:
+    """
+    Parse a Retry-After header given either in seconds or as an HTTP date
+    """
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except (TypeError, ValueError):
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+def build_session(pool_size: int = 10) -> requests.Session:
+    """
+    Keep-alive session whose connection pool can serve ``pool_size`` concurrent requests
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update({'Content-Type': 'application/json'})
+    return session
@@ -0,0 +1,58 @@
+class FakeQuerySet:
+    """
+    In-memory stand-in for the slice of the QuerySet API the commands use,
+    recording the queries it is asked to run.
+    """
+    db = 'default'
+
+    def __init__(self, rows, log=None):
+        self.rows = list(rows)
+        self.log = [] if log is None else log
+
+    def _clone(self, rows):
+        return FakeQuerySet(rows, self.log)
+
+    def count(self):
+        return len(self.rows)
+
+    def order_by(self, *fields):
+        return self._clone(sorted(self.rows, key=lambda row: row.pk))
+
+    def only(self, *fields):
+        self.log.append(('only', fields))
+        return self._clone(self.rows)
+
+    def filter(self, pk__gt=None, hotel_id__in=None):
+        if hotel_id__in is not None:
+            return self._clone([row for row in self.rows if row.hotel_id in hotel_id__in])
+        return self._clone([row for row in self.rows if row.pk > pk__gt])
+
+    def __getitem__(self, item):
+        self.log.append(('slice', item.start, item.stop))
+        return self._clone(self.rows[item])
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    async def aiterator(self, chunk_size=None):
+        for row in self.rows:
+            yield row
+
+
+class DeferringQuerySet(FakeQuerySet):
+    """
+    FakeQuerySet of model instances whose ``only()`` returns fresh instances
+    with every other field deferred, as the database would; reading a
+    deferred field then needs a query
+    """
+    def _clone(self, rows):
+        return DeferringQuerySet(rows, self.log)
+
+    def only(self, *fields):
+        self.log.append(('only', fields))
+        rows = []
+        for row in self.rows:
+            # from_db takes the loaded values in field order
+            names = [field.attname for field in row._meta.concrete_fields if field.attname in ('id', *fields)]
+            rows.append(type(row).from_db('default', names, [getattr(row, name) for name in names]))
+        return self._clone(rows)
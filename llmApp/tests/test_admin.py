@@ -0,0 +1,62 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+from django.contrib import admin
+
+from llmApp.admin import EXACT_COUNT_LIMIT, EstimatedCountPaginator, HotelAdmin, PREVIEW_CHARS
+from llmApp.models import Hotel
+from llmApp.tests.fakes import FakeQuerySet
+
+
+class TestEstimatedCountPaginator(unittest.TestCase):
+
+    @patch('llmApp.admin.estimated_count', return_value=EXACT_COUNT_LIMIT * 100)
+    def test_big_results_use_the_estimate(self, mock_estimate):
+        queryset = MagicMock(db='default')
+
+        paginator = EstimatedCountPaginator(queryset, 100)
+
+        self.assertEqual(paginator.count, EXACT_COUNT_LIMIT * 100)
+        self.assertEqual(paginator.num_pages, EXACT_COUNT_LIMIT)
+        queryset.count.assert_not_called()
+
+    @patch('llmApp.admin.estimated_count', return_value=40)
+    def test_small_results_are_counted(self, mock_estimate):
+        self.assertEqual(EstimatedCountPaginator(FakeQuerySet(range(37)), 100).count, 37)
+
+    @patch('llmApp.admin.estimated_count', side_effect=KeyError('Plan'))
+    def test_unusable_plan_falls_back_to_counting(self, mock_estimate):
+        self.assertEqual(EstimatedCountPaginator(FakeQuerySet(range(37)), 100).count, 37)
+
+    @patch('llmApp.admin.connections')
+    @patch('llmApp.admin.estimated_count')
+    def test_other_databases_are_counted(self, mock_estimate, mock_connections):
+        mock_connections.__getitem__.return_value.vendor = 'sqlite'
+
+        self.assertEqual(EstimatedCountPaginator(FakeQuerySet(range(37)), 100).count, 37)
+        mock_estimate.assert_not_called()
+
+
+class TestHotelAdmin(unittest.TestCase):
+
+    def setUp(self):
+        self.admin = HotelAdmin(Hotel, admin.site)
+
+    def test_description_is_cut_in_the_database(self):
+        query = str(self.admin.get_queryset(MagicMock()).query)
+
+        self.assertIn(f'LEFT("hotels"."description", {PREVIEW_CHARS + 1}) AS "description_preview"', query)
+        self.assertNotIn('"hotels"."description" FROM', query)
+
+    def test_preview_marks_only_cut_text(self):
+        hotel = MagicMock(description_preview='x' * (PREVIEW_CHARS + 1))
+        self.assertEqual(self.admin.description_preview(hotel), 'x' * PREVIEW_CHARS + '…')
+        # Exactly PREVIEW_CHARS long: nothing was cut
+        hotel.description_preview = 'x' * PREVIEW_CHARS
+        self.assertEqual(self.admin.description_preview(hotel), 'x' * PREVIEW_CHARS)
+        hotel.description_preview = 'short'
+        self.assertEqual(self.admin.description_preview(hotel), 'short')
+
+
+if __name__ == '__main__':
+    unittest.main()
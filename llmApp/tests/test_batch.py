@@ -0,0 +1,125 @@
+import json
+import os
+import tempfile
+import unittest
+from io import StringIO
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from django.core.management import call_command
+
+from llmApp.models import Hotel
+from llmApp.services.batch import (
+    load_task_command,
+    read_jsonl,
+    request_key,
+    response_text,
+    result_line,
+    split_key,
+)
+from llmApp.tests.fakes import FakeQuerySet
+
+
+def make_hotel(pk, hotel_id):
+    return SimpleNamespace(
+        pk=pk, id=pk, hotel_id=hotel_id, property_title=f"Hotel {hotel_id}", city_name="Dhaka",
+        room_type="Suite", price=120.0, rating=4.5, description=None,
+    )
+
+
+class TestBatchFormat(unittest.TestCase):
+
+    def test_keys_are_stable_and_reversible(self):
+        key = request_key('descriptions', 'H1001')
+        self.assertEqual(key, 'descriptions:H1001')
+        self.assertEqual(split_key(key), ('descriptions', 'H1001'))
+
+    def test_result_lines(self):
+        ok = json.loads(result_line('titles:1', 'New title'))
+        failed = json.loads(result_line('titles:2', error='quota'))
+
+        self.assertEqual(response_text(ok), 'New title')
+        self.assertIsNone(response_text(failed))
+
+    def test_task_commands_get_default_options(self):
+        self.assertEqual(load_task_command('reviews').options['force'], False)
+
+
+class TestBatchCommands(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = tmp.name
+        self.hotels = [make_hotel(1, 'H1'), make_hotel(2, 'H2')]
+
+    @patch('llmApp.management.base.exclude_finished', side_effect=lambda queryset, *args: queryset)
+    @patch.object(Hotel, 'objects')
+    def test_export_writes_one_request_per_pending_hotel(self, mock_objects, mock_exclude_finished):
+        mock_objects.filter.return_value = FakeQuerySet(self.hotels)
+        output = os.path.join(self.dir, 'requests.jsonl')
+
+        call_command('export_batch', task='descriptions', output=output, stdout=StringIO())
+
+        records = list(read_jsonl(output))
+        self.assertEqual([record['key'] for record in records], ['descriptions:H1', 'descriptions:H2'])
+        prompt = records[0]['request']['contents'][0]['parts'][0]['text']
+        self.assertIn('Hotel H1', prompt)
+        mock_objects.filter.assert_called_once_with(description__isnull=True)
+        self.assertEqual(mock_exclude_finished.call_args.args[1], 'descriptions')
+
+    @patch('llmApp.management.commands.ingest_batch.fail_jobs')
+    @patch('llmApp.management.commands.ingest_batch.start_jobs')
+    @patch('llmApp.management.commands.ingest_batch.transaction')
+    @patch('llmApp.management.base.finish_jobs')
+    @patch('llmApp.management.base.lock_unfinished', side_effect=lambda task, hotel_ids: set(hotel_ids))
+    @patch('llmApp.management.base.transaction')
+    @patch.object(Hotel, 'objects')
+    def test_ingest_applies_results_in_bulk(self, mock_objects, mock_transaction, mock_lock, mock_finish,
+                                            mock_ingest_transaction, mock_start, mock_fail):
+        mock_objects.only.return_value.in_bulk.return_value = {hotel.hotel_id: hotel for hotel in self.hotels}
+        # H3 and H4 exist, H9 doesn't
+        mock_objects.filter.return_value.values_list.return_value = ['H3', 'H4']
+        results = os.path.join(self.dir, 'results.jsonl')
+        with open(results, 'w') as f:
+            f.write(result_line('descriptions:H1', 'First description'))
+            f.write(result_line('descriptions:H2', 'Second description'))
+            f.write(result_line('descriptions:H3', error='blocked'))
+            f.write(result_line('descriptions:H4', '   '))
+            f.write(result_line('descriptions:H9', error='blocked'))
+            f.write(result_line('unknown:H1', 'Text'))
+            f.write('\n')
+
+        out = StringIO()
+        call_command('ingest_batch', results, stdout=out)
+
+        mock_objects.bulk_update.assert_called_once_with(self.hotels, ['description'])
+        self.assertEqual(self.hotels[0].description, 'First description')
+        self.assertIn('Applied 2 results, 3 failed, 1 skipped', out.getvalue())
+        self.assertEqual(mock_finish.call_args.args[:2], ('descriptions', ['H1', 'H2']))
+        # Failed records are failed attempts in the ledger, not untouched jobs
+        errors = {'H3': 'blocked', 'H4': 'no usable response'}
+        mock_start.assert_called_once_with('descriptions', errors)
+        mock_fail.assert_called_once_with('descriptions', errors)
+
+    @patch('llmApp.services.gemini_service.GeminiService._make_request')
+    def test_run_locally_turns_requests_into_results(self, mock_request):
+        mock_request.side_effect = ['Generated', None]
+        requests_path = os.path.join(self.dir, 'requests.jsonl')
+        results_path = os.path.join(self.dir, 'results.jsonl')
+        with open(requests_path, 'w') as f:
+            for hotel_id in ('H1', 'H2'):
+                f.write(json.dumps({
+                    'key': f'titles:{hotel_id}',
+                    'request': {'contents': [{'parts': [{'text': 'prompt'}]}]},
+                }) + '\n')
+
+        call_command('run_batch_locally', requests_path, results_path, stdout=StringIO())
+
+        records = list(read_jsonl(results_path))
+        self.assertEqual(response_text(records[0]), 'Generated')
+        self.assertIn('error', records[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+from llmApp.services.cache import ResponseCache
+from llmApp.services.gemini_service import GeminiService
+from llmApp.services.rate_limiter import RateLimiter
+from llmApp.services.transport import track_call
+
+
+class TestResponseCache(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, 'cache.sqlite3')
+
+    def test_key_depends_on_model_and_payload(self):
+        payload = {"contents": [{"parts": [{"text": "hi"}]}]}
+        key = ResponseCache.make_key('model-a', payload)
+
+        self.assertEqual(key, ResponseCache.make_key('model-a', dict(payload)))
+        self.assertNotEqual(key, ResponseCache.make_key('model-b', payload))
+        self.assertNotEqual(key, ResponseCache.make_key('model-a', {**payload, "generationConfig": {"temperature": 0}}))
+
+    def test_round_trip_and_persistence(self):
+        ResponseCache(self.path).set('k', 'model', 'hello')
+        self.assertEqual(ResponseCache(self.path).get('k'), 'hello')
+        self.assertIsNone(ResponseCache(self.path).get('missing'))
+
+    @patch('llmApp.services.cache.time.time')
+    def test_expired_entries_are_evicted(self, mock_time):
+        mock_time.return_value = 1000.0
+        cache = ResponseCache(self.path, max_age=60)
+        cache.set('k', 'model', 'hello')
+
+        mock_time.return_value = 1100.0
+        self.assertIsNone(cache.get('k'))
+        self.assertEqual(cache.evict(), 1)
+
+    @patch('llmApp.services.cache.time.time')
+    def test_least_recently_used_entries_go_first(self, mock_time):
+        mock_time.return_value = 1000.0
+        cache = ResponseCache(self.path, max_bytes=10)
+        for i, key in enumerate(['a', 'b', 'c']):
+            mock_time.return_value = 1000.0 + i
+            cache.set(key, 'model', 'x' * 5)
+        mock_time.return_value = 1010.0
+        cache.get('a')
+
+        self.assertEqual(cache.evict(), 1)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 'x' * 5)
+
+
+class TestGeminiServiceCache(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.cache = ResponseCache(os.path.join(tmp.name, 'cache.sqlite3'))
+        self.session = MagicMock()
+        self.session.post.return_value.status_code = 200
+        self.session.post.return_value.json.return_value = {
+            "candidates": [{"content": {"parts": [{"text": "fresh"}]}}]
+        }
+
+    def make_service(self, **kwargs):
+        return GeminiService(session=self.session, rate_limiter=RateLimiter(), cache=self.cache, **kwargs)
+
+    def test_identical_prompt_is_served_from_cache(self):
+        service = self.make_service()
+        self.assertEqual(service._make_request("prompt"), "fresh")
+
+        with track_call() as call:
+            self.assertEqual(service._make_request("prompt"), "fresh")
+
+        self.assertTrue(call.cached)
+        self.assertEqual(self.session.post.call_count, 1)
+        self.assertEqual(service.counters.cache_hits, 1)
+
+    def test_refresh_cache_skips_reads_but_writes(self):
+        self.make_service()._make_request("prompt")
+        self.session.post.return_value.json.return_value = {
+            "candidates": [{"content": {"parts": [{"text": "newer"}]}}]
+        }
+
+        self.assertEqual(self.make_service(refresh_cache=True)._make_request("prompt"), "newer")
+        self.assertEqual(self.make_service()._make_request("prompt"), "newer")
+        self.assertEqual(self.session.post.call_count, 2)
+
+    def test_no_cache(self):
+        service = self.make_service(use_cache=False, deduplicate=False)
+        service._make_request("prompt")
+        service._make_request("prompt")
+        self.assertEqual(self.session.post.call_count, 2)
+
+
+    def test_unparseable_review_is_not_cached(self):
+        self.session.post.return_value.json.return_value = {
+            "candidates": [{"content": {"parts": [{"text": "I'd rather not rate this hotel."}]}}]
+        }
+        data = {'property_title': 'Harbour Inn', 'city_name': 'Lisbon', 'price': '100.00', 'rating': '4.0'}
+        service = self.make_service(deduplicate=False, streaming=False)
+        self.assertEqual(service.generate_property_review(data), (None, None))
+
+        # A second service asks again instead of reading the failed answer back
+        self.session.post.return_value.json.return_value = {
+            "candidates": [{"content": {"parts": [{"text": "RATING: 4\nREVIEW: Lovely stay."}]}}]
+        }
+        service = self.make_service(deduplicate=False, streaming=False)
+        self.assertEqual(service.generate_property_review(data), (4.0, "Lovely stay."))
+        self.assertEqual(service.counters.cache_hits, 0)
+        self.assertEqual(self.session.post.call_count, 2)
+
+        # The answer that parsed is cached
+        self.assertEqual(self.make_service(streaming=False).generate_property_review(data), (4.0, "Lovely stay."))
+        self.assertEqual(self.session.post.call_count, 2)
+
+    def test_cached_answer_that_does_not_validate_is_a_miss(self):
+        self.make_service()._make_request("prompt")
+
+        service = self.make_service()
+        self.assertEqual(service._make_request("prompt", validate=lambda text: text != "fresh"), "fresh")
+        self.assertEqual(service.counters.cache_hits, 0)
+        self.assertEqual(self.session.post.call_count, 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import unittest
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from django.test import SimpleTestCase, override_settings
+
+from llmApp.content import content_cache, invalidate_content, make_entry
+
+
+def entry(hotel_id, etag, last_modified=1767225600.0):
+    return {
+        'data': {'hotel_id': hotel_id, 'title': f"Hotel {hotel_id}", 'description': None, 'summary': None, 'reviews': []},
+        'etag': etag,
+        'last_modified': last_modified,
+    }
+
+
+def fake_load(hotel_ids):
+    return {hotel_id: entry(hotel_id, f"etag-{hotel_id}") for hotel_id in hotel_ids if hotel_id != 'missing'}
+
+
+@override_settings(ALLOWED_HOSTS=['testserver'], CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'content': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'content-api-tests'},
+})
+@patch('llmApp.content.load_content', side_effect=fake_load)
+class TestHotelContentAPI(SimpleTestCase):
+    """
+    /api/hotels content endpoints, with the database read mocked out
+    """
+    def setUp(self):
+        content_cache().clear()
+
+    def test_content_is_cached(self, mock_load):
+        first = self.client.get('/api/hotels/H1/content')
+        second = self.client.get('/api/hotels/H1/content')
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.json()['title'], "Hotel H1")
+        self.assertEqual(second.json(), first.json())
+        mock_load.assert_called_once_with(['H1'])
+        self.assertEqual(first.headers['ETag'], '"etag-H1"')
+        self.assertEqual(first.headers['Last-Modified'], 'Thu, 01 Jan 2026 00:00:00 GMT')
+
+    def test_unchanged_content_is_not_resent(self, mock_load):
+        response = self.client.get('/api/hotels/H1/content', HTTP_IF_NONE_MATCH='"etag-H1"')
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+    def test_unknown_hotel(self, mock_load):
+        self.assertEqual(self.client.get('/api/hotels/missing/content').status_code, 404)
+
+    def test_written_content_is_invalidated(self, mock_load):
+        self.client.get('/api/hotels/H1/content')
+        invalidate_content(['H1'])
+        self.client.get('/api/hotels/H1/content')
+
+        self.assertEqual(mock_load.call_count, 2)
+
+    def test_bulk_loads_only_uncached_hotels(self, mock_load):
+        self.client.get('/api/hotels/H2/content')
+
+        response = self.client.get('/api/hotels/content', {'ids': 'H3,H2,missing,H3'})
+
+        self.assertEqual([hotel['hotel_id'] for hotel in response.json()['hotels']], ['H3', 'H2'])
+        self.assertEqual(mock_load.call_args.args[0], ['H3', 'missing'])
+        etag = response.headers['ETag']
+        self.assertEqual(
+            self.client.get('/api/hotels/content', {'ids': 'H3,H2'}, HTTP_IF_NONE_MATCH=etag).status_code, 304
+        )
+
+    @override_settings(CONTENT_API_MAX_IDS=2)
+    def test_bulk_requires_a_bounded_id_list(self, mock_load):
+        self.assertEqual(self.client.get('/api/hotels/content').status_code, 400)
+        self.assertEqual(self.client.get('/api/hotels/content', {'ids': 'H1,H2,H3'}).status_code, 400)
+
+
+class TestMakeEntry(unittest.TestCase):
+
+    def related(self, *rows):
+        manager = MagicMock()
+        manager.all.return_value = list(rows)
+        return manager
+
+    def test_latest_summary_and_newest_change(self):
+        older, newer = datetime(2026, 1, 1, tzinfo=timezone.utc), datetime(2026, 2, 1, tzinfo=timezone.utc)
+        hotel = SimpleNamespace(
+            hotel_id='H1', property_title="Sea View", description="By the sea.",
+            summaries=self.related(SimpleNamespace(summary="Latest", updated_at=older),
+                                   SimpleNamespace(summary="Earlier", updated_at=older)),
+            reviews=self.related(SimpleNamespace(rating=4.0, review="Good", updated_at=older)),
+            generation_jobs=self.related(SimpleNamespace(finished_at=newer)),
+        )
+
+        entry = make_entry(hotel)
+
+        self.assertEqual(entry['data']['summary'], "Latest")
+        self.assertEqual(entry['data']['reviews'][0]['updated_at'], "2026-01-01T00:00:00Z")
+        self.assertEqual(entry['last_modified'], newer.timestamp())
+        self.assertEqual(entry['etag'], make_entry(hotel)['etag'])
+
+
+if __name__ == '__main__':
+    unittest.main()
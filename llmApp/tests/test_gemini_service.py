@@ -1,11 +1,15 @@
+import asyncio
+import json
 import unittest
 from unittest.mock import patch, MagicMock
 from llmApp.services.gemini_service import GeminiService
+from llmApp.services.rate_limiter import RateLimiter
+from llmApp.services.transport import track_call
 
 class TestGeminiService(unittest.TestCase):
 
     def setUp(self):
-        self.service = GeminiService()
+        self.service = GeminiService(rate_limiter=RateLimiter(), use_cache=False)
         self.mock_hotel = MagicMock()
         self.mock_hotel.property_title = "Cozy Downtown Hotel"
         self.mock_hotel.city_name = "New York"
@@ -21,7 +25,7 @@ class TestGeminiService(unittest.TestCase):
             "description": "A beautiful villa by the beach with stunning ocean views."
         }
 
-    @patch('llmApp.services.gemini_service.requests.post')
+    @patch('llmApp.services.gemini_service.requests.Session.post')
     def test_rewrite_property_title(self, mock_post):
         # Mock API response
         mock_post.return_value.status_code = 200
@@ -35,7 +39,7 @@ class TestGeminiService(unittest.TestCase):
         self.assertEqual(response, "Luxurious Downtown Hotel Suite in New York")
         self.assertTrue(mock_post.called)
 
-    @patch('llmApp.services.gemini_service.requests.post')
+    @patch('llmApp.services.gemini_service.requests.Session.post')
     def test_generate_property_description(self, mock_post):
         # Mock API response
         mock_post.return_value.status_code = 200
@@ -49,7 +53,7 @@ class TestGeminiService(unittest.TestCase):
         self.assertIn("beachfront villa in Miami", response)
         self.assertTrue(mock_post.called)
 
-    @patch('llmApp.services.gemini_service.requests.post')
+    @patch('llmApp.services.gemini_service.requests.Session.post')
     def test_generate_property_summary(self, mock_post):
         # Mock API response
         mock_post.return_value.status_code = 200
@@ -63,7 +67,7 @@ class TestGeminiService(unittest.TestCase):
         self.assertIn("luxurious villa in Miami", response)
         self.assertTrue(mock_post.called)
 
-    @patch('llmApp.services.gemini_service.requests.post')
+    @patch('llmApp.services.gemini_service.requests.Session.post')
     def test_generate_property_review(self, mock_post):
         # Mock API response
         mock_post.return_value.status_code = 200
@@ -78,7 +82,7 @@ class TestGeminiService(unittest.TestCase):
         self.assertIn("Amazing property with top-notch amenities", review)
         self.assertTrue(mock_post.called)
 
-    @patch('llmApp.services.gemini_service.requests.post')
+    @patch('llmApp.services.gemini_service.requests.Session.post')
     def test_error_handling_in_request(self, mock_post):
         # Simulate a failed request
         mock_post.side_effect = Exception("API request failed")
@@ -86,5 +90,62 @@ class TestGeminiService(unittest.TestCase):
         response = self.service.rewrite_property_title(self.mock_hotel)
         self.assertIsNone(response)
 
+    @patch('llmApp.services.gemini_service.requests.Session.post')
+    def test_async_counterparts_run_concurrently(self, mock_post):
+        mock_post.return_value.status_code = 200
+        mock_post.return_value.json.return_value = {
+            "candidates": [
+                {"content": {"parts": [{"text": "RATING: 4\nREVIEW: Lovely stay."}]}}
+            ]
+        }
+
+        async def run():
+            return await asyncio.gather(
+                self.service.arewrite_property_title(self.mock_hotel),
+                self.service.agenerate_property_description(self.mock_property_data),
+                self.service.agenerate_property_summary(self.mock_property_data),
+                self.service.agenerate_property_review(self.mock_property_data),
+            )
+
+        title, description, summary, review = asyncio.run(run())
+        self.assertEqual(title, "RATING: 4")
+        self.assertEqual(review, (4.0, "Lovely stay."))
+        self.assertEqual(mock_post.call_count, 4)
+
+    def sse_response(self, *texts):
+        response = MagicMock()
+        response.status_code = 200
+        events = [{"candidates": [{"content": {"parts": [{"text": text}]}}]} for text in texts]
+        events[-1]["usageMetadata"] = {"totalTokenCount": 42}
+        response.iter_lines.return_value = [b"data: " + json.dumps(event).encode() for event in events]
+        return response
+
+    def test_stream_request_yields_chunks(self):
+        session = MagicMock()
+        session.post.return_value = self.sse_response("A sunny ", "villa ", "by the sea.")
+        service = GeminiService(session=session, rate_limiter=RateLimiter(), use_cache=False, streaming=True)
+
+        with track_call() as call:
+            self.assertEqual(list(service.stream_request("prompt")), ["A sunny ", "villa ", "by the sea."])
+
+        args, kwargs = session.post.call_args
+        self.assertIn(":streamGenerateContent?alt=sse", args[0])
+        self.assertTrue(kwargs['stream'])
+        self.assertIsNotNone(call.first_token)
+        self.assertGreaterEqual(call.latency, call.first_token)
+        self.assertEqual(service.counters.failures, 0)
+
+    def test_streamed_title_stops_after_first_line(self):
+        session = MagicMock()
+        response = self.sse_response("Sunny Suite in ", "New York\nThis title", " works because...")
+        session.post.return_value = response
+        service = GeminiService(session=session, rate_limiter=RateLimiter(), use_cache=False, streaming=True,
+                                structured=False)
+
+        self.assertEqual(service.rewrite_property_title(self.mock_hotel), "Sunny Suite in New York")
+        response.close.assert_called_once()
+        self.assertEqual(service.counters.calls, 1)
+        self.assertEqual(service.counters.failures, 0)
+
 if __name__ == '__main__':
     unittest.main()
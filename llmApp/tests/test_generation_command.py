@@ -0,0 +1,242 @@
+import asyncio
+import threading
+import time
+import unittest
+from io import StringIO
+from unittest.mock import MagicMock, patch
+
+from django.core.management import load_command_class
+
+from llmApp.management.base import GenerationCommand
+from llmApp.models import Hotel
+from llmApp.services.batch import load_task_command
+from llmApp.tests.fakes import DeferringQuerySet, FakeQuerySet
+
+
+class SlowCommand(GenerationCommand):
+    """
+    Command whose service call blocks, recording the peak number of calls in flight.
+    """
+    def __init__(self, hotels, delay=0.05):
+        super().__init__(stdout=StringIO())
+        self.hotels = FakeQuerySet(hotels)
+        self.delay = delay
+        self.saved = []
+        self.writes = []
+        self.bad_ids = set()
+        self.packs = []
+        self.write_delay = 0
+        self.overlapped = 0
+        self.in_flight = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def get_queryset(self, **options):
+        return self.hotels
+
+    def blocking_call(self, hotel):
+        with self.lock:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        time.sleep(self.delay)
+        with self.lock:
+            self.in_flight -= 1
+        return None if hotel.id == 3 else f"result {hotel.id}"
+
+    async def generate(self, service, hotel):
+        return await asyncio.to_thread(self.blocking_call, hotel)
+
+    async def generate_packed(self, service, hotels):
+        self.packs.append([hotel.id for hotel in hotels])
+        return [await self.generate(service, hotel) for hotel in hotels]
+
+    def write_batch(self, items):
+        self.writes.append(len(items))
+        if self.write_delay:
+            time.sleep(self.write_delay)
+            self.overlapped = max(self.overlapped, self.in_flight)
+        if any(hotel.id in self.bad_ids for hotel, _ in items):
+            raise ValueError("bad row")
+        self.saved.extend((hotel.id, result) for hotel, result in items)
+
+
+@patch('llmApp.management.base.transaction')
+class TestGenerationCommand(unittest.TestCase):
+
+    def make_hotels(self, count):
+        hotels = []
+        for i in range(1, count + 1):
+            hotel = MagicMock()
+            hotel.id = hotel.pk = i
+            hotels.append(hotel)
+        return hotels
+
+    def test_keeps_requests_in_flight(self, mock_transaction):
+        command = SlowCommand(self.make_hotels(8))
+        command.handle(batch_size=2, concurrency=4, no_cache=True, refresh_cache=False)
+
+        self.assertEqual(command.peak, 4)
+        self.assertEqual(len(command.saved), 7)
+        self.assertNotIn(3, [hotel_id for hotel_id, _ in command.saved])
+
+    def test_default_concurrency_is_sequential(self, mock_transaction):
+        command = SlowCommand(self.make_hotels(3), delay=0.01)
+        command.handle(batch_size=2, concurrency=1, no_cache=True, refresh_cache=False)
+
+        self.assertEqual(command.peak, 1)
+        self.assertEqual([hotel_id for hotel_id, _ in command.saved], [1, 2])
+
+    def test_results_are_written_per_batch(self, mock_transaction):
+        command = SlowCommand(self.make_hotels(7), delay=0)
+        command.handle(batch_size=3, concurrency=2, no_cache=True, refresh_cache=False)
+
+        # Hotel 3 produced nothing, leaving six results in two full batches
+        self.assertEqual(command.writes, [3, 3])
+        self.assertEqual(len(command.saved), 6)
+        # Each committed batch drops its hotels from the content API cache
+        self.assertEqual(mock_transaction.on_commit.call_count, 2)
+
+    def test_writes_overlap_requests(self, mock_transaction):
+        command = SlowCommand(self.make_hotels(8), delay=0.05)
+        command.write_delay = 0.03
+        command.handle(batch_size=2, concurrency=2, no_cache=True, refresh_cache=False)
+
+        # Requests kept going while a batch was being written
+        self.assertGreater(command.overlapped, 0)
+        self.assertEqual(len(command.saved), 7)
+
+    def test_hotels_are_packed_across_batches(self, mock_transaction):
+        command = SlowCommand(self.make_hotels(7), delay=0)
+        command.handle(batch_size=2, concurrency=2, pack=3, no_cache=True, refresh_cache=False)
+
+        self.assertEqual(command.packs, [[1, 2, 3], [4, 5, 6]])
+        self.assertEqual(len(command.saved), 6)
+
+    def test_bad_row_does_not_sink_the_batch(self, mock_transaction):
+        command = SlowCommand(self.make_hotels(4), delay=0)
+        command.bad_ids = {2}
+        command.handle(batch_size=5, concurrency=2, no_cache=True, refresh_cache=False)
+
+        output = command.stdout.getvalue()
+        self.assertIn("Error processing hotel 2: bad row", output)
+        self.assertEqual(sorted(hotel_id for hotel_id, _ in command.saved), [1, 4])
+
+    @patch('llmApp.management.base.exclude_finished', side_effect=lambda queryset, *args: queryset)
+    @patch('llmApp.management.base.finish_jobs')
+    @patch('llmApp.management.base.fail_jobs')
+    @patch('llmApp.management.base.lock_unfinished')
+    @patch('llmApp.management.base.start_jobs')
+    def test_job_ledger(self, mock_start, mock_lock, mock_fail, mock_finish, mock_exclude,
+                        mock_transaction):
+        command = SlowCommand(self.make_hotels(4), delay=0)
+        command.task = 'descriptions'
+        for hotel in command.hotels.rows:
+            hotel.hotel_id = f"H{hotel.id}"
+        # Another run finished hotel 4 while this one was generating it
+        mock_lock.return_value = {'H1', 'H2'}
+        command.handle(batch_size=4, concurrency=1, no_cache=True, refresh_cache=False)
+
+        mock_start.assert_called_once_with('descriptions', ['H1', 'H2', 'H3', 'H4'])
+        mock_fail.assert_called_once_with('descriptions', {'H3': 'no usable response'})
+        self.assertEqual(mock_finish.call_args.args[:2], ('descriptions', ['H1', 'H2']))
+        self.assertEqual([hotel_id for hotel_id, _ in command.saved], [1, 2])
+
+    @patch('llmApp.management.base.exclude_finished', side_effect=lambda queryset, *args: queryset)
+    @patch('llmApp.management.base.finish_jobs')
+    @patch('llmApp.management.base.fail_jobs')
+    @patch('llmApp.management.base.lock_unfinished', side_effect=lambda task, ids: set(ids))
+    @patch('llmApp.management.base.start_jobs')
+    def test_hotels_loaded_with_only(self, mock_start, mock_lock, mock_fail, mock_finish, mock_exclude,
+                                     mock_transaction):
+        command = SlowCommand([], delay=0)
+        command.task = 'descriptions'
+        command.fields = load_command_class('llmApp', 'generate_descriptions').fields
+        command.hotels = DeferringQuerySet([
+            Hotel(id=i, hotel_id=f"H{i}", property_title=f"Hotel {i}", city_name="Lisbon",
+                  room_type="Double", price=100.0, rating=4.0, description="Scraped text")
+            for i in (1, 2, 4)
+        ])
+        command.handle(batch_size=2, concurrency=2, no_cache=True, refresh_cache=False)
+
+        # No deferred field was read, on the event loop or anywhere else
+        self.assertEqual([call.args[1] for call in mock_start.call_args_list], [['H1', 'H2'], ['H4']])
+        self.assertEqual(sorted(hotel_id for hotel_id, _ in command.saved), [1, 2, 4])
+
+    @patch('llmApp.management.base.exclude_finished', side_effect=lambda queryset, *args: queryset)
+    @patch('llmApp.management.base.finish_jobs')
+    @patch('llmApp.management.base.fail_jobs')
+    @patch('llmApp.management.base.lock_unfinished', side_effect=lambda task, ids: set(ids))
+    @patch('llmApp.management.base.start_jobs')
+    @patch('llmApp.management.base.claim_jobs')
+    def test_worker_processes_claimed_batches(self, mock_claim, mock_start, mock_lock, mock_fail,
+                                              mock_finish, mock_exclude, mock_transaction):
+        command = SlowCommand(self.make_hotels(5), delay=0)
+        command.task = 'descriptions'
+        for hotel in command.hotels.rows:
+            hotel.hotel_id = f"H{hotel.id}"
+        # Another worker holds H2 and H5
+        mock_claim.side_effect = [['H1', 'H3'], ['H4'], []]
+        command.handle(batch_size=2, concurrency=1, worker=True, no_cache=True, refresh_cache=False)
+
+        self.assertEqual(mock_claim.call_count, 3)
+        mock_start.assert_not_called()
+        self.assertEqual([hotel_id for hotel_id, _ in command.saved], [1, 4])
+        mock_fail.assert_called_once_with('descriptions', {'H3': 'no usable response'})
+
+    @patch('llmApp.management.base.exclude_finished', side_effect=lambda queryset, *args: queryset)
+    @patch('llmApp.management.base.finish_jobs')
+    @patch('llmApp.management.base.fail_jobs')
+    @patch('llmApp.management.base.lock_unfinished', side_effect=lambda task, ids: set(ids))
+    @patch('llmApp.management.base.start_jobs')
+    @patch('llmApp.management.base.release_jobs')
+    def test_token_budget_stops_the_run(self, mock_release, mock_start, mock_lock, mock_fail,
+                                        mock_finish, mock_exclude, mock_transaction):
+        command = SlowCommand(self.make_hotels(6), delay=0)
+        command.task = 'descriptions'
+        for hotel in command.hotels.rows:
+            hotel.hotel_id = f"H{hotel.id}"
+        generate = command.generate
+
+        async def generate_with_usage(service, hotel):
+            service.counters.tokens += 100
+            return await generate(service, hotel)
+
+        command.generate = generate_with_usage
+        command.handle(batch_size=2, concurrency=1, max_tokens_per_run=250, no_cache=True, refresh_cache=False)
+
+        # Three calls used 300 tokens; H4 was started but never sent, H5 and H6 never fetched
+        self.assertEqual(command.service.counters.tokens, 300)
+        self.assertEqual([hotel_id for hotel_id, _ in command.saved], [1, 2])
+        mock_release.assert_called_once_with('descriptions', ['H4'])
+        self.assertEqual(mock_start.call_count, 2)
+        self.assertIn("Token budget of 250 reached", command.stdout.getvalue())
+
+    @patch('llmApp.services.base.LLMService.close')
+    def test_service_closed_after_run(self, mock_close, mock_transaction):
+        command = SlowCommand(self.make_hotels(2))
+        command.handle(batch_size=2, concurrency=1, no_cache=True, refresh_cache=False)
+
+        mock_close.assert_called_once_with()
+
+    def test_incremental_keeps_content_without_a_job(self, mock_transaction):
+        existing = {
+            'descriptions': '"hotels"."description" IS NOT NULL',
+            'summaries': 'FROM "property_summaries"',
+            'reviews': 'FROM "property_reviews"',
+        }
+        for task in ('titles', 'descriptions', 'summaries', 'reviews'):
+            with self.subTest(task=task):
+                command = load_task_command(task, incremental=True)
+                command.model = 'test-model'
+                sql = str(command.get_pending_queryset(**command.options).query)
+                untracked = sql.count('FROM "generation_jobs"') == 2
+                # Every hotel has a title, so untracked titles are rewritten as usual
+                self.assertEqual(untracked, task in existing)
+                if untracked:
+                    kept = sql[sql.rindex('AND NOT ('):]
+                    self.assertIn(existing[task], kept)
+                    self.assertIn('NOT EXISTS(SELECT 1 AS "a" FROM "generation_jobs"', kept)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import os
+import tempfile
+
+from django.test import SimpleTestCase, override_settings
+
+from llmApp.services import metrics
+from llmApp.services.transport import CallStats, TokenUsage
+
+
+class TestMetrics(SimpleTestCase):
+
+    def setUp(self):
+        self.registry = metrics.Registry()
+        self.latency = self.registry.histogram('request_seconds', 'Latency', ('task',), buckets=(0.1, 1))
+        self.calls = self.registry.counter('calls_total', 'Calls', ('task', 'status'))
+        self.depth = self.registry.gauge('queue_depth', 'Depth', ('queue',))
+        handle, self.path = tempfile.mkstemp()
+        os.close(handle)
+        self.addCleanup(os.remove, self.path)
+
+    def test_render_prometheus_text(self):
+        self.latency.observe(0.05, task='titles')
+        self.latency.observe(0.5, task='titles')
+        self.latency.observe(3, task='titles')
+        self.calls.inc(task='titles', status=429)
+        self.depth.set(4, queue='in_flight')
+
+        text = metrics.render(self.registry.snapshot())
+
+        self.assertIn('# TYPE request_seconds histogram', text)
+        self.assertIn('request_seconds_bucket{task="titles",le="0.1"} 1', text)
+        self.assertIn('request_seconds_bucket{task="titles",le="1"} 2', text)
+        self.assertIn('request_seconds_bucket{task="titles",le="+Inf"} 3', text)
+        self.assertIn('request_seconds_count{task="titles"} 3', text)
+        self.assertIn('calls_total{task="titles",status="429"} 1', text)
+        self.assertIn('queue_depth{queue="in_flight"} 4', text)
+        self.assertEqual(self.latency.quantile(0.5, '["titles"]'), 1)
+
+    def test_publish_adds_deltas_from_every_process(self):
+        other = metrics.Registry()
+        other_calls = other.counter('calls_total', 'Calls', ('task', 'status'))
+
+        self.calls.inc(2, task='titles', status=200)
+        self.registry.publish(self.path)
+        self.calls.inc(task='titles', status=200)
+        self.registry.publish(self.path)
+        other_calls.inc(5, task='titles', status=200)
+        other.publish(self.path)
+
+        published = metrics.read_published(self.path)
+        self.assertEqual(published['calls_total']['values']['["titles", "200"]'], 8)
+
+    def test_observe_call_and_summary(self):
+        metrics.REGISTRY.start_run()
+        stats = CallStats(task='summaries', retries=1, status_codes=[429, 200], latency=0.4,
+                          first_token=0.1, usage=TokenUsage(prompt=100, output=20, total=120))
+        metrics.observe_call('gemini', stats, ok=True)
+        metrics.DB_FLUSH_SECONDS.observe(0.02, task='summaries')
+
+        lines = "\n".join(metrics.summary_lines())
+        self.assertIn("summaries on gemini: 1 calls", lines)
+        self.assertIn("100 prompt + 20 output tokens", lines)
+        self.assertIn("HTTP responses: 200 x1, 429 x1", lines)
+        self.assertIn("DB writes (summaries): 1 batches", lines)
+
+    def test_metrics_endpoint(self):
+        self.calls.inc(task='reviews', status=200)
+        self.registry.publish(self.path)
+
+        with override_settings(LLM_METRICS_FILE=self.path, ALLOWED_HOSTS=['testserver']):
+            response = self.client.get('/metrics')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'calls_total{task="reviews",status="200"} 1', response.content)
@@ -0,0 +1,58 @@
+from django.test import SimpleTestCase, override_settings
+
+from llmApp.services.gemini_service import GeminiService
+from llmApp.services.mock_server import MockLLMServer
+from llmApp.services.ollama_service import OllamaService
+from llmApp.services.rate_limiter import RateLimiter
+from llmApp.services.transport import RetryPolicy
+
+
+class TestMockLLMServer(SimpleTestCase):
+    """
+    The benchmark's mock server, driven through the real HTTP clients
+    """
+    def setUp(self):
+        self.server = MockLLMServer(latency=0, jitter=0, response_chars=120, seed=1).start()
+        self.addCleanup(self.server.stop)
+        self.property_data = {
+            "property_title": "Beachfront Villa",
+            "city_name": "Miami",
+            "room_type": "Villa",
+            "rating": "4.8",
+            "price": "350.00",
+            "description": "A villa by the beach.",
+        }
+
+    def gemini(self, **kwargs):
+        with override_settings(GEMINI_BASE_URL=f"{self.server.url}/v1beta/models"):
+            return GeminiService(rate_limiter=RateLimiter(), use_cache=False, **kwargs)
+
+    def test_gemini_generate_and_packed(self):
+        service = self.gemini()
+
+        self.assertEqual(len(service.generate_property_description(self.property_data)), 120)
+        self.assertEqual(service.generate_property_review(self.property_data)[0], 4.0)
+        summaries = service.generate_property_summaries({"H1": self.property_data, "H2": self.property_data})
+        self.assertEqual(set(summaries), {"H1", "H2"})
+        self.assertEqual(service.counters.fallbacks, 0)
+        self.assertEqual(service.counters.parses, {'json': 1})
+
+    def test_gemini_streaming(self):
+        service = self.gemini(streaming=True)
+
+        self.assertEqual(len(service.generate_property_summary(self.property_data)), 120)
+        self.assertEqual(len(service.counters.first_tokens), 1)
+
+    def test_ollama_streaming(self):
+        with override_settings(OLLAMA_HOST=self.server.url, OLLAMA_STREAM=True):
+            service = OllamaService(use_cache=False)
+
+        self.assertEqual(len(service.generate_property_description(self.property_data)), 120)
+
+    def test_throttling_is_retried(self):
+        self.server.rate_429 = 1.0
+        service = self.gemini(retry_policy=RetryPolicy(max_retries=1, backoff_base=0))
+
+        self.assertIsNone(service.generate_property_summary(self.property_data))
+        self.assertEqual(self.server.throttled, 2)
+        self.assertEqual(service.counters.retries, 1)
@@ -0,0 +1,86 @@
+import json
+import unittest
+from unittest.mock import MagicMock
+
+from django.test import SimpleTestCase, override_settings
+
+from llmApp.services.base import packed_schema
+from llmApp.services.gemini_service import GeminiService
+from llmApp.services.ollama_service import OllamaService, to_json_schema
+from llmApp.services.providers import get_llm_service
+
+
+def streamed(*chunks):
+    response = MagicMock()
+    response.status_code = 200
+    response.iter_lines.return_value = [json.dumps(chunk).encode() for chunk in chunks]
+    return response
+
+
+@override_settings(OLLAMA_HOST='http://ollama:11434/', OLLAMA_MODEL='llama3.2', OLLAMA_STREAM=True,
+                   OLLAMA_KEEP_ALIVE='30m', OLLAMA_NUM_CTX=2048, OLLAMA_NUM_PREDICT=256)
+class TestOllamaService(SimpleTestCase):
+
+    def setUp(self):
+        self.session = MagicMock()
+        self.service = OllamaService(session=self.session, use_cache=False)
+        self.property_data = {
+            "property_title": "Beachfront Villa",
+            "city_name": "Miami",
+            "room_type": "Villa",
+            "rating": 4.8,
+            "price": 350,
+        }
+
+    def test_streams_generate_response(self):
+        self.session.post.return_value = streamed(
+            {"response": "A sunny ", "done": False},
+            {"response": "villa.", "done": False},
+            {"response": "", "done": True, "prompt_eval_count": 40, "eval_count": 5},
+        )
+
+        self.assertEqual(self.service.generate_property_description(self.property_data), "A sunny villa.")
+
+        args, kwargs = self.session.post.call_args
+        self.assertEqual(args[0], 'http://ollama:11434/api/generate')
+        self.assertTrue(kwargs['stream'])
+        payload = kwargs['json']
+        self.assertEqual(payload['model'], 'llama3.2')
+        self.assertEqual(payload['keep_alive'], '30m')
+        self.assertEqual(payload['options'], {'num_ctx': 2048, 'num_predict': 256})
+        self.session.post.return_value.close.assert_called_once()
+
+    def test_error_chunk_is_a_failed_call(self):
+        self.session.post.return_value = streamed({"error": "model not found"})
+
+        self.assertIsNone(self.service.generate_property_summary(self.property_data))
+        self.assertEqual(self.service.counters.failures, 1)
+
+    def test_response_schema_becomes_format(self):
+        payload = self.service.build_payload("prompt", {
+            "responseMimeType": "application/json",
+            "responseSchema": packed_schema("title"),
+        })
+        self.assertEqual(payload['format']['type'], 'array')
+        self.assertEqual(payload['format']['items']['properties']['title'], {'type': 'string'})
+
+    def test_does_not_use_shared_rate_limit(self):
+        self.assertFalse(self.service.rate_limiter.enabled)
+
+    def test_to_json_schema_leaves_other_keys(self):
+        self.assertEqual(
+            to_json_schema({"type": "OBJECT", "required": ["type"]}),
+            {"type": "object", "required": ["type"]},
+        )
+
+
+class TestProviders(unittest.TestCase):
+
+    def test_lookup_by_name(self):
+        self.assertIsInstance(get_llm_service('ollama', use_cache=False), OllamaService)
+        with override_settings(LLM_PROVIDER='gemini'):
+            self.assertIsInstance(get_llm_service(use_cache=False), GeminiService)
+
+
+if __name__ == '__main__':
+    unittest.main()
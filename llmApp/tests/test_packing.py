@@ -0,0 +1,120 @@
+import json
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from llmApp.services.base import RESPONSE_SCHEMAS, parse_packed_response
+from llmApp.services.gemini_service import GeminiService
+from llmApp.services.rate_limiter import RateLimiter
+
+
+def gemini_reply(text):
+    response = MagicMock()
+    response.status_code = 200
+    response.json.return_value = {"candidates": [{"content": {"parts": [{"text": text}]}}]}
+    return response
+
+
+class TestParsePackedResponse(unittest.TestCase):
+
+    def test_keeps_only_well_formed_entries(self):
+        text = json.dumps([
+            {"hotel_id": "A1", "title": " Sunny Loft "},
+            {"hotel_id": "B2", "title": ""},
+            {"title": "no id"},
+            "junk",
+            {"hotel_id": 7, "title": "Numeric id"},
+        ])
+        self.assertEqual(
+            parse_packed_response(text, "title"),
+            {"A1": "Sunny Loft", "7": "Numeric id"},
+        )
+
+    def test_invalid_json(self):
+        self.assertEqual(parse_packed_response("Here you go: [", "title"), {})
+        self.assertEqual(parse_packed_response('{"hotel_id": "A1"}', "title"), {})
+        self.assertEqual(parse_packed_response(None, "title"), {})
+
+
+class TestPackedRequests(unittest.TestCase):
+
+    def setUp(self):
+        self.session = MagicMock()
+        self.service = GeminiService(session=self.session, rate_limiter=RateLimiter(), use_cache=False)
+        self.hotels = [
+            SimpleNamespace(hotel_id=hotel_id, property_title=f"Hotel {hotel_id}", city_name="Dhaka",
+                            room_type="Suite", rating=4.0)
+            for hotel_id in ("A1", "B2", "C3")
+        ]
+
+    def test_titles_in_one_request_with_json_schema(self):
+        self.session.post.return_value = gemini_reply(json.dumps([
+            {"hotel_id": hotel.hotel_id, "title": f"New {hotel.hotel_id}"} for hotel in self.hotels
+        ]))
+
+        titles = self.service.rewrite_property_titles(self.hotels)
+
+        self.assertEqual(titles, {"A1": "New A1", "B2": "New B2", "C3": "New C3"})
+        self.assertEqual(self.session.post.call_count, 1)
+        payload = self.session.post.call_args.kwargs['json']
+        self.assertEqual(payload['generationConfig']['responseMimeType'], "application/json")
+        self.assertEqual(payload['generationConfig']['responseSchema']['items']['required'], ["hotel_id", "title"])
+
+    def test_missing_entry_falls_back_to_single_request(self):
+        self.session.post.side_effect = [
+            gemini_reply(json.dumps([
+                {"hotel_id": "A1", "title": "New A1"},
+                {"hotel_id": "C3", "title": "New C3"},
+            ])),
+            gemini_reply("Single B2"),
+        ]
+
+        titles = self.service.rewrite_property_titles(self.hotels)
+
+        self.assertEqual(titles, {"A1": "New A1", "B2": "Single B2", "C3": "New C3"})
+        self.assertEqual(self.session.post.call_count, 2)
+        fallback_config = self.session.post.call_args.kwargs['json']['generationConfig']
+        self.assertEqual(fallback_config['responseSchema'], RESPONSE_SCHEMAS['titles'])
+        self.assertEqual(self.service.counters.fallbacks, 1)
+
+    def test_packed_titles_are_parsed_like_single_ones(self):
+        self.session.post.side_effect = [
+            gemini_reply(json.dumps([
+                {"hotel_id": "A1", "title": "Title: New A1\nChosen for its sea views. " + "x" * 300},
+                {"hotel_id": "B2", "title": "Title:"},
+                {"hotel_id": "C3", "title": "Grand " * 60},
+            ])),
+            gemini_reply('{"title": "Single B2"}'),
+        ]
+
+        titles = self.service.rewrite_property_titles(self.hotels)
+
+        self.assertEqual(titles["A1"], "New A1")
+        # Nothing left once the label is gone: asked for again on its own
+        self.assertEqual(titles["B2"], "Single B2")
+        self.assertEqual(len(titles["C3"]), 255)
+        self.assertEqual(self.session.post.call_count, 2)
+        self.assertEqual(self.service.counters.parses, {'text': 2, 'failed': 1, 'json': 1})
+
+    def test_summaries(self):
+        properties = {
+            "A1": {"property_title": "A", "city_name": "Dhaka", "price": "10.00", "rating": "4.0",
+                   "description": "Nice"},
+            "B2": {"property_title": "B", "city_name": "Dhaka", "price": "20.00", "rating": "3.0",
+                   "description": "Fine"},
+        }
+        self.session.post.return_value = gemini_reply(json.dumps([
+            {"hotel_id": "A1", "summary": "Summary A"},
+            {"hotel_id": "B2", "summary": "Summary B"},
+        ]))
+
+        self.assertEqual(
+            self.service.generate_property_summaries(properties),
+            {"A1": "Summary A", "B2": "Summary B"},
+        )
+        prompt = self.session.post.call_args.kwargs['json']['contents'][0]['parts'][0]['text']
+        self.assertIn('"description": "Fine"', prompt)
+
+
+if __name__ == '__main__':
+    unittest.main()
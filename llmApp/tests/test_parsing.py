@@ -0,0 +1,89 @@
+import json
+import unittest
+from unittest.mock import MagicMock
+
+from llmApp.services.gemini_service import GeminiService
+from llmApp.models import Hotel
+from llmApp.services.parsing import TITLE_MAX_LENGTH, load_json, parse_review, parse_title
+from llmApp.services.rate_limiter import RateLimiter
+
+
+class TestParsing(unittest.TestCase):
+
+    def test_load_json_tolerates_fences_and_chatter(self):
+        self.assertEqual(load_json('```json\n{"title": "A"}\n```'), {"title": "A"})
+        self.assertEqual(load_json('Sure! Here it is: {"title": "A"} Enjoy.'), {"title": "A"})
+        self.assertIsNone(load_json("Sea View Suite"))
+
+    def test_review_from_json(self):
+        self.assertEqual(parse_review('{"rating": 7, "review": "Great."}'), (5.0, "Great.", 'json'))
+
+    def test_review_from_messy_text(self):
+        for text in (
+            "RATING: 4\nREVIEW: Lovely stay.",
+            "Here is the review:\n\n**Rating:** 4/5\n\n**Review:** Lovely stay.",
+            "RATING: 4\n\nREVIEW:\nLovely stay.",
+            "Rating - 4\nLovely stay.",
+        ):
+            self.assertEqual(parse_review(text), (4.0, "Lovely stay.", 'text'), text)
+
+    def test_review_failure(self):
+        self.assertEqual(parse_review("I cannot review this hotel."), (None, None, 'failed'))
+        self.assertEqual(parse_review('{"rating": 4}'), (None, None, 'failed'))
+
+    def test_title(self):
+        self.assertEqual(parse_title('{"title": "Harbour Suite"}'), ("Harbour Suite", 'json'))
+        self.assertEqual(parse_title('Title: "Harbour Suite"'), ("Harbour Suite", 'text'))
+        self.assertEqual(parse_title('{"name": "Harbour Suite"}'), (None, 'failed'))
+
+    def test_title_is_one_line_that_fits_the_column(self):
+        self.assertEqual(
+            parse_title('\n\nHarbour Suite with Sea Views\n\nThis title highlights the view.'),
+            ("Harbour Suite with Sea Views", 'text'),
+        )
+        title, outcome = parse_title('Grand ' * 100)
+        self.assertEqual(len(title), TITLE_MAX_LENGTH)
+        self.assertEqual(outcome, 'text')
+        self.assertEqual(len(parse_title('{"title": "%s"}' % ('x' * 300))[0]), TITLE_MAX_LENGTH)
+        self.assertEqual(Hotel._meta.get_field('property_title').max_length, TITLE_MAX_LENGTH)
+
+
+class TestStructuredService(unittest.TestCase):
+
+    def setUp(self):
+        self.session = MagicMock()
+        self.session.post.return_value.status_code = 200
+        self.service = GeminiService(session=self.session, rate_limiter=RateLimiter(), use_cache=False)
+        self.property_data = {"property_title": "Villa", "city_name": "Miami", "price": "350.00", "rating": "4.8"}
+
+    def reply(self, text):
+        self.session.post.return_value.json.return_value = {
+            "candidates": [{"content": {"parts": [{"text": text}]}}]
+        }
+
+    def test_review_is_requested_as_json(self):
+        self.reply(json.dumps({"rating": 4, "review": "Sunny."}))
+
+        self.assertEqual(self.service.generate_property_review(self.property_data), (4.0, "Sunny."))
+        config = self.session.post.call_args.kwargs['json']['generationConfig']
+        self.assertEqual(config['responseMimeType'], "application/json")
+        self.assertEqual(config['responseSchema']['required'], ["rating", "review"])
+        self.assertEqual(self.service.counters.parses, {'json': 1})
+
+    def test_parse_failures_are_counted(self):
+        self.reply("Sorry, I can't help with that.")
+
+        self.assertEqual(self.service.generate_property_review(self.property_data), (None, None))
+        self.assertEqual(self.service.counters.parses, {'failed': 1})
+        self.assertIn("1 unparseable", str(self.service.counters))
+
+    def test_plain_text_mode(self):
+        service = GeminiService(session=self.session, rate_limiter=RateLimiter(), use_cache=False, structured=False)
+        self.reply("RATING: 3\nREVIEW: Fine.")
+
+        self.assertEqual(service.generate_property_review(self.property_data), (3.0, "Fine."))
+        self.assertNotIn('responseSchema', self.session.post.call_args.kwargs['json']['generationConfig'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import unittest
+from unittest.mock import MagicMock
+
+from django.test import SimpleTestCase, override_settings
+
+from llmApp.services.gemini_service import GeminiService
+from llmApp.services.ollama_service import OllamaService
+from llmApp.services.prompts import SUMMARY_PROMPT, PromptTemplate, truncate_text
+from llmApp.services.rate_limiter import RateLimiter
+
+
+def gemini_reply(text):
+    response = MagicMock()
+    response.status_code = 200
+    response.json.return_value = {"candidates": [{"content": {"parts": [{"text": text}]}}]}
+    return response
+
+
+class TestPromptTemplate(unittest.TestCase):
+
+    def test_renders_dedented_template(self):
+        template = PromptTemplate("""
+            Hotel: {name}
+              Rating: {rating}/5
+            """)
+        self.assertEqual(template.fields, ['name', 'rating'])
+        self.assertEqual(template.render({'name': 'Sea View', 'rating': 4.5, 'extra': 1}), "Hotel: Sea View\n  Rating: 4.5/5")
+
+    def test_free_text_is_compacted(self):
+        template = PromptTemplate("Description: {description}", truncate=('description',))
+        self.assertEqual(template.render({'description': "Pool.\n\n\n  Spa.  "}), "Description: Pool. Spa.")
+
+    def test_free_text_is_trimmed_to_budget(self):
+        values = {'property_title': "Sea View", 'city_name': "Lisbon", 'price': "80.00", 'rating': "4.5",
+                  'description': "word " * 2000}
+        prompt = SUMMARY_PROMPT.render(values, max_tokens=300)
+
+        self.assertLessEqual(len(prompt) // 4 + 1, 300)
+        self.assertIn("Name: Sea View", prompt)
+        self.assertIn("word…", prompt)
+        self.assertTrue(prompt.endswith("highlighting key features."))
+
+    def test_counter_is_asked_only_near_the_budget(self):
+        count = MagicMock(return_value=10)
+        SUMMARY_PROMPT.render({'property_title': "A", 'city_name': "B", 'price': 1, 'rating': 2,
+                               'description': "short"}, max_tokens=1000, count_tokens=count)
+        count.assert_not_called()
+
+    def test_truncate_text(self):
+        self.assertEqual(truncate_text("short", 10), "short")
+        self.assertEqual(truncate_text("a quiet room near the sea", 12), "a quiet…")
+
+
+class TestOutputLimits(SimpleTestCase):
+
+    def setUp(self):
+        self.session = MagicMock()
+        self.session.post.return_value = gemini_reply("ok")
+        self.service = GeminiService(session=self.session, rate_limiter=RateLimiter(), use_cache=False)
+
+    @override_settings(LLM_MAX_OUTPUT_TOKENS={'summaries': 200}, LLM_MAX_INPUT_TOKENS={})
+    def test_single_request_sets_max_output_tokens(self):
+        self.service.generate_property_summary({
+            'property_title': "A", 'city_name': "B", 'price': "1", 'rating': "2", 'description': "C",
+        })
+        payload = self.session.post.call_args.kwargs['json']
+        self.assertEqual(payload['generationConfig'], {'maxOutputTokens': 200})
+
+    @override_settings(LLM_MAX_OUTPUT_TOKENS={'summaries': 200})
+    def test_packed_request_scales_with_hotels(self):
+        config = self.service.generation_config('summaries', hotels=3, responseMimeType="application/json")
+        self.assertEqual(config, {'responseMimeType': "application/json", 'maxOutputTokens': 648})
+
+    @override_settings(LLM_MAX_OUTPUT_TOKENS={})
+    def test_no_limit(self):
+        self.assertEqual(self.service.generation_config('descriptions'), {})
+
+    @override_settings(LLM_TOKEN_COUNTER='api')
+    def test_count_tokens_endpoint(self):
+        self.session.post.return_value.json.return_value = {"totalTokens": 42}
+        self.assertEqual(self.service.count_tokens("prompt"), 42)
+        self.assertIn(':countTokens?', self.session.post.call_args.args[0])
+
+    @override_settings(OLLAMA_NUM_PREDICT=512)
+    def test_ollama_num_predict(self):
+        service = OllamaService(session=self.session, use_cache=False)
+        self.assertEqual(service.build_payload("p", {'maxOutputTokens': 64})['options']['num_predict'], 64)
+        self.assertEqual(service.build_payload("p", {'maxOutputTokens': 4096})['options']['num_predict'], 512)
+
+
+if __name__ == '__main__':
+    unittest.main()
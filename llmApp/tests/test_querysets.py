@@ -0,0 +1,103 @@
+import asyncio
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from django.core.management import load_command_class
+
+from llmApp.models import Hotel
+from llmApp.querysets import aiter_batches, estimated_count, iter_batches, only_fields
+from llmApp.tests.fakes import FakeQuerySet
+
+
+def make_rows(*pks):
+    return [SimpleNamespace(pk=pk, description=None) for pk in pks]
+
+
+class TestIterBatches(unittest.TestCase):
+
+    def test_pages_by_primary_key(self):
+        queryset = FakeQuerySet(make_rows(5, 1, 3, 9, 7))
+
+        batches = [[row.pk for row in batch] for batch in iter_batches(queryset, 2)]
+
+        self.assertEqual(batches, [[1, 3], [5, 7], [9]])
+        # Every page is a LIMIT without an OFFSET
+        self.assertTrue(all(entry[1] is None for entry in queryset.log if entry[0] == 'slice'))
+
+    def test_loads_only_requested_fields(self):
+        queryset = FakeQuerySet(make_rows(1))
+        list(iter_batches(queryset, 10, fields=('property_title',)))
+        self.assertIn(('only', ('hotel_id', 'property_title')), queryset.log)
+
+    def test_hotel_id_is_always_loaded(self):
+        sql = str(only_fields(Hotel.objects.all(), ('property_title',)).query)
+
+        self.assertIn('"hotels"."hotel_id"', sql)
+        self.assertNotIn('"hotels"."description"', sql)
+
+    def test_rows_leaving_the_filter_do_not_skip_others(self):
+        rows = make_rows(1, 2, 3, 4, 5)
+
+        class PendingQuerySet(FakeQuerySet):
+            # Re-evaluates "description is null" on every query, like the database
+            def _clone(self, rows):
+                return PendingQuerySet([row for row in rows if row.description is None], self.log)
+
+        seen = []
+        for batch in iter_batches(PendingQuerySet(rows), 2):
+            for row in batch:
+                row.description = "generated"
+                seen.append(row.pk)
+
+        self.assertEqual(seen, [1, 2, 3, 4, 5])
+
+    def test_empty_queryset(self):
+        self.assertEqual(list(iter_batches(FakeQuerySet([]), 3)), [])
+
+
+class TestAiterBatches(unittest.TestCase):
+
+    def collect(self, queryset, batch_size):
+        async def collect():
+            return [[row.pk for row in batch] async for batch in aiter_batches(queryset, batch_size)]
+        return asyncio.run(collect())
+
+    def test_pages_by_primary_key(self):
+        queryset = FakeQuerySet(make_rows(5, 1, 3, 9, 7))
+
+        self.assertEqual(self.collect(queryset, 2), [[1, 3], [5, 7], [9]])
+        self.assertTrue(all(entry[1] is None for entry in queryset.log if entry[0] == 'slice'))
+
+    def test_empty_queryset(self):
+        self.assertEqual(self.collect(FakeQuerySet([]), 3), [])
+
+
+class TestPendingSelectors(unittest.TestCase):
+
+    def sql(self, name, **options):
+        return str(load_command_class('llmApp', name).get_queryset(force=False, **options).query)
+
+    def test_missing_content_is_a_not_exists_probe(self):
+        summaries = self.sql('generate_summaries')
+        self.assertIn('"description" IS NOT NULL AND NOT EXISTS', summaries)
+        self.assertIn('FROM "property_summaries"', summaries)
+        self.assertIn('WHERE NOT EXISTS', self.sql('generate_reviews'))
+        # Matches the partial index on hotels(id)
+        self.assertTrue(self.sql('generate_descriptions').endswith('WHERE "hotels"."description" IS NULL'))
+
+    def test_estimated_count_reads_the_plan(self):
+        queryset = MagicMock()
+        # What Django 5.2 returns on PostgreSQL
+        queryset.explain.return_value = '{"Plan": {"Node Type": "Seq Scan", "Plan Rows": 9876543}}'
+
+        self.assertEqual(estimated_count(queryset), 9876543)
+        queryset.explain.assert_called_once_with(format='json')
+
+        # EXPLAIN's own shape, a list holding the plan
+        queryset.explain.return_value = '[{"Plan": {"Node Type": "Seq Scan", "Plan Rows": 12}}]'
+        self.assertEqual(estimated_count(queryset), 12)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from llmApp.services.rate_limiter import RateLimiter
+
+
+@patch('llmApp.services.rate_limiter.time.sleep')
+class TestRateLimiter(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 1000.0
+        clock = patch('llmApp.services.rate_limiter.time.time', side_effect=lambda: self.now)
+        clock.start()
+        self.addCleanup(clock.stop)
+
+    def test_disabled_limiter_never_waits(self, mock_sleep):
+        limiter = RateLimiter()
+        for _ in range(100):
+            self.assertEqual(limiter.acquire(10000), 0.0)
+        mock_sleep.assert_not_called()
+
+    def test_requests_are_paced_at_the_quota(self, mock_sleep):
+        limiter = RateLimiter(requests_per_minute=60)
+
+        waits = [limiter.acquire() for _ in range(4)]
+
+        # One request of burst, then a one second slot for each reservation
+        self.assertEqual(waits, [0.0, 1.0, 2.0, 3.0])
+
+    def test_bucket_refills_over_time(self, mock_sleep):
+        limiter = RateLimiter(requests_per_minute=60)
+        limiter.acquire()
+        self.now += 5
+        self.assertEqual(limiter.acquire(), 0.0)
+
+    def test_tokens_per_minute(self, mock_sleep):
+        limiter = RateLimiter(tokens_per_minute=6000)
+
+        self.assertEqual(limiter.acquire(100), 0.0)
+        self.assertAlmostEqual(limiter.acquire(200), 2.0)
+
+    def test_settle_charges_actual_usage(self, mock_sleep):
+        limiter = RateLimiter(tokens_per_minute=6000)
+        limiter.acquire(100)
+        limiter.settle(100)
+        self.assertAlmostEqual(limiter.acquire(0), 1.0)
+
+    def test_file_state_is_shared_between_limiters(self, mock_sleep):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'bucket')
+            first = RateLimiter(requests_per_minute=60, state_path=path)
+            second = RateLimiter(requests_per_minute=60, state_path=path)
+
+            self.assertEqual(first.acquire(), 0.0)
+            self.assertEqual(second.acquire(), 1.0)
+            self.assertEqual(first.acquire(), 2.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,147 @@
+import asyncio
+import unittest
+from io import StringIO
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from llmApp.management.commands.run_pipeline import Command
+
+
+class FakeStage:
+    """
+    Stage command that logs when its request starts and when its write commits
+    """
+    fields = ('hotel_id',)
+
+    def __init__(self, name, log, result="ok", delay=0.01):
+        self.name, self.log, self.result, self.delay = name, log, result, delay
+
+    async def generate(self, service, hotel):
+        self.log.append(('start', self.name))
+        await asyncio.sleep(self.delay)
+        return self.result
+
+    def success_message(self, hotel, result):
+        return f"{self.name} for {hotel.id}"
+
+    def record_failures(self, failures):
+        self.log.append(('failed', self.name))
+
+    def save_items(self, items):
+        self.log.append(('commit', self.name))
+        if self.name == 'descriptions':
+            items[0][0].description = self.result
+        return items, []
+
+
+class TestRunPipeline(unittest.TestCase):
+
+    def setUp(self):
+        self.log = []
+        self.command = Command(stdout=StringIO())
+        self.hotel = SimpleNamespace(id=1, hotel_id='H1', description=None)
+
+    def run_hotel(self, stages, **results):
+        self.command.stages = {
+            name: FakeStage(name, self.log, results.get(name, "ok"), delay=0.02 if name == 'reviews' else 0.01)
+            for name in stages
+        }
+        self.command.completed = {name: 0 for name in stages}
+
+        async def run():
+            self.command.request_slots = asyncio.Semaphore(4)
+            await self.command.run_hotel(None, self.hotel, list(stages))
+
+        with patch('llmApp.management.commands.run_pipeline.release_jobs') as mock_release:
+            asyncio.run(run())
+        return mock_release
+
+    def test_stages_follow_dependencies(self):
+        self.run_hotel(['titles', 'descriptions', 'summaries', 'reviews'])
+
+        order = self.log
+        self.assertLess(order.index(('commit', 'titles')), order.index(('start', 'descriptions')))
+        self.assertLess(order.index(('commit', 'descriptions')), order.index(('start', 'summaries')))
+        # Reviews only wait for the title, so they overlap the description chain
+        self.assertLess(order.index(('start', 'reviews')), order.index(('commit', 'descriptions')))
+        self.assertEqual(self.command.completed, {'titles': 1, 'descriptions': 1, 'summaries': 1, 'reviews': 1})
+
+    def test_failed_stage_skips_dependents_only(self):
+        mock_release = self.run_hotel(['descriptions', 'summaries', 'reviews'], descriptions=None)
+
+        self.assertNotIn(('start', 'summaries'), self.log)
+        self.assertIn(('failed', 'descriptions'), self.log)
+        self.assertIn(('commit', 'reviews'), self.log)
+        # The skipped summary goes back to the ledger instead of staying in progress
+        mock_release.assert_called_once_with('summaries', ['H1'])
+
+    def test_summary_waits_for_title_without_description_stage(self):
+        self.hotel.description = "Has one"
+        self.run_hotel(['titles', 'summaries'])
+
+        # No description stage, yet the summary still waits for the new title
+        self.assertLess(self.log.index(('commit', 'titles')), self.log.index(('start', 'summaries')))
+
+    def test_pending_stages(self):
+        self.command.stages = {name: None for name in ('titles', 'descriptions', 'summaries', 'reviews')}
+        self.command.options = {}
+        hotel = SimpleNamespace(hotel_id='H1', description="Has one")
+
+        self.assertEqual(
+            self.command.pending_stages(hotel, with_summary={'H1'}, with_review=set(), finished=set()),
+            ['titles', 'reviews'],
+        )
+        # Titles already rewritten in an earlier run are not redone
+        self.assertEqual(
+            self.command.pending_stages(hotel, with_summary={'H1'}, with_review=set(),
+                                        finished={('H1', 'titles')}),
+            ['reviews'],
+        )
+
+    def test_incremental_pending_stages(self):
+        self.command.stages = {name: None for name in ('titles', 'descriptions', 'summaries', 'reviews')}
+        self.command.options = {'incremental': True}
+        hotel = SimpleNamespace(hotel_id='H1', description="Has one")
+
+        tracked = {('H1', name) for name in self.command.stages}
+
+        # Existing content is redone unless its job is fresh
+        self.assertEqual(
+            self.command.pending_stages(hotel, with_summary={'H1'}, with_review={'H1'},
+                                        finished={('H1', 'titles'), ('H1', 'reviews')}, tracked=tracked),
+            ['descriptions', 'summaries'],
+        )
+        # Content without a job predates the ledger and is kept
+        self.assertEqual(
+            self.command.pending_stages(hotel, with_summary={'H1'}, with_review={'H1'},
+                                        finished={('H1', 'titles')}, tracked={('H1', 'reviews')}),
+            ['reviews'],
+        )
+
+
+    def test_summaries_need_a_description_or_its_stage(self):
+        self.command.stages = {name: None for name in ('summaries', 'reviews')}
+        self.command.options = {}
+        hotel = SimpleNamespace(hotel_id='H1', description=None)
+
+        self.assertEqual(
+            self.command.pending_stages(hotel, with_summary=set(), with_review=set(), finished=set()),
+            ['reviews'],
+        )
+        # Nor when the description job has failed for good
+        self.command.stages = {name: None for name in ('descriptions', 'summaries')}
+        self.assertEqual(
+            self.command.pending_stages(hotel, with_summary=set(), with_review=set(),
+                                        finished={('H1', 'descriptions')}),
+            [],
+        )
+
+    def test_no_estimate_count_option(self):
+        options = {action.dest for action in self.command.create_parser('manage.py', 'run_pipeline')._actions}
+
+        self.assertIn('incremental', options)
+        self.assertNotIn('estimate_count', options)
+        self.assertNotIn('worker', options)
+
+if __name__ == '__main__':
+    unittest.main()
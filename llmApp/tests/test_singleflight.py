@@ -0,0 +1,100 @@
+import threading
+import unittest
+from unittest.mock import MagicMock
+
+from llmApp.services.gemini_service import GeminiService
+from llmApp.services.rate_limiter import RateLimiter
+from llmApp.services.singleflight import SingleFlight
+from llmApp.services.transport import track_call
+
+
+class TestSingleFlight(unittest.TestCase):
+
+    def test_concurrent_callers_share_one_call(self):
+        flight = SingleFlight()
+        started, release = threading.Event(), threading.Event()
+        calls = []
+
+        def slow():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return "answer"
+
+        results = []
+        leader = threading.Thread(target=lambda: results.append(flight.do("key", slow)))
+        leader.start()
+        started.wait(5)
+        followers = [threading.Thread(target=lambda: results.append(flight.do("key", slow))) for _ in range(3)]
+        for thread in followers:
+            thread.start()
+        release.set()
+        for thread in [leader] + followers:
+            thread.join(5)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(sorted(results), [("answer", False)] + [("answer", True)] * 3)
+
+    def test_keeps_bounded_results_but_not_failures(self):
+        flight = SingleFlight(max_results=1)
+        self.assertEqual(flight.do("a", lambda: "first"), ("first", False))
+        self.assertEqual(flight.do("a", lambda: "second"), ("first", True))
+
+        flight.do("b", lambda: "other")
+        self.assertEqual(flight.do("a", lambda: "again"), ("again", False))
+
+        self.assertEqual(flight.do("c", lambda: None), (None, False))
+        self.assertEqual(flight.do("c", lambda: "now"), ("now", False))
+
+    def test_errors_reach_the_caller(self):
+        flight = SingleFlight(max_results=10)
+
+        def boom():
+            raise RuntimeError("boom")
+
+        with self.assertRaises(RuntimeError):
+            flight.do("key", boom)
+        self.assertEqual(flight.do("key", lambda: "ok"), ("ok", False))
+
+
+class TestServiceDeduplication(unittest.TestCase):
+
+    def setUp(self):
+        self.session = MagicMock()
+        self.session.post.return_value.status_code = 200
+        self.session.post.return_value.json.return_value = {
+            "candidates": [{"content": {"parts": [{"text": "fresh"}]}}]
+        }
+
+    def make_service(self, **kwargs):
+        return GeminiService(session=self.session, rate_limiter=RateLimiter(), use_cache=False, **kwargs)
+
+    def test_identical_prompts_are_sent_once_without_cache(self):
+        service = self.make_service()
+        self.assertEqual(service._make_request("prompt"), "fresh")
+
+        with track_call('titles') as call:
+            self.assertEqual(service._make_request("prompt"), "fresh")
+
+        self.assertTrue(call.coalesced)
+        self.assertFalse(call.cached)
+        self.assertEqual(self.session.post.call_count, 1)
+        self.assertEqual(service.counters.calls, 1)
+        self.assertEqual(service.counters.coalesced, 1)
+
+    def test_different_prompts_are_not_shared(self):
+        service = self.make_service()
+        service._make_request("one")
+        service._make_request("two")
+        self.assertEqual(self.session.post.call_count, 2)
+        self.assertEqual(service.counters.coalesced, 0)
+
+    def test_can_be_disabled(self):
+        service = self.make_service(deduplicate=False)
+        service._make_request("prompt")
+        service._make_request("prompt")
+        self.assertEqual(self.session.post.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
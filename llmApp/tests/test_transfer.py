@@ -0,0 +1,122 @@
+import io
+import unittest
+from unittest.mock import patch
+
+from django.test import TestCase
+
+from llmApp.models import Hotel, PropertyReview
+from llmApp.transfer import export_content, import_content
+
+
+class TestContentTransfer(unittest.TestCase):
+    """
+    The COPY statements behind export_content and import_content, on a mocked cursor
+    """
+    def cursor(self, mock_connection, rowcount=3):
+        cursor = mock_connection.cursor.return_value.__enter__.return_value
+        cursor.rowcount = rowcount
+        return cursor
+
+    @patch('llmApp.transfer.connection')
+    def test_export_streams_one_latest_row_per_hotel(self, mock_connection):
+        cursor = self.cursor(mock_connection)
+        output = io.BytesIO()
+
+        self.assertEqual(export_content('reviews', output, 'binary'), 3)
+
+        sql, target = cursor.copy_expert.call_args.args
+        self.assertIs(target, output)
+        self.assertTrue(sql.startswith("COPY (SELECT DISTINCT ON (property_id)"))
+        self.assertIn("rating::double precision, review::text", sql)
+        self.assertTrue(sql.endswith("TO STDOUT WITH (FORMAT binary)"))
+
+    @patch('llmApp.transfer.transaction')
+    @patch('llmApp.transfer.connection')
+    def test_import_stages_then_updates_on_hotel_id(self, mock_connection, mock_transaction):
+        cursor = self.cursor(mock_connection, rowcount=5)
+        source = io.BytesIO(b"hotel_id,description\nH1,Nice\n")
+
+        self.assertEqual(import_content('descriptions', source), (5, 5))
+
+        cursor.copy_expert.assert_called_once_with(
+            "COPY content_staging (hotel_id, description) FROM STDIN WITH (FORMAT csv, HEADER)", source
+        )
+        statements = [call.args[0] for call in cursor.execute.call_args_list]
+        self.assertIn("ON COMMIT DROP", statements[0])
+        self.assertEqual(statements[1], "ANALYZE content_staging")
+        self.assertEqual(
+            statements[2],
+            "UPDATE hotels t SET description = s.description FROM content_staging s "
+            "WHERE t.hotel_id = s.hotel_id",
+        )
+
+    @patch('llmApp.transfer.transaction')
+    @patch('llmApp.transfer.connection')
+    def test_import_replaces_summaries_of_known_hotels(self, mock_connection, mock_transaction):
+        cursor = self.cursor(mock_connection)
+
+        import_content('summaries', io.BytesIO())
+
+        delete, insert = [call.args[0] for call in cursor.execute.call_args_list][2:]
+        self.assertTrue(delete.startswith("DELETE FROM property_summaries t USING content_staging s"))
+        self.assertIn("JOIN hotels h ON h.hotel_id = s.hotel_id", insert)
+
+    def test_unknown_format(self):
+        with self.assertRaises(ValueError):
+            export_content('titles', io.BytesIO(), 'parquet')
+
+
+
+class TestContentTransferRoundTrip(TestCase):
+    """
+    export_content then import_content on the database, which must give
+    back the rows that were exported
+    """
+    def setUp(self):
+        for i in (1, 2):
+            Hotel.objects.create(
+                hotel_id=f"H{i}", city_name="Lisbon", property_title=f"Hotel {i}", price=100.0, rating=4.0,
+                address="Rua Augusta 1", latitude=38.71, longitude=-9.14, room_type="Double",
+                image="http://example.com/hotel.jpg", local_image_path="/images/hotel.jpg",
+                description=f"Description {i}",
+            )
+
+    def round_trip(self, name, fmt, clear):
+        exported = io.BytesIO()
+        rows = export_content(name, exported, fmt)
+        clear()
+        exported.seek(0)
+        self.assertEqual(import_content(name, exported, fmt), (rows, rows))
+        return rows
+
+    def test_descriptions_csv(self):
+        before = list(Hotel.objects.order_by('hotel_id').values_list('hotel_id', 'description'))
+
+        rows = self.round_trip('descriptions', 'csv', lambda: Hotel.objects.update(description=None))
+
+        self.assertEqual(rows, 2)
+        self.assertEqual(list(Hotel.objects.order_by('hotel_id').values_list('hotel_id', 'description')), before)
+
+    def test_titles_binary(self):
+        before = list(Hotel.objects.order_by('hotel_id').values_list('hotel_id', 'property_title'))
+
+        self.round_trip('titles', 'binary', lambda: Hotel.objects.update(property_title=''))
+
+        self.assertEqual(list(Hotel.objects.order_by('hotel_id').values_list('hotel_id', 'property_title')), before)
+
+    def test_reviews_keep_the_latest_per_hotel(self):
+        PropertyReview.objects.create(property_id="H1", rating=2.0, review="Old review")
+        PropertyReview.objects.create(property_id="H1", rating=5.0, review="Latest review")
+        PropertyReview.objects.create(property_id="H2", rating=4.0, review="Only review")
+
+        rows = self.round_trip('reviews', 'csv', lambda: PropertyReview.objects.all().delete())
+
+        self.assertEqual(rows, 2)
+        self.assertEqual(
+            list(PropertyReview.objects.order_by('property_id').values_list('property_id', 'rating', 'review')),
+            [("H1", 5.0, "Latest review"), ("H2", 4.0, "Only review")],
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,229 @@
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+import requests
+
+from llmApp.services.gemini_service import GeminiService
+from llmApp.services.rate_limiter import RateLimiter
+from django.test import SimpleTestCase, override_settings
+
+from llmApp.services.transport import (
+    CircuitBreaker,
+    CircuitOpenError,
+    RetryPolicy,
+    parse_retry_after,
+    track_call,
+)
+
+
+def make_response(status_code, text=None, headers=None):
+    response = MagicMock()
+    response.status_code = status_code
+    response.headers = headers or {}
+    response.json.return_value = {
+        "candidates": [{"content": {"parts": [{"text": text}]}}]
+    }
+    if status_code >= 400:
+        response.raise_for_status.side_effect = requests.exceptions.HTTPError(f"{status_code} Error")
+    return response
+
+
+class TestRetryPolicy(unittest.TestCase):
+
+    def test_backoff_is_jittered_and_capped(self):
+        policy = RetryPolicy(backoff_base=1, backoff_max=10)
+        for attempt in range(8):
+            delay = policy.delay(attempt)
+            self.assertGreaterEqual(delay, 0)
+            self.assertLessEqual(delay, min(10, 2 ** attempt))
+
+    def test_retry_after_wins(self):
+        policy = RetryPolicy(backoff_base=1, backoff_max=10)
+        self.assertGreaterEqual(policy.delay(0, retry_after=30), 30)
+
+    def test_parse_retry_after(self):
+        self.assertEqual(parse_retry_after("7"), 7.0)
+        self.assertIsNone(parse_retry_after(None))
+        self.assertIsNone(parse_retry_after("soon"))
+        self.assertEqual(parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT"), 0.0)
+
+
+@patch('llmApp.services.base.time.sleep')
+class TestGeminiServiceRetries(unittest.TestCase):
+
+    def setUp(self):
+        self.session = MagicMock()
+        self.service = GeminiService(
+            session=self.session,
+            retry_policy=RetryPolicy(max_retries=3),
+            rate_limiter=RateLimiter(),
+            use_cache=False,
+        )
+
+    def test_uses_shared_session_with_timeout(self, mock_sleep):
+        self.session.post.return_value = make_response(200, "ok")
+
+        self.assertEqual(self.service._make_request("prompt"), "ok")
+        _, kwargs = self.session.post.call_args
+        self.assertEqual(kwargs['timeout'], self.service.timeout)
+
+    def test_retries_throttled_requests_and_honours_retry_after(self, mock_sleep):
+        self.session.post.side_effect = [
+            make_response(429, headers={'Retry-After': '12'}),
+            make_response(503),
+            make_response(200, "ok"),
+        ]
+
+        with track_call() as call:
+            result = self.service._make_request("prompt")
+
+        self.assertEqual(result, "ok")
+        self.assertEqual(call.retries, 2)
+        self.assertEqual(call.status_codes, [429, 503, 200])
+        self.assertGreaterEqual(mock_sleep.call_args_list[0].args[0], 12)
+        self.assertEqual(self.service.counters.retries, 2)
+
+    def test_retries_reserve_tokens_once(self, mock_sleep):
+        self.service.rate_limiter = MagicMock()
+        self.session.post.side_effect = [make_response(429), make_response(503), make_response(200, "ok")]
+
+        self.service._post("url", {}, MagicMock(), tokens=300)
+
+        # One reservation for the caller to settle, one request per attempt
+        self.assertEqual([call.args for call in self.service.rate_limiter.acquire.call_args_list],
+                         [(300,), (0,), (0,)])
+
+    def test_retries_connection_errors(self, mock_sleep):
+        self.session.post.side_effect = [
+            requests.exceptions.ConnectionError("reset"),
+            make_response(200, "ok"),
+        ]
+
+        self.assertEqual(self.service._make_request("prompt"), "ok")
+        self.assertEqual(mock_sleep.call_count, 1)
+
+    def test_gives_up_after_max_retries(self, mock_sleep):
+        self.session.post.return_value = make_response(429)
+
+        with track_call() as call:
+            result = self.service._make_request("prompt")
+
+        self.assertIsNone(result)
+        self.assertEqual(call.attempts, 4)
+        self.assertEqual(call.retries, 3)
+        self.assertEqual(self.service.counters.failures, 1)
+
+    def test_client_errors_are_not_retried(self, mock_sleep):
+        self.session.post.return_value = make_response(400)
+
+        self.assertIsNone(self.service._make_request("prompt"))
+        self.assertEqual(self.session.post.call_count, 1)
+        mock_sleep.assert_not_called()
+
+
+    def test_breaker_stops_sending_to_a_failing_provider(self, mock_sleep):
+        self.service.circuit_breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+        self.session.post.return_value = make_response(503)
+
+        self.assertIsNone(self.service._make_request("first"))
+        self.assertIsNone(self.service._make_request("second"))
+
+        # Two 503s opened the circuit; the retries and the second call were never sent
+        self.assertEqual(self.session.post.call_count, 2)
+        self.assertEqual(self.service.circuit_breaker.state, CircuitBreaker.OPEN)
+        self.assertEqual(self.service.counters.failures, 2)
+
+
+class TestCircuitBreaker(unittest.TestCase):
+
+    def test_half_open_probe(self):
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+        breaker.record_failure()
+        breaker.before_request()
+        breaker.record_failure()
+        with self.assertRaises(CircuitOpenError):
+            breaker.before_request()
+        self.assertGreater(breaker.retry_in(), 0)
+
+        time.sleep(0.06)
+        breaker.before_request()
+        # Only one probe at a time
+        with self.assertRaises(CircuitOpenError):
+            breaker.before_request()
+        breaker.record_success()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+        breaker.before_request()
+
+    def test_failed_probe_reopens(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.01)
+        breaker.record_failure()
+        time.sleep(0.02)
+        breaker.before_request()
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        self.assertEqual(breaker.times_opened, 2)
+
+    def test_disabled(self):
+        breaker = CircuitBreaker(failure_threshold=0)
+        for _ in range(10):
+            breaker.record_failure()
+        breaker.before_request()
+
+
+@override_settings(LLM_HEDGE_MIN_SAMPLES=5, LLM_HEDGE_WINDOW=50, LLM_HEDGE_QUANTILE=0.95, LLM_HEDGE_MIN_DELAY=0.05)
+class TestHedgedRequests(SimpleTestCase):
+
+    def setUp(self):
+        self.session = MagicMock()
+        self.service = GeminiService(session=self.session, rate_limiter=RateLimiter(), use_cache=False,
+                                     deduplicate=False, hedge=True)
+        self.service.counters.latencies = [0.01] * 5
+        self.first_sent = threading.Event()
+
+    def slow_then_fast(self, *args, **kwargs):
+        if not self.first_sent.is_set():
+            self.first_sent.set()
+            time.sleep(1)
+            return make_response(200, "slow")
+        return make_response(200, "fast")
+
+    def test_slow_request_is_hedged(self):
+        self.session.post.side_effect = self.slow_then_fast
+
+        with track_call() as call:
+            started = time.monotonic()
+            self.assertEqual(self.service._make_request("prompt"), "fast")
+
+        self.assertLess(time.monotonic() - started, 0.5)
+        self.assertTrue(call.hedged)
+        self.assertEqual(call.attempts, 2)
+        self.assertEqual(self.service.counters.hedges, 1)
+
+    def test_close_shuts_down_hedge_threads(self):
+        self.session.post.side_effect = self.slow_then_fast
+        self.service._make_request("prompt")
+        executor = self.service._hedge_executor
+
+        self.service.close()
+
+        self.assertIsNone(self.service._hedge_executor)
+        with self.assertRaises(RuntimeError):
+            executor.submit(print)
+        # A later request starts a fresh pool
+        self.session.post.side_effect = None
+        self.session.post.return_value = make_response(200, "ok")
+        self.assertEqual(self.service._make_request("prompt"), "ok")
+
+    def test_no_hedge_until_latencies_are_known(self):
+        self.service.counters.latencies = []
+        self.session.post.return_value = make_response(200, "ok")
+
+        self.assertIsNone(self.service.hedge_delay())
+        self.assertEqual(self.service._make_request("prompt"), "ok")
+        self.assertEqual(self.service.counters.hedges, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
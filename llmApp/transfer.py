@@ -0,0 +1,129 @@
+# llmApp/transfer.py
+import time
+from dataclasses import dataclass
+from typing import IO, Tuple
+
+from django.db import connection, transaction
+
+from llmApp.content import content_cache
+from llmApp.models import Hotel, PropertyReview, PropertySummary
+
+FORMATS = ('csv', 'binary')
+STAGING_TABLE = 'content_staging'
+
+
+@dataclass(frozen=True)
+class Content:
+    """
+    Where one kind of generated content lives: its table, the column holding
+    the hotel_id and the (column, type) pairs that are copied
+    """
+    table: str
+    key: str
+    columns: Tuple[Tuple[str, str], ...]
+    # Content rows are replaced per hotel instead of updated in place
+    replace: bool = False
+
+    @property
+    def names(self) -> str:
+        return ', '.join(name for name, _ in self.columns)
+
+
+CONTENT = {
+    'titles': Content(Hotel._meta.db_table, 'hotel_id', (('property_title', 'varchar(255)'),)),
+    'descriptions': Content(Hotel._meta.db_table, 'hotel_id', (('description', 'text'),)),
+    'summaries': Content(PropertySummary._meta.db_table, 'property_id', (('summary', 'text'),), replace=True),
+    'reviews': Content(
+        PropertyReview._meta.db_table, 'property_id',
+        (('rating', 'double precision'), ('review', 'text')), replace=True,
+    ),
+}
+
+
+def copy_options(fmt: str) -> str:
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown COPY format: {fmt}")
+    # Binary COPY has no header row
+    return "FORMAT binary" if fmt == 'binary' else "FORMAT csv, HEADER"
+
+
+def export_query(content: Content) -> str:
+    """
+    SELECT of every hotel's content, one row per hotel (its latest summary
+    or review), in the column order import_content expects
+    """
+    columns = ', '.join(f"{name}::{kind}" for name, kind in content.columns)
+    filters = ' AND '.join(f"{name} IS NOT NULL" for name, _ in content.columns)
+    if not content.replace:
+        return f"SELECT {content.key}::varchar(50) AS hotel_id, {columns} FROM {content.table} WHERE {filters}"
+    return (
+        f"SELECT DISTINCT ON ({content.key}) {content.key}::varchar(50) AS hotel_id, {columns} "
+        f"FROM {content.table} WHERE {filters} ORDER BY {content.key}, updated_at DESC, id DESC"
+    )
+
+
+def export_content(name: str, output: IO[bytes], fmt: str = 'csv') -> int:
+    """
+    Stream the ``name`` content of every hotel into ``output`` with
+    COPY ... TO STDOUT; returns the number of rows written
+    """
+    sql = f"COPY ({export_query(CONTENT[name])}) TO STDOUT WITH ({copy_options(fmt)})"
+    with connection.cursor() as cursor:
+        cursor.copy_expert(sql, output)
+        return cursor.rowcount
+
+
+def merge_statements(content: Content):
+    """
+    SQL moving the staged rows into ``content.table``, keyed on hotel_id.
+    Hotels that don't exist here are left out.
+    """
+    if not content.replace:
+        assignments = ', '.join(f"{name} = s.{name}" for name, _ in content.columns)
+        return [
+            f"UPDATE {content.table} t SET {assignments} FROM {STAGING_TABLE} s "
+            f"WHERE t.{content.key} = s.hotel_id",
+        ]
+    staged = f"{STAGING_TABLE} s JOIN {Hotel._meta.db_table} h ON h.hotel_id = s.hotel_id"
+    values = ', '.join(f"s.{name}" for name, _ in content.columns)
+    return [
+        f"DELETE FROM {content.table} t USING {STAGING_TABLE} s WHERE t.{content.key} = s.hotel_id",
+        f"INSERT INTO {content.table} ({content.key}, {content.names}, created_at, updated_at) "
+        f"SELECT s.hotel_id, {values}, now(), now() FROM {staged}",
+    ]
+
+
+def import_content(name: str, source: IO[bytes], fmt: str = 'csv') -> Tuple[int, int]:
+    """
+    Load a file written by export_content into a temporary staging table
+    with COPY ... FROM STDIN, then merge it on hotel_id in the same
+    transaction. Returns (rows staged, rows merged).
+    """
+    content = CONTENT[name]
+    columns = ', '.join(f"{column} {kind}" for column, kind in content.columns)
+    copy = f"COPY {STAGING_TABLE} (hotel_id, {content.names}) FROM STDIN WITH ({copy_options(fmt)})"
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            f"CREATE TEMPORARY TABLE {STAGING_TABLE} "
+            f"(hotel_id varchar(50) PRIMARY KEY, {columns}) ON COMMIT DROP"
+        )
+        cursor.copy_expert(copy, source)
+        staged = cursor.rowcount
+        # The planner knows nothing about a fresh temporary table
+        cursor.execute(f"ANALYZE {STAGING_TABLE}")
+        merged = 0
+        for statement in merge_statements(content):
+            cursor.execute(statement)
+            merged = cursor.rowcount
+        # Too many hotels may have changed to drop their API entries one by one
+        transaction.on_commit(content_cache().clear)
+    return staged, merged
+
+
+def rate(rows: int, started: float) -> str:
+    """
+    "N rows in S s (R rows/sec)" since the perf_counter reading ``started``
+    """
+    seconds = time.perf_counter() - started
+    per_second = f"{rows / seconds:.0f}" if seconds else "n/a"
+    return f"{rows} rows in {seconds:.2f}s ({per_second} rows/sec)"
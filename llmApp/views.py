@@ -0,0 +1,73 @@
+# llmApp/views.py
+import hashlib
+
+from django.conf import settings
+from django.http import Http404, HttpResponse, HttpResponseBadRequest, JsonResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from django.views.decorators.http import require_GET
+
+from llmApp.content import get_content
+from llmApp.services import metrics as llm_metrics
+
+
+@require_GET
+def metrics(request):
+    """
+    Prometheus scrape endpoint for the counts every command publishes
+    """
+    return HttpResponse(
+        llm_metrics.render(llm_metrics.read_published()),
+        content_type='text/plain; version=0.0.4; charset=utf-8',
+    )
+
+
+def content_response(request, data, entries):
+    """
+    JSON response for cached content entries, or 304 Not Modified when the
+    client's If-None-Match / If-Modified-Since still match
+    """
+    if len(entries) == 1:
+        etag = entries[0]['etag']
+    else:
+        etag = hashlib.md5(''.join(entry['etag'] for entry in entries).encode()).hexdigest()
+    etag = f'"{etag}"'
+    changes = [entry['last_modified'] for entry in entries if entry['last_modified'] is not None]
+    last_modified = max(changes) if changes else None
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = JsonResponse(data)
+    response.headers['ETag'] = etag
+    if last_modified is not None:
+        response.headers['Last-Modified'] = http_date(last_modified)
+    # Clients may keep a copy but must revalidate it
+    patch_cache_control(response, no_cache=True)
+    return response
+
+
+@require_GET
+def hotel_content(request, hotel_id):
+    """
+    Title, description, latest summary and reviews of one hotel
+    """
+    entry = get_content([hotel_id]).get(hotel_id)
+    if entry is None:
+        raise Http404(f"No hotel {hotel_id}")
+    return content_response(request, entry['data'], [entry])
+
+
+@require_GET
+def hotels_content(request):
+    """
+    Content of the hotels in ?ids=H1,H2, in that order; unknown ids are left out
+    """
+    hotel_ids = list(dict.fromkeys(hotel_id for hotel_id in request.GET.get('ids', '').split(',') if hotel_id))
+    if not hotel_ids:
+        return HttpResponseBadRequest("ids is required")
+    if len(hotel_ids) > settings.CONTENT_API_MAX_IDS:
+        return HttpResponseBadRequest(f"At most {settings.CONTENT_API_MAX_IDS} ids per request")
+
+    entries = get_content(hotel_ids)
+    found = [entries[hotel_id] for hotel_id in hotel_ids if hotel_id in entries]
+    return content_response(request, {'hotels': [entry['data'] for entry in found]}, found)
@@ -8,16 +8,8 @@ docker-compose up -d
 echo "Waiting for services to be ready..."
 sleep 5
 
-# Run the commands
-echo "Running all commands..."
+# Run all stages (titles -> descriptions -> summaries, titles -> reviews) in one pass
+echo "Running pipeline..."
+docker-compose exec -T django_app python manage.py run_pipeline --batch-size 50 --concurrency 4 "$@"
 
-commands=("rewrite_titles" "generate_descriptions" "generate_summaries" "generate_reviews")
-
-for cmd in "${commands[@]}"; do
-    echo "Running $cmd..."
-    docker-compose exec -T django_app python manage.py $cmd --batch-size 2
-    echo "$cmd completed"
-    sleep 5
-done
-
-echo "All commands completed!"
\ No newline at end of file
+echo "All commands completed!"